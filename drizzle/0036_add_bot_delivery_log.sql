@@ -0,0 +1,25 @@
+-- Append-only журнал отправок Telegram-бота
+CREATE TABLE IF NOT EXISTS "BotDeliveryLog" (
+    "id" uuid PRIMARY KEY DEFAULT gen_random_uuid() NOT NULL,
+    "scheduleId" uuid,
+    "playerId" uuid,
+    "teamId" uuid,
+    "telegramId" bigint NOT NULL,
+    "surveyType" varchar(32) NOT NULL,
+    "source" varchar(16) DEFAULT 'scheduler' NOT NULL,
+    "localDate" varchar(10) NOT NULL,
+    "outcome" varchar(16) NOT NULL,
+    "error" text,
+    "latencyMs" integer,
+    "messageId" bigint,
+    "createdAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_player_created" ON "BotDeliveryLog"("playerId", "createdAt" DESC);
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_team_date" ON "BotDeliveryLog"("teamId", "localDate");
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_date" ON "BotDeliveryLog"("localDate");
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_telegram_created" ON "BotDeliveryLog"("telegramId", "createdAt" DESC);
+
+-- Бот читает журнал через uteam_bot_reader
+GRANT SELECT ON "BotDeliveryLog" TO uteam_bot_reader;
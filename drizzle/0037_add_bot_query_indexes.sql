@@ -0,0 +1,12 @@
+-- Индексы для горячих запросов Telegram-бота (см. telegram-bot/uteam_bot/planbench.py)
+-- Player."telegramId" уже покрыт уникальным индексом Player_telegramId_unique
+
+-- Привязка по PIN-коду
+CREATE INDEX IF NOT EXISTS "idx_player_pin_code" ON "Player" ("pinCode");
+
+-- Получатели рассылки: игроки команды с привязанным Telegram
+CREATE INDEX IF NOT EXISTS "idx_player_team_bound" ON "Player" ("teamId") WHERE "telegramId" IS NOT NULL;
+
+-- Неотправленные RPE расписания (большая часть строк — уже отправленные)
+CREATE INDEX IF NOT EXISTS "idx_rpe_schedule_scheduled" ON "RPESchedule" ("scheduledTime") WHERE "status" = 'scheduled';
+CREATE INDEX IF NOT EXISTS "idx_rpe_schedule_match_scheduled" ON "RPEScheduleMatch" ("scheduledTime") WHERE "status" = 'scheduled';
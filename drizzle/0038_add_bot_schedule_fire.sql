@@ -0,0 +1,193 @@
+-- Ближайший момент срабатывания каждого активного расписания Telegram-бота (UTC).
+-- Таблица поддерживается триггерами на таблицах расписаний, команд, тренировок и матчей;
+-- бот читает только строки, у которых момент срабатывания попал в окно текущего тика,
+-- и сдвигает ежедневные расписания на следующий день (uteam_bot_writer).
+
+CREATE TABLE IF NOT EXISTS "BotScheduleFire" (
+    "scheduleId" uuid PRIMARY KEY NOT NULL,
+    "surveyType" varchar(32) NOT NULL,
+    "teamId" uuid NOT NULL,
+    "timezone" varchar(64) NOT NULL,
+    "sendTime" time NOT NULL,
+    "eventDate" date,
+    "fireAt" timestamp with time zone NOT NULL,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS "idx_bot_schedule_fire_fire_at" ON "BotScheduleFire"("fireAt");
+CREATE INDEX IF NOT EXISTS "idx_bot_schedule_fire_team" ON "BotScheduleFire"("teamId");
+
+-- Время/дата из varchar без исключения на некорректных значениях
+CREATE OR REPLACE FUNCTION bot_safe_time(value text) RETURNS time
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    RETURN value::time;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION bot_safe_date(value text) RETURNS date
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    RETURN value::date;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END $$;
+
+-- Момент срабатывания в UTC: для тренировки/матча — дата события + время отправки,
+-- для ежедневного расписания (event_date IS NULL) — ближайшее время отправки после after.
+-- Некорректная таймзона команды заменяется на Europe/Moscow, как и в боте.
+CREATE OR REPLACE FUNCTION bot_schedule_next_fire(send_time time, tz text, event_date date, after timestamptz)
+RETURNS timestamptz
+LANGUAGE plpgsql STABLE AS $$
+DECLARE
+    zone text := COALESCE(tz, 'Europe/Moscow');
+    local_day date;
+    fire timestamptz;
+BEGIN
+    BEGIN
+        PERFORM now() AT TIME ZONE zone;
+    EXCEPTION WHEN others THEN
+        zone := 'Europe/Moscow';
+    END;
+    IF event_date IS NOT NULL THEN
+        RETURN (event_date + send_time) AT TIME ZONE zone;
+    END IF;
+    local_day := (after AT TIME ZONE zone)::date;
+    fire := (local_day + send_time) AT TIME ZONE zone;
+    IF fire <= after THEN
+        fire := (local_day + 1 + send_time) AT TIME ZONE zone;
+    END IF;
+    RETURN fire;
+END $$;
+
+-- Пересчитывает строку одного расписания по исходным таблицам
+CREATE OR REPLACE FUNCTION bot_sync_schedule_fire(schedule_type text, schedule_id uuid) RETURNS void
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM "BotScheduleFire" WHERE "scheduleId" = schedule_id;
+
+    IF schedule_type = 'morning' THEN
+        INSERT INTO "BotScheduleFire" ("scheduleId", "surveyType", "teamId", "timezone", "sendTime", "eventDate", "fireAt")
+        SELECT ss."id", 'morning', ss."teamId", COALESCE(t."timezone", 'Europe/Moscow'), src."sendTime", NULL,
+               bot_schedule_next_fire(src."sendTime", t."timezone", NULL, now())
+        FROM "SurveySchedule" ss
+        LEFT JOIN "Team" t ON ss."teamId" = t."id"
+        CROSS JOIN LATERAL (SELECT bot_safe_time(ss."sendTime") AS "sendTime") src
+        WHERE ss."id" = schedule_id AND ss."enabled" = true AND ss."surveyType" = 'morning'
+          AND src."sendTime" IS NOT NULL;
+    ELSIF schedule_type = 'rpe' THEN
+        INSERT INTO "BotScheduleFire" ("scheduleId", "surveyType", "teamId", "timezone", "sendTime", "eventDate", "fireAt")
+        SELECT rs."id", 'rpe', rs."teamId", COALESCE(t."timezone", 'Europe/Moscow'), rs."scheduledTime", src."eventDate",
+               bot_schedule_next_fire(rs."scheduledTime", t."timezone", src."eventDate", now())
+        FROM "RPESchedule" rs
+        LEFT JOIN "Team" t ON rs."teamId" = t."id"
+        LEFT JOIN "Training" tr ON rs."trainingId" = tr."id"
+        CROSS JOIN LATERAL (SELECT bot_safe_date(tr."date") AS "eventDate") src
+        WHERE rs."id" = schedule_id AND rs."status" = 'scheduled';
+    ELSIF schedule_type = 'rpe_match' THEN
+        INSERT INTO "BotScheduleFire" ("scheduleId", "surveyType", "teamId", "timezone", "sendTime", "eventDate", "fireAt")
+        SELECT rsm."id", 'rpe_match', rsm."teamId", COALESCE(t."timezone", 'Europe/Moscow'), rsm."scheduledTime", src."eventDate",
+               bot_schedule_next_fire(rsm."scheduledTime", t."timezone", src."eventDate", now())
+        FROM "RPEScheduleMatch" rsm
+        LEFT JOIN "Team" t ON rsm."teamId" = t."id"
+        LEFT JOIN "Match" m ON rsm."matchId" = m."id"
+        CROSS JOIN LATERAL (SELECT bot_safe_date(m."date") AS "eventDate") src
+        WHERE rsm."id" = schedule_id AND rsm."status" = 'scheduled';
+    END IF;
+END $$;
+
+-- Изменение самого расписания
+CREATE OR REPLACE FUNCTION bot_schedule_fire_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    schedule_type text := CASE TG_TABLE_NAME
+        WHEN 'SurveySchedule' THEN 'morning'
+        WHEN 'RPESchedule' THEN 'rpe'
+        ELSE 'rpe_match'
+    END;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM bot_sync_schedule_fire(schedule_type, OLD."id");
+        RETURN OLD;
+    END IF;
+    PERFORM bot_sync_schedule_fire(schedule_type, NEW."id");
+    RETURN NEW;
+END $$;
+
+-- Смена таймзоны команды
+CREATE OR REPLACE FUNCTION bot_team_fire_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN SELECT "scheduleId", "surveyType" FROM "BotScheduleFire" WHERE "teamId" = NEW."id" LOOP
+        PERFORM bot_sync_schedule_fire(r."surveyType", r."scheduleId");
+    END LOOP;
+    RETURN NEW;
+END $$;
+
+-- Перенос тренировки или матча на другую дату
+CREATE OR REPLACE FUNCTION bot_event_fire_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    r record;
+BEGIN
+    IF TG_TABLE_NAME = 'Training' THEN
+        FOR r IN SELECT "id" FROM "RPESchedule" WHERE "trainingId" = NEW."id" AND "status" = 'scheduled' LOOP
+            PERFORM bot_sync_schedule_fire('rpe', r."id");
+        END LOOP;
+    ELSE
+        FOR r IN SELECT "id" FROM "RPEScheduleMatch" WHERE "matchId" = NEW."id" AND "status" = 'scheduled' LOOP
+            PERFORM bot_sync_schedule_fire('rpe_match', r."id");
+        END LOOP;
+    END IF;
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_survey_schedule" ON "SurveySchedule";
+CREATE TRIGGER "bot_schedule_fire_survey_schedule"
+    AFTER INSERT OR UPDATE OR DELETE ON "SurveySchedule"
+    FOR EACH ROW EXECUTE FUNCTION bot_schedule_fire_trigger();
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_rpe_schedule" ON "RPESchedule";
+CREATE TRIGGER "bot_schedule_fire_rpe_schedule"
+    AFTER INSERT OR UPDATE OR DELETE ON "RPESchedule"
+    FOR EACH ROW EXECUTE FUNCTION bot_schedule_fire_trigger();
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_rpe_schedule_match" ON "RPEScheduleMatch";
+CREATE TRIGGER "bot_schedule_fire_rpe_schedule_match"
+    AFTER INSERT OR UPDATE OR DELETE ON "RPEScheduleMatch"
+    FOR EACH ROW EXECUTE FUNCTION bot_schedule_fire_trigger();
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_team" ON "Team";
+CREATE TRIGGER "bot_schedule_fire_team"
+    AFTER UPDATE OF "timezone" ON "Team"
+    FOR EACH ROW WHEN (OLD."timezone" IS DISTINCT FROM NEW."timezone")
+    EXECUTE FUNCTION bot_team_fire_trigger();
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_training" ON "Training";
+CREATE TRIGGER "bot_schedule_fire_training"
+    AFTER UPDATE OF "date" ON "Training"
+    FOR EACH ROW WHEN (OLD."date" IS DISTINCT FROM NEW."date")
+    EXECUTE FUNCTION bot_event_fire_trigger();
+
+DROP TRIGGER IF EXISTS "bot_schedule_fire_match" ON "Match";
+CREATE TRIGGER "bot_schedule_fire_match"
+    AFTER UPDATE OF "date" ON "Match"
+    FOR EACH ROW WHEN (OLD."date" IS DISTINCT FROM NEW."date")
+    EXECUTE FUNCTION bot_event_fire_trigger();
+
+-- Заполнение по существующим расписаниям
+SELECT bot_sync_schedule_fire('morning', "id") FROM "SurveySchedule" WHERE "enabled" = true;
+SELECT bot_sync_schedule_fire('rpe', "id") FROM "RPESchedule" WHERE "status" = 'scheduled';
+SELECT bot_sync_schedule_fire('rpe_match', "id") FROM "RPEScheduleMatch" WHERE "status" = 'scheduled';
+
+-- Бот читает таблицу через uteam_bot_reader и сдвигает ежедневные расписания через uteam_bot_writer
+GRANT SELECT ON "BotScheduleFire" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, UPDATE ("fireAt", "updatedAt") ON "BotScheduleFire" TO uteam_bot_writer;
+    END IF;
+END $$;
@@ -0,0 +1,14 @@
+-- Telegram-бот закрывает RPE расписания прошедших тренировок и матчей статусом 'expired'
+-- (uteam_bot_writer, одним UPDATE на таблицу раз в час)
+
+-- Триггеры BotScheduleFire срабатывают и на UPDATE от uteam_bot_writer:
+-- пересчет выполняется с правами владельца, а не вызывающего
+ALTER FUNCTION bot_sync_schedule_fire(text, uuid) SECURITY DEFINER SET search_path = public;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT ON "Team", "Training", "Match", "RPESchedule", "RPEScheduleMatch" TO uteam_bot_writer;
+        GRANT UPDATE ("status", "updatedAt") ON "RPESchedule", "RPEScheduleMatch" TO uteam_bot_writer;
+    END IF;
+END $$;
@@ -0,0 +1,9 @@
+-- Telegram-бот отмечает разосланные RPE расписания статусом 'sent' и временем sentAt
+-- (uteam_bot_writer, один UPDATE на таблицу за тик планировщика)
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT UPDATE ("sentAt") ON "RPESchedule", "RPEScheduleMatch" TO uteam_bot_writer;
+    END IF;
+END $$;
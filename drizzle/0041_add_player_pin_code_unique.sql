@@ -0,0 +1,22 @@
+-- Уникальный индекс по PIN-коду игрока: привязка Telegram-бота выполняется одним
+-- UPDATE ... WHERE "pinCode" = $1 AND "telegramId" IS NULL и должна находить одну строку.
+-- Если в базе уже есть одинаковые PIN-коды, миграция прерывается — их нужно разнести
+-- вручную (у игроков, еще не привязавших Telegram, PIN можно сменить безопасно):
+--   SELECT "pinCode", count(*) FROM "Player" GROUP BY "pinCode" HAVING count(*) > 1;
+
+DO $$
+DECLARE
+    duplicates integer;
+BEGIN
+    SELECT count(*) INTO duplicates
+    FROM (SELECT 1 FROM "Player" GROUP BY "pinCode" HAVING count(*) > 1) d;
+    IF duplicates > 0 THEN
+        RAISE EXCEPTION 'Player.pinCode: повторяющихся PIN-кодов — %, уникальный индекс Player_pinCode_unique не создан', duplicates
+            USING HINT = 'SELECT "pinCode", count(*) FROM "Player" GROUP BY "pinCode" HAVING count(*) > 1';
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS "Player_pinCode_unique" ON "Player" ("pinCode");
+
+-- Обычный индекс из 0037 больше не нужен
+DROP INDEX IF EXISTS "idx_player_pin_code";
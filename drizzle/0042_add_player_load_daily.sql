@@ -0,0 +1,32 @@
+-- Дневная тренировочная нагрузка игроков по RPE опросам (sRPE = RPE × минуты).
+-- Таблицу целиком по клубу пересчитывает python -m uteam_bot.loads (uteam_bot_writer);
+-- определения метрик совпадают с RPESurveyAnalysis.tsx.
+
+CREATE TABLE IF NOT EXISTS "PlayerLoadDaily" (
+    "playerId" uuid NOT NULL,
+    "teamId" uuid,
+    "clubId" uuid NOT NULL,
+    "date" date NOT NULL,
+    "dailyLoad" real NOT NULL,
+    "sessions" smallint NOT NULL,
+    "weeklyLoad" real NOT NULL,
+    "monotony" real,
+    "strain" real,
+    "acwr" real,
+    "acuteEwma" real NOT NULL,
+    "chronicEwma" real NOT NULL,
+    "acwrEwma" real,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL,
+    PRIMARY KEY ("playerId", "date")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_player_load_daily_club_date" ON "PlayerLoadDaily"("clubId", "date");
+CREATE INDEX IF NOT EXISTS "idx_player_load_daily_team_date" ON "PlayerLoadDaily"("teamId", "date");
+
+GRANT SELECT ON "PlayerLoadDaily" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, DELETE ON "PlayerLoadDaily" TO uteam_bot_writer;
+    END IF;
+END $$;
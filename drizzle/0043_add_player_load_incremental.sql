@@ -0,0 +1,82 @@
+-- Инкрементальный пересчет PlayerLoadDaily (python -m uteam_bot.loads --incremental).
+-- Новые ответы RPE находятся по водяному знаку на "createdAt" (по клубу), а правки
+-- и удаления ответов и перенос тренировок записываются триггерами в PlayerLoadChange:
+-- воркер пересчитывает только затронутые дни затронутых игроков.
+
+CREATE TABLE IF NOT EXISTS "PlayerLoadWatermark" (
+    "clubId" uuid PRIMARY KEY NOT NULL,
+    "createdAt" timestamp with time zone NOT NULL,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS "PlayerLoadChange" (
+    "id" bigserial PRIMARY KEY NOT NULL,
+    "clubId" uuid NOT NULL,
+    "playerId" uuid NOT NULL,
+    "date" date NOT NULL,
+    "changedAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+-- Поиск новых ответов клуба после водяного знака
+CREATE INDEX IF NOT EXISTS "idx_rpe_survey_response_tenant_created" ON "RPESurveyResponse"("tenantId", "createdAt");
+
+-- День ответа в таймзоне команды — как в uteam_bot.loads.RESPONSES_QUERY
+CREATE OR REPLACE FUNCTION player_load_day(training_id uuid, created_at timestamptz, player_id uuid) RETURNS date
+LANGUAGE sql STABLE AS $$
+    SELECT COALESCE(
+        (SELECT bot_safe_date(tr."date") FROM "Training" tr WHERE tr."id" = training_id),
+        (created_at AT TIME ZONE COALESCE(
+            (SELECT z."name" FROM "Player" p
+             JOIN "Team" t ON t."id" = p."teamId"
+             JOIN pg_timezone_names z ON z."name" = t."timezone"
+             WHERE p."id" = player_id),
+            'Europe/Moscow'))::date
+    )
+$$;
+
+-- Правка или удаление ответа: затронуты старый и новый день игрока
+CREATE OR REPLACE FUNCTION player_load_response_trigger() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    INSERT INTO "PlayerLoadChange" ("clubId", "playerId", "date")
+    VALUES (OLD."tenantId", OLD."playerId", player_load_day(OLD."trainingId", OLD."createdAt", OLD."playerId"));
+    IF TG_OP = 'UPDATE' THEN
+        INSERT INTO "PlayerLoadChange" ("clubId", "playerId", "date")
+        VALUES (NEW."tenantId", NEW."playerId", player_load_day(NEW."trainingId", NEW."createdAt", NEW."playerId"));
+        RETURN NEW;
+    END IF;
+    RETURN OLD;
+END $$;
+
+-- Перенос тренировки: ответы переезжают на другой день
+CREATE OR REPLACE FUNCTION player_load_training_trigger() RETURNS trigger
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    INSERT INTO "PlayerLoadChange" ("clubId", "playerId", "date")
+    SELECT r."tenantId", r."playerId", d."date"
+    FROM "RPESurveyResponse" r
+    CROSS JOIN LATERAL (VALUES (bot_safe_date(OLD."date")), (bot_safe_date(NEW."date"))) d("date")
+    WHERE r."trainingId" = NEW."id" AND d."date" IS NOT NULL;
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS "player_load_response" ON "RPESurveyResponse";
+CREATE TRIGGER "player_load_response"
+    AFTER UPDATE OF "rpeScore", "durationMinutes", "trainingId", "playerId", "tenantId" OR DELETE
+    ON "RPESurveyResponse"
+    FOR EACH ROW EXECUTE FUNCTION player_load_response_trigger();
+
+DROP TRIGGER IF EXISTS "player_load_training" ON "Training";
+CREATE TRIGGER "player_load_training"
+    AFTER UPDATE OF "date" ON "Training"
+    FOR EACH ROW WHEN (OLD."date" IS DISTINCT FROM NEW."date")
+    EXECUTE FUNCTION player_load_training_trigger();
+
+GRANT SELECT ON "PlayerLoadWatermark", "PlayerLoadChange" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, UPDATE ON "PlayerLoadWatermark" TO uteam_bot_writer;
+        GRANT SELECT, DELETE ON "PlayerLoadChange" TO uteam_bot_writer;
+    END IF;
+END $$;
@@ -0,0 +1,64 @@
+-- Готовность игроков по утренним опросам (python -m uteam_bot.wellness, uteam_bot_writer).
+-- PlayerWellnessDaily: ответ дня, z-оценки относительно личной базы за 28 предыдущих дней
+-- и сводный индекс готовности; TeamWellnessDaily: распределение индекса по команде за день.
+
+CREATE TABLE IF NOT EXISTS "PlayerWellnessDaily" (
+    "playerId" uuid NOT NULL,
+    "teamId" uuid,
+    "clubId" uuid NOT NULL,
+    "date" date NOT NULL,
+    "sleepDuration" real NOT NULL,
+    "sleepQuality" smallint NOT NULL,
+    "recovery" smallint NOT NULL,
+    "mood" smallint NOT NULL,
+    "muscleCondition" smallint NOT NULL,
+    "baselineDays" smallint NOT NULL,
+    "zSleepDuration" real,
+    "zSleepQuality" real,
+    "zRecovery" real,
+    "zMood" real,
+    "zMuscleCondition" real,
+    "readiness" real,
+    "readinessScore" smallint,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL,
+    PRIMARY KEY ("playerId", "date")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_player_wellness_daily_club_date" ON "PlayerWellnessDaily"("clubId", "date");
+CREATE INDEX IF NOT EXISTS "idx_player_wellness_daily_team_date" ON "PlayerWellnessDaily"("teamId", "date");
+
+CREATE TABLE IF NOT EXISTS "TeamWellnessDaily" (
+    "teamId" uuid NOT NULL,
+    "clubId" uuid NOT NULL,
+    "date" date NOT NULL,
+    "players" smallint NOT NULL,
+    "scored" smallint NOT NULL,
+    "readinessMean" real,
+    "readinessP25" real,
+    "readinessMedian" real,
+    "readinessP75" real,
+    "flagged" smallint NOT NULL,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL,
+    PRIMARY KEY ("teamId", "date")
+);
+
+CREATE INDEX IF NOT EXISTS "idx_team_wellness_daily_club_date" ON "TeamWellnessDaily"("clubId", "date");
+
+-- Водяной знак потоковой обработки новых ответов
+CREATE TABLE IF NOT EXISTS "WellnessWatermark" (
+    "clubId" uuid PRIMARY KEY NOT NULL,
+    "createdAt" timestamp with time zone NOT NULL,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+-- Поиск новых ответов клуба после водяного знака
+CREATE INDEX IF NOT EXISTS "idx_morning_survey_response_tenant_created" ON "MorningSurveyResponse"("tenantId", "createdAt");
+
+GRANT SELECT ON "PlayerWellnessDaily", "TeamWellnessDaily", "WellnessWatermark" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, DELETE ON "PlayerWellnessDaily", "TeamWellnessDaily" TO uteam_bot_writer;
+        GRANT SELECT, INSERT, UPDATE ON "WellnessWatermark" TO uteam_bot_writer;
+    END IF;
+END $$;
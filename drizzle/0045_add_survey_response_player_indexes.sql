@@ -0,0 +1,7 @@
+-- Напоминания не ответившим (uteam_bot.scheduler.send_reminders): анти-join
+-- получателей волны с ответами игрока после начала дня или после отправки
+CREATE INDEX IF NOT EXISTS "idx_morning_survey_response_player_created" ON "MorningSurveyResponse"("playerId", "createdAt");
+CREATE INDEX IF NOT EXISTS "idx_rpe_survey_response_player_created" ON "RPESurveyResponse"("playerId", "createdAt");
+
+-- Волны рассылки за последние дни по журналу отправок
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_schedule_date" ON "BotDeliveryLog"("scheduleId", "localDate") WHERE "scheduleId" IS NOT NULL;
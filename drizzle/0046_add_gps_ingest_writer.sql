@@ -0,0 +1,10 @@
+-- Загрузка GPS отчетов (uteam_bot.gps_ingest): строки отчета заменяются целиком
+CREATE INDEX IF NOT EXISTS "idx_gps_report_data_report" ON "GpsReportData"("gpsReportId");
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, DELETE ON "GpsReportData" TO uteam_bot_writer;
+        GRANT SELECT, UPDATE ("ingestStatus", "ingestError", "errorMessage", "status", "isProcessed", "processedAt", "playersCount", "updatedAt") ON "GpsReport" TO uteam_bot_writer;
+    END IF;
+END $$;
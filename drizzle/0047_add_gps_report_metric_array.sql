@@ -0,0 +1,32 @@
+-- Колоночное хранилище GPS отчетов (python -m uteam_bot.gps_columns, uteam_bot.gps_ingest).
+-- Строка на отчет и метрику: значения всех игроков одним массивом double precision[]
+-- вместо строки GpsReportData с текстовым значением на каждого игрока.
+
+CREATE TABLE IF NOT EXISTS "GpsReportMetricArray" (
+    "gpsReportId" uuid NOT NULL,
+    "canonicalMetric" varchar(100) NOT NULL,
+    "clubId" uuid NOT NULL,
+    "teamId" uuid NOT NULL,
+    "eventType" varchar(50) NOT NULL,
+    "eventDate" date,
+    "unit" varchar(50) NOT NULL,
+    "playerIds" uuid[] NOT NULL,
+    "values" double precision[] NOT NULL,
+    "builtAt" timestamp with time zone DEFAULT now() NOT NULL,
+    PRIMARY KEY ("gpsReportId", "canonicalMetric")
+);
+
+-- Сезонные выборки метрики по клубу и команде
+CREATE INDEX IF NOT EXISTS "idx_gps_report_metric_array_club_metric_date" ON "GpsReportMetricArray"("clubId", "canonicalMetric", "eventDate");
+CREATE INDEX IF NOT EXISTS "idx_gps_report_metric_array_team_metric_date" ON "GpsReportMetricArray"("teamId", "canonicalMetric", "eventDate");
+
+-- Поиск отчетов с правками после построения массивов
+CREATE INDEX IF NOT EXISTS "idx_gps_data_change_log_report_changed" ON "GpsDataChangeLog"("reportId", "changedAt");
+
+GRANT SELECT ON "GpsReportMetricArray" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, DELETE ON "GpsReportMetricArray" TO uteam_bot_writer;
+    END IF;
+END $$;
@@ -0,0 +1,11 @@
+-- Пакетный пересчет игровых моделей (python -m uteam_bot.game_models, uteam_bot_writer)
+
+-- Отчеты матчей клуба, новые первыми
+CREATE INDEX IF NOT EXISTS "idx_gps_report_club_event_created" ON "GpsReport"("clubId", "eventType", "createdAt");
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, UPDATE, DELETE ON "PlayerGameModel" TO uteam_bot_writer;
+    END IF;
+END $$;
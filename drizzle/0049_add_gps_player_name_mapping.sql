@@ -0,0 +1,27 @@
+-- Подтвержденные сопоставления имен игроков GPS файлов (uteam_bot.name_matcher, uteam_bot.gps_ingest).
+-- Ключ — имя после транслитерации и нормализации, поэтому «Иванов И.» и «Ivanov I.»
+-- одной GPS системы клуба попадают в одну строку.
+
+CREATE TABLE IF NOT EXISTS "GpsPlayerNameMapping" (
+    "clubId" uuid NOT NULL,
+    "gpsSystem" varchar(100) NOT NULL,
+    "nameKey" varchar(255) NOT NULL,
+    "filePlayerName" varchar(255) NOT NULL,
+    "playerId" uuid NOT NULL,
+    "confirmedAt" timestamp with time zone DEFAULT now() NOT NULL,
+    PRIMARY KEY ("clubId", "gpsSystem", "nameKey")
+);
+
+-- Сопоставления удаленного игрока
+CREATE INDEX IF NOT EXISTS "idx_gps_player_name_mapping_player" ON "GpsPlayerNameMapping"("playerId");
+
+-- Состав клуба для индекса имен
+CREATE INDEX IF NOT EXISTS "idx_player_team" ON "Player"("teamId");
+
+GRANT SELECT ON "GpsPlayerNameMapping" TO uteam_bot_reader;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'uteam_bot_writer') THEN
+        GRANT SELECT, INSERT, UPDATE ON "GpsPlayerNameMapping" TO uteam_bot_writer;
+    END IF;
+END $$;
@@ -0,0 +1,4 @@
+-- История отправок команды (GET /deliveries?teamId=...): фильтр по "createdAt" и
+-- ORDER BY "createdAt" DESC LIMIT читают индекс без сортировки, как у игрока и telegramId.
+-- Индекс ("teamId", "localDate") остается для выборок по дате команды.
+CREATE INDEX IF NOT EXISTS "idx_bot_delivery_log_team_created" ON "BotDeliveryLog"("teamId", "createdAt" DESC);
@@ -0,0 +1,44 @@
+-- SQL-скрипт для создания пользователя, через которого Telegram-бот пишет в базу
+-- Выполняется от имени суперпользователя (cloudadmin/postgres)
+-- uteam_bot_reader остается только на чтение; writer получает минимум прав на запись
+
+-- Создание пользователя для записи
+CREATE USER uteam_bot_writer WITH PASSWORD 'CHANGE_ME';
+
+-- Предоставление прав подключения к базе данных
+GRANT CONNECT ON DATABASE uteam TO uteam_bot_writer;
+
+-- Предоставление прав использования схемы public
+GRANT USAGE ON SCHEMA public TO uteam_bot_writer;
+
+-- Журнал отправок: только добавление строк
+GRANT INSERT ON "BotDeliveryLog" TO uteam_bot_writer;
+
+-- Сдвиг ежедневных расписаний на следующий день (drizzle/0038_add_bot_schedule_fire.sql)
+GRANT SELECT, UPDATE ("fireAt", "updatedAt") ON "BotScheduleFire" TO uteam_bot_writer;
+
+-- Статусы RPE расписаний: закрытие просроченных и отметка разосланных
+-- (drizzle/0039_bot_expire_rpe_schedules.sql, drizzle/0040_bot_mark_rpe_schedules_sent.sql)
+GRANT SELECT ON "Team", "Training", "Match", "RPESchedule", "RPEScheduleMatch" TO uteam_bot_writer;
+GRANT UPDATE ("status", "sentAt", "updatedAt") ON "RPESchedule", "RPEScheduleMatch" TO uteam_bot_writer;
+
+-- Тренировочная нагрузка: пересчет строк клуба (drizzle/0042_add_player_load_daily.sql)
+GRANT SELECT, INSERT, DELETE ON "PlayerLoadDaily" TO uteam_bot_writer;
+-- Инкрементальный пересчет (drizzle/0043_add_player_load_incremental.sql)
+GRANT SELECT, INSERT, UPDATE ON "PlayerLoadWatermark" TO uteam_bot_writer;
+GRANT SELECT, DELETE ON "PlayerLoadChange" TO uteam_bot_writer;
+-- Готовность по утренним опросам (drizzle/0044_add_wellness_readiness.sql)
+GRANT SELECT, INSERT, DELETE ON "PlayerWellnessDaily", "TeamWellnessDaily" TO uteam_bot_writer;
+GRANT SELECT, INSERT, UPDATE ON "WellnessWatermark" TO uteam_bot_writer;
+-- Загрузка GPS отчетов (drizzle/0046_add_gps_ingest_writer.sql)
+GRANT SELECT, INSERT, DELETE ON "GpsReportData" TO uteam_bot_writer;
+GRANT SELECT, UPDATE ("ingestStatus", "ingestError", "errorMessage", "status", "isProcessed", "processedAt", "playersCount", "updatedAt") ON "GpsReport" TO uteam_bot_writer;
+-- Колоночная копия GPS отчетов (drizzle/0047_add_gps_report_metric_array.sql)
+GRANT SELECT, INSERT, DELETE ON "GpsReportMetricArray" TO uteam_bot_writer;
+-- Игровые модели (drizzle/0048_add_game_model_batch_writer.sql)
+GRANT SELECT, INSERT, UPDATE, DELETE ON "PlayerGameModel" TO uteam_bot_writer;
+-- Подтвержденные сопоставления имен игроков GPS (drizzle/0049_add_gps_player_name_mapping.sql)
+GRANT SELECT, INSERT, UPDATE ON "GpsPlayerNameMapping" TO uteam_bot_writer;
+
+-- Проверка созданных прав
+\du uteam_bot_writer
@@ -36,6 +36,7 @@ export async function POST(req: NextRequest) {
     type,
     rpeScore,
     trainingId,
+    durationMinutes,
   } = body;
 
   if (!surveyId || !tenantId || !playerId) {
@@ -69,6 +70,11 @@ export async function POST(req: NextRequest) {
           lte(rpeSurveyResponse.createdAt, endOfDay)
         ))
         .limit(1);
+      // Длительность: из запроса, иначе из прежнего ответа игрока за сегодня
+      let sessionMinutes: number | null = Number(durationMinutes) > 0 ? Math.round(Number(durationMinutes)) : null;
+      if (sessionMinutes === null && existing?.durationMinutes > 0) {
+        sessionMinutes = existing.durationMinutes;
+      }
       if (existing) {
         await db.delete(rpeSurveyResponse).where(eq(rpeSurveyResponse.id, existing.id));
       }
@@ -76,6 +82,7 @@ export async function POST(req: NextRequest) {
       const [createdResponse]: any = await db.insert(rpeSurveyResponse).values({
         id: uuidv4(),
         rpeScore,
+        durationMinutes: sessionMinutes,
         playerId,
         surveyId,
         tenantId,
@@ -90,7 +97,14 @@ export async function POST(req: NextRequest) {
           await fetch('http://<IP_бота>:8080/send-survey-success', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ telegramId: foundPlayer.telegramId, language: lang })
+            // Значения ответа: бот дополняет подтверждение трендом нагрузки из своего кэша
+            body: JSON.stringify({
+              telegramId: foundPlayer.telegramId,
+              language: lang,
+              surveyType: 'rpe',
+              rpeScore,
+              durationMinutes: createdResponse.durationMinutes,
+            })
           });
         } catch (e) {
           console.error('[SURVEY_RESPONSE_POST] Ошибка отправки Telegram-уведомления:', e);
@@ -163,7 +177,17 @@ export async function POST(req: NextRequest) {
         await fetch('http://<IP_бота>:8080/send-survey-success', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ telegramId: foundPlayer.telegramId, language: lang })
+          // Значения ответа: бот считает по ним готовность относительно личной базы из своего кэша
+          body: JSON.stringify({
+            telegramId: foundPlayer.telegramId,
+            language: lang,
+            surveyType: 'morning',
+            sleepDuration,
+            sleepQuality,
+            recovery,
+            mood,
+            muscleCondition,
+          })
         });
       } catch (e) {
         console.error('[SURVEY_RESPONSE_POST] Ошибка отправки Telegram-уведомления:', e);
@@ -175,11 +175,21 @@ export async function POST(req: NextRequest, { params }: { params: { id: string
     createdAt: now,
     updatedAt: now,
   };
-  try {
-    await db.insert(player).values(playerData);
-    return new Response(JSON.stringify({ player: playerData }), { status: 201 });
-  } catch (e) {
-    return new Response(JSON.stringify({ error: 'Failed to create player', details: String(e) }), { status: 500 });
+  // PIN-код уникален (Player_pinCode_unique): при совпадении сгенерированный PIN создается заново
+  for (let attempt = 1; ; attempt++) {
+    try {
+      await db.insert(player).values(playerData);
+      return new Response(JSON.stringify({ player: playerData }), { status: 201 });
+    } catch (e: any) {
+      if (!data.pinCode && e?.code === '23505' && e?.constraint === 'Player_pinCode_unique' && attempt < 5) {
+        playerData.pinCode = generateRandomPinCode();
+        continue;
+      }
+      if (e?.code === '23505' && e?.constraint === 'Player_pinCode_unique') {
+        return new Response(JSON.stringify({ error: 'PIN code already in use' }), { status: 409 });
+      }
+      return new Response(JSON.stringify({ error: 'Failed to create player', details: String(e) }), { status: 500 });
+    }
   }
 }
 
@@ -40,7 +40,7 @@ interface RPESchedule {
   id?: string;
   trainingId: string;
   scheduledTime: string;
-  status: 'scheduled' | 'sent' | 'cancelled';
+  status: 'scheduled' | 'sent' | 'cancelled' | 'expired';
   sentAt?: string;
 }
 
@@ -72,7 +72,7 @@ export function RPESchedulingModal({
   const [tempTimes, setTempTimes] = useState<Record<string, string>>({});
   // Матчи и их расписания
   const [matches, setMatches] = useState<Array<{ id: string; date: string; time: string; opponentName: string; status: string }>>([]);
-  const [matchSchedules, setMatchSchedules] = useState<Record<string, { id?: string; matchId: string; scheduledTime: string; status: 'scheduled'|'sent'|'cancelled'; sentAt?: string }>>({});
+  const [matchSchedules, setMatchSchedules] = useState<Record<string, { id?: string; matchId: string; scheduledTime: string; status: 'scheduled'|'sent'|'cancelled'|'expired'; sentAt?: string }>>({});
   
   // Фильтры дат
   const [startDate, setStartDate] = useState(() => {
@@ -303,6 +303,8 @@ export function RPESchedulingModal({
         return <AlertCircle className="h-4 w-4 text-yellow-400" />;
       case 'cancelled':
         return <XCircle className="h-4 w-4 text-red-400" />;
+      case 'expired':
+        return <XCircle className="h-4 w-4 text-gray-400" />;
       default:
         return <XCircle className="h-4 w-4 text-gray-400" />;
     }
@@ -319,6 +321,8 @@ export function RPESchedulingModal({
         return `Запланирован на ${schedule.scheduledTime}`;
       case 'cancelled':
         return 'Отменен';
+      case 'expired':
+        return 'Не отправлен (прошел)';
       default:
         return 'Не настроен';
     }
@@ -0,0 +1,18 @@
+import { pgTable, uuid, varchar, text, timestamp, integer, bigint } from 'drizzle-orm/pg-core';
+
+// Append-only журнал отправок Telegram-бота (пишет uteam_bot_writer)
+export const botDeliveryLog = pgTable('BotDeliveryLog', {
+  id: uuid('id').primaryKey().defaultRandom(),
+  scheduleId: uuid('scheduleId'), // null для ручной отправки
+  playerId: uuid('playerId'),
+  teamId: uuid('teamId'),
+  telegramId: bigint('telegramId', { mode: 'number' }).notNull(),
+  surveyType: varchar('surveyType', { length: 32 }).notNull(), // 'morning', 'rpe', 'rpe_match'
+  source: varchar('source', { length: 16 }).default('scheduler').notNull(), // 'scheduler', 'manual'
+  localDate: varchar('localDate', { length: 10 }).notNull(), // YYYY-MM-DD в таймзоне команды
+  outcome: varchar('outcome', { length: 16 }).notNull(), // 'sent', 'blocked', 'failed'
+  error: text('error'),
+  latencyMs: integer('latencyMs'),
+  messageId: bigint('messageId', { mode: 'number' }),
+  createdAt: timestamp('createdAt', { withTimezone: true }).defaultNow().notNull(),
+});
@@ -0,0 +1,13 @@
+import { pgTable, uuid, varchar, time, date, timestamp } from 'drizzle-orm/pg-core';
+
+// Ближайший момент срабатывания расписаний Telegram-бота (поддерживается триггерами, см. drizzle/0038)
+export const botScheduleFire = pgTable('BotScheduleFire', {
+  scheduleId: uuid('scheduleId').primaryKey(), // SurveySchedule / RPESchedule / RPEScheduleMatch
+  surveyType: varchar('surveyType', { length: 32 }).notNull(), // 'morning', 'rpe', 'rpe_match'
+  teamId: uuid('teamId').notNull(),
+  timezone: varchar('timezone', { length: 64 }).notNull(),
+  sendTime: time('sendTime').notNull(),
+  eventDate: date('eventDate'), // дата тренировки/матча; null для ежедневных расписаний
+  fireAt: timestamp('fireAt', { withTimezone: true }).notNull(), // UTC
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+});
@@ -0,0 +1,14 @@
+import { pgTable, uuid, varchar, timestamp, primaryKey } from 'drizzle-orm/pg-core';
+
+// Подтвержденные сопоставления имен игроков GPS файлов по клубу и GPS системе;
+// пишет и читает Python-загрузчик (uteam_bot.name_matcher, uteam_bot.gps_ingest)
+export const gpsPlayerNameMapping = pgTable('GpsPlayerNameMapping', {
+  clubId: uuid('clubId').notNull(),
+  gpsSystem: varchar('gpsSystem', { length: 100 }).notNull(),
+  nameKey: varchar('nameKey', { length: 255 }).notNull(), // имя после транслитерации и нормализации
+  filePlayerName: varchar('filePlayerName', { length: 255 }).notNull(),
+  playerId: uuid('playerId').notNull(),
+  confirmedAt: timestamp('confirmedAt', { withTimezone: true }).defaultNow().notNull(),
+}, (table) => ({
+  pk: primaryKey({ columns: [table.clubId, table.gpsSystem, table.nameKey] }),
+}));
@@ -0,0 +1,18 @@
+import { pgTable, uuid, varchar, date, doublePrecision, timestamp, primaryKey } from 'drizzle-orm/pg-core';
+
+// Колоночная копия GpsReportData: значения метрики всех игроков отчета одним массивом;
+// строится Python-воркером (uteam_bot.gps_columns) и при загрузке отчета (uteam_bot.gps_ingest)
+export const gpsReportMetricArray = pgTable('GpsReportMetricArray', {
+  gpsReportId: uuid('gpsReportId').notNull(),
+  canonicalMetric: varchar('canonicalMetric', { length: 100 }).notNull(),
+  clubId: uuid('clubId').notNull(),
+  teamId: uuid('teamId').notNull(),
+  eventType: varchar('eventType', { length: 50 }).notNull(),
+  eventDate: date('eventDate'), // дата тренировки или матча
+  unit: varchar('unit', { length: 50 }).notNull(), // каноническая единица
+  playerIds: uuid('playerIds').array().notNull(),
+  values: doublePrecision('values').array().notNull(), // в порядке playerIds
+  builtAt: timestamp('builtAt', { withTimezone: true }).defaultNow().notNull(),
+}, (table) => ({
+  pk: primaryKey({ columns: [table.gpsReportId, table.canonicalMetric] }),
+}));
@@ -36,8 +36,16 @@ export * from './userPermission.ts';
 export * from './gpsCanonicalMetric.ts';
 export * from './gpsReport.ts';
 export * from './gpsReportData.ts';
+export * from './gpsReportMetricArray.ts';
+export * from './gpsPlayerNameMapping.ts';
 export * from './gpsColumnMapping.ts';
 export * from './gpsPermissions.ts';
 export * from './gpsReportShare.ts';
 // Player Game Model schemas
-export * from './playerGameModel.ts';
\ No newline at end of file
+export * from './playerGameModel.ts';
+// Telegram bot schemas
+export * from './botDeliveryLog.ts';
+export * from './botScheduleFire.ts';
+// Training load schemas
+export * from './playerLoadDaily.ts';
+export * from './wellnessDaily.ts';
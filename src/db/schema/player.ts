@@ -1,4 +1,4 @@
-import { pgTable, uuid, varchar, text, timestamp, integer, bigint } from 'drizzle-orm/pg-core';
+import { pgTable, uuid, varchar, text, timestamp, integer, bigint, uniqueIndex } from 'drizzle-orm/pg-core';
 
 export const player = pgTable('Player', {
   id: uuid('id').primaryKey().defaultRandom(),
@@ -31,4 +31,7 @@ export const player = pgTable('Player', {
   format2: varchar('format2', { length: 32 }),
   formation2: varchar('formation2', { length: 32 }),
   positionIndex2: integer('positionIndex2'),
-}); 
\ No newline at end of file
+}, (table) => ({
+  // Привязка Telegram-бота по PIN-коду находит одного игрока (drizzle/0041)
+  pinCodeUnique: uniqueIndex('Player_pinCode_unique').on(table.pinCode),
+}));
@@ -0,0 +1,37 @@
+import { pgTable, uuid, date, real, smallint, timestamp, primaryKey, bigserial } from 'drizzle-orm/pg-core';
+
+// Дневная нагрузка игрока по RPE опросам; пересчитывается Python-воркером (uteam_bot.loads)
+export const playerLoadDaily = pgTable('PlayerLoadDaily', {
+  playerId: uuid('playerId').notNull(),
+  teamId: uuid('teamId'),
+  clubId: uuid('clubId').notNull(),
+  date: date('date').notNull(), // день в таймзоне команды
+  dailyLoad: real('dailyLoad').notNull(), // сумма sRPE за день, AU
+  sessions: smallint('sessions').notNull(),
+  weeklyLoad: real('weeklyLoad').notNull(), // сумма за 7 дней, заканчивающихся date
+  monotony: real('monotony'), // среднее / SD за 7 дней; null при SD = 0
+  strain: real('strain'), // weeklyLoad × monotony
+  acwr: real('acwr'), // weeklyLoad / среднее недельной нагрузки на D-7, D-14, D-21, D-28
+  acuteEwma: real('acuteEwma').notNull(),
+  chronicEwma: real('chronicEwma').notNull(),
+  acwrEwma: real('acwrEwma'), // acuteEwma / chronicEwma
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+}, (table) => ({
+  pk: primaryKey({ columns: [table.playerId, table.date] }),
+}));
+
+// Водяной знак инкрементального пересчета: ответы с createdAt позже уже не учтены
+export const playerLoadWatermark = pgTable('PlayerLoadWatermark', {
+  clubId: uuid('clubId').primaryKey(),
+  createdAt: timestamp('createdAt', { withTimezone: true }).notNull(),
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+});
+
+// Дни, затронутые правками ответов и переносом тренировок (заполняется триггерами, см. drizzle/0043)
+export const playerLoadChange = pgTable('PlayerLoadChange', {
+  id: bigserial('id', { mode: 'number' }).primaryKey(),
+  clubId: uuid('clubId').notNull(),
+  playerId: uuid('playerId').notNull(),
+  date: date('date').notNull(),
+  changedAt: timestamp('changedAt', { withTimezone: true }).defaultNow().notNull(),
+});
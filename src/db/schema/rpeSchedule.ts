@@ -5,7 +5,7 @@ export const rpeSchedule = pgTable('RPESchedule', {
   trainingId: uuid('trainingId').notNull(), // Связь с тренировкой
   teamId: uuid('teamId').notNull(), // Команда для быстрого поиска
   scheduledTime: time('scheduledTime').notNull(), // Время отправки опроса (например, "15:30")
-  status: varchar('status', { length: 20 }).default('scheduled').notNull(), // 'scheduled', 'sent', 'cancelled'
+  status: varchar('status', { length: 20 }).default('scheduled').notNull(), // 'scheduled', 'sent', 'cancelled', 'expired'
   recipientsConfig: text('recipientsConfig'), // JSON конфигурация получателей
   createdAt: timestamp('createdAt', { withTimezone: true }).defaultNow().notNull(),
   updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
@@ -5,7 +5,7 @@ export const rpeScheduleMatch = pgTable('RPEScheduleMatch', {
   matchId: uuid('matchId').notNull(),
   teamId: uuid('teamId').notNull(),
   scheduledTime: time('scheduledTime').notNull(),
-  status: varchar('status', { length: 20 }).default('scheduled').notNull(),
+  status: varchar('status', { length: 20 }).default('scheduled').notNull(), // 'scheduled', 'sent', 'cancelled', 'expired'
   recipientsConfig: text('recipientsConfig'),
   createdAt: timestamp('createdAt', { withTimezone: true }).defaultNow().notNull(),
   updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
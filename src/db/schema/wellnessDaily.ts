@@ -0,0 +1,49 @@
+import { pgTable, uuid, date, real, smallint, timestamp, primaryKey } from 'drizzle-orm/pg-core';
+
+// Готовность игрока по утреннему опросу; пересчитывается Python-воркером (uteam_bot.wellness)
+export const playerWellnessDaily = pgTable('PlayerWellnessDaily', {
+  playerId: uuid('playerId').notNull(),
+  teamId: uuid('teamId'),
+  clubId: uuid('clubId').notNull(),
+  date: date('date').notNull(), // день в таймзоне команды
+  sleepDuration: real('sleepDuration').notNull(),
+  sleepQuality: smallint('sleepQuality').notNull(),
+  recovery: smallint('recovery').notNull(),
+  mood: smallint('mood').notNull(),
+  muscleCondition: smallint('muscleCondition').notNull(),
+  baselineDays: smallint('baselineDays').notNull(), // ответов в базе за 28 предыдущих дней
+  zSleepDuration: real('zSleepDuration'), // null, пока в базе меньше 7 ответов
+  zSleepQuality: real('zSleepQuality'),
+  zRecovery: real('zRecovery'),
+  zMood: real('zMood'),
+  zMuscleCondition: real('zMuscleCondition'),
+  readiness: real('readiness'), // среднее z-оценок
+  readinessScore: smallint('readinessScore'), // 50 + 10 × readiness, 0..100
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+}, (table) => ({
+  pk: primaryKey({ columns: [table.playerId, table.date] }),
+}));
+
+// Распределение индекса готовности по команде за день
+export const teamWellnessDaily = pgTable('TeamWellnessDaily', {
+  teamId: uuid('teamId').notNull(),
+  clubId: uuid('clubId').notNull(),
+  date: date('date').notNull(),
+  players: smallint('players').notNull(), // ответивших
+  scored: smallint('scored').notNull(), // с индексом готовности
+  readinessMean: real('readinessMean'),
+  readinessP25: real('readinessP25'),
+  readinessMedian: real('readinessMedian'),
+  readinessP75: real('readinessP75'),
+  flagged: smallint('flagged').notNull(), // readiness <= -1
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+}, (table) => ({
+  pk: primaryKey({ columns: [table.teamId, table.date] }),
+}));
+
+// Водяной знак потоковой обработки: ответы с createdAt позже еще не учтены
+export const wellnessWatermark = pgTable('WellnessWatermark', {
+  clubId: uuid('clubId').primaryKey(),
+  createdAt: timestamp('createdAt', { withTimezone: true }).notNull(),
+  updatedAt: timestamp('updatedAt', { withTimezone: true }).defaultNow().notNull(),
+});
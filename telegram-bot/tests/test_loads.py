@@ -0,0 +1,86 @@
+"""compute_metrics против поштучного расчета по дням (определения RPESurveyAnalysis.tsx)"""
+
+import statistics
+from datetime import date
+
+import numpy as np
+
+from uteam_bot import loads
+
+
+def _daily(players=30, days=150, seed=5):
+    rng = np.random.default_rng(seed)
+    daily = np.where(rng.random((players, days)) < 0.55, rng.integers(1, 11, (players, days)) * 60.0, 0.0)
+    # Постоянная нагрузка: SD = 0, монотонность не определена
+    daily[0] = 300.0
+    # Игрок без сессий: все отношения не определены
+    daily[1] = 0.0
+    return daily
+
+
+def _window(row, day, size, lag=0):
+    """Нагрузки за size дней, заканчивающихся на lag дней раньше day; дни до матрицы — нули"""
+    return [row[d] if d >= 0 else 0.0 for d in range(day - lag - size + 1, day - lag + 1)]
+
+
+def _reference(row):
+    expected = []
+    acute = chronic = 0.0
+    for day, load in enumerate(row):
+        week = _window(row, day, 7)
+        weekly = sum(week)
+        sd = statistics.pstdev(week)
+        monotony = weekly / 7 / sd if sd > 0 else np.nan
+        chronic_load = sum(_window(row, day, 28, lag=7)) / 4
+        acute = loads.ACUTE_LAMBDA * load + (1 - loads.ACUTE_LAMBDA) * acute
+        chronic = loads.CHRONIC_LAMBDA * load + (1 - loads.CHRONIC_LAMBDA) * chronic
+        expected.append({
+            'weeklyLoad': weekly,
+            'monotony': monotony,
+            'strain': weekly * monotony,
+            'acwr': weekly / chronic_load if chronic_load > 0 else np.nan,
+            'acuteEwma': acute,
+            'chronicEwma': chronic,
+            'acwrEwma': acute / chronic if chronic > 0 else np.nan,
+        })
+    return expected
+
+
+def test_metrics_match_per_day_reference():
+    daily = _daily()
+    metrics = loads.compute_metrics(daily, (daily > 0).astype(np.int64))
+    for player, row in enumerate(daily.tolist()):
+        for day, expected in enumerate(_reference(row)):
+            for name, value in expected.items():
+                np.testing.assert_allclose(metrics[name][player, day], value, rtol=1e-9, atol=1e-6,
+                                           equal_nan=True, err_msg=f'{name} игрок {player} день {day}')
+
+
+def test_seeded_tail_matches_full_pass():
+    # Инкрементальный пересчет: EWMA с сохраненного состояния дня start - 1
+    daily = _daily(players=12, days=90, seed=9)
+    sessions = (daily > 0).astype(np.int64)
+    full = loads.compute_metrics(daily, sessions)
+    start = np.arange(12, dtype=np.int64) * 3 + loads.CONTEXT_DAYS
+    rows = np.arange(12)
+    seeded = loads.compute_metrics(
+        daily, sessions, start, full['acuteEwma'][rows, start - 1], full['chronicEwma'][rows, start - 1]
+    )
+    for player, first in enumerate(start.tolist()):
+        for name in full:
+            np.testing.assert_allclose(seeded[name][player, first:], full[name][player, first:],
+                                       rtol=1e-12, equal_nan=True)
+
+
+def test_rows_end_on_team_local_today():
+    # Ответы 1 и 2 марта; у команды east уже 3 марта, у west еще 2 марта
+    day = loads._today_day(date(2026, 3, 1))
+    responses = loads.Responses(
+        np.array(['club'] * 3, dtype=object), np.array(['p1', 'p2', 'p2'], dtype=object),
+        np.array(['east', 'west', 'west'], dtype=object),
+        np.array([day, day, day + 1], dtype=np.int64), np.array([300.0, 200.0, 100.0]),
+    )
+    columns, count = loads.club_loads(responses, {'east': day + 2, 'west': day + 1, '': day})
+    dates = {player: sorted(columns['date'][columns['playerId'] == player]) for player in ('p1', 'p2')}
+    assert dates == {'p1': ['2026-03-01', '2026-03-02', '2026-03-03'], 'p2': ['2026-03-01', '2026-03-02']}
+    assert count == 5
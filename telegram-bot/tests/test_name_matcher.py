@@ -0,0 +1,105 @@
+"""Индекс триграмм NameMatcher против полного перебора calculateSimilarity"""
+
+import random
+import uuid
+
+from uteam_bot import db
+from uteam_bot import name_matcher as nm
+
+FIRST = ['Иван', 'Пётр', 'Алексей', 'Дмитрий', 'Сергей', 'Андрей', 'Максим', 'Артём', 'Никита', 'Егор',
+         'Кирилл', 'Михаил', 'Роман', 'Илья', 'Даниил']
+LAST = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов', 'Михайлов',
+        'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семенов', 'Егоров', 'Павлов',
+        'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров', 'Никитин', 'Захаров', 'Зайцев']
+
+
+def _roster(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        {'id': str(uuid.UUID(int=rng.getrandbits(128))), 'firstName': rng.choice(FIRST),
+         'lastName': rng.choice(LAST) + rng.choice(['', '', 'ский', 'ин'])}
+        for _ in range(count)
+    ]
+
+
+def _file_names(players, count, seed=2):
+    rng = random.Random(seed)
+    names = []
+    for player in rng.sample(players, count):
+        last, first = nm.name_key(player['lastName']), nm.name_key(player['firstName'])
+        names.append(rng.choice([
+            f"{last.title()} {first[0].upper()}.", f"{first.title()} {last.title()}",
+            f"{player['lastName']} {player['firstName']}", last.upper(), f"{last.title()} {first[:3].title()}",
+        ]))
+    return names
+
+
+def test_best_score_matches_brute_force():
+    players = _roster(2000)
+    matcher = nm.NameMatcher(players)
+    for name in _file_names(players, 300):
+        words = tuple(nm.name_key(name).split())
+        brute = max(max(nm.similarity(words, variant) for variant in variants) for variants in matcher.variants)
+        found = matcher.candidates(name)
+        assert (found[0].similarity if found else 0) == brute, name
+
+
+def test_similarity_examples():
+    assert nm.similarity(('petrov', 'i'), ('petrov', 'ivan')) == 90
+    assert nm.similarity(('ivan', 'petrov'), ('ivan', 'sidorov')) == 50
+    assert nm.similarity(('ivanov',), ('petrov',)) == 0
+    assert nm.name_key('Семён  Иванов-Петров') == 'semen ivanovpetrov'
+    assert nm.name_key('Ivanov I.') == nm.name_key('IVANOV  I')
+
+
+def test_resolve_transliterated_and_ambiguous():
+    players = [
+        {'id': 'p1', 'firstName': 'Иван', 'lastName': 'Иванов'},
+        {'id': 'p2', 'firstName': 'Пётр', 'lastName': 'Петров'},
+        {'id': 'p3', 'firstName': 'Павел', 'lastName': 'Петров'},
+    ]
+    matcher = nm.NameMatcher(players)
+    assert matcher.resolve('Ivanov Ivan') == 'p1'
+    assert matcher.resolve('Иванов И.') == 'p1'
+    # Два Петрова с равной оценкой: без подтверждения не сопоставляется
+    assert matcher.resolve('Petrov P.') is None
+    assert matcher.confirm('Petrov P.', 'p3') is not None
+    assert matcher.resolve('PETROV P') == 'p3'
+
+
+def test_confirm_rejects_players_outside_roster():
+    matcher = nm.NameMatcher([{'id': 'p1', 'firstName': 'Иван', 'lastName': 'Иванов'}])
+    assert matcher.confirm('Ghost', 'p9') is None
+    assert matcher.confirm('', 'p1') is None
+    cached = nm.NameMatcher([{'id': 'p1', 'firstName': 'Иван', 'lastName': 'Иванов'}], {'ghost': 'p9'})
+    assert cached.resolve('Ghost') is None
+
+
+def test_save_collapses_duplicate_keys(monkeypatch):
+    executed = []
+
+    class Cursor:
+        rowcount = 1
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, query, params):
+            executed.append(params)
+
+    class Connection:
+        closed = False
+
+        def cursor(self):
+            return Cursor()
+
+        def commit(self):
+            pass
+
+    monkeypatch.setattr(db, 'get_writer_connection', lambda: Connection())
+    rows = [('ivanov i', 'Ivanov I.', 'p1'), ('ivanov i', 'IVANOV I', 'p2')]
+    db.save_gps_name_mappings('club', 'system', rows)
+    assert executed[0]['keys'] == ['ivanov i'] and executed[0]['players'] == ['p2']
@@ -0,0 +1,105 @@
+"""AttemptLimiter и ответы атомарной привязки по PIN-коду на заглушке подключения"""
+
+import psycopg2.errors
+import pytest
+
+from uteam_bot import db
+from uteam_bot import limiter as lim
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lim.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_per_key_window(clock):
+    limiter = lim.AttemptLimiter(per_key=3, key_window=600, global_limit=100, global_window=60)
+    for _ in range(3):
+        assert limiter.allow(1) == (True, 0)
+        clock[0] += 10
+    allowed, retry_after = limiter.allow(1)
+    assert not allowed and retry_after == pytest.approx(570)
+    # Другой пользователь не затронут, отклоненная попытка не продлевает окно
+    assert limiter.allow(2)[0]
+    clock[0] = 1000.0 + 600
+    assert limiter.allow(1)[0]
+    assert limiter.rejected == 1
+
+
+def test_global_window(clock):
+    limiter = lim.AttemptLimiter(per_key=5, key_window=600, global_limit=3, global_window=60)
+    for key in range(3):
+        assert limiter.allow(key)[0]
+        clock[0] += 5
+    allowed, retry_after = limiter.allow(99)
+    assert not allowed and retry_after == pytest.approx(45)
+    clock[0] = 1000.0 + 60
+    assert limiter.allow(99)[0]
+
+
+def test_reset_and_purge(clock):
+    limiter = lim.AttemptLimiter(per_key=1, key_window=600, global_limit=100, global_window=60)
+    assert limiter.allow(1)[0]
+    assert not limiter.allow(1)[0]
+    limiter.reset(1)
+    assert limiter.allow(1)[0]
+    assert limiter.allow(2)[0]
+    clock[0] += 601
+    limiter.allow(3)
+    # Ключи с истекшим окном удаляются, словарь не растет с числом пользователей
+    assert len(limiter) == 1
+
+
+class _Cursor:
+    def __init__(self, result, executed):
+        self.result, self.executed = result, executed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.executed.append((query, params))
+        if isinstance(self.result, Exception):
+            raise self.result
+
+    def fetchone(self):
+        return self.result
+
+
+class _Connection:
+    closed = False
+
+    def __init__(self, result, executed):
+        self.result, self.executed = result, executed
+        self.commits = 0
+
+    def cursor(self, cursor_factory=None):
+        return _Cursor(self.result, self.executed)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.parametrize('result, expected', [
+    ({'telegramBound': False, 'found': True, 'bound': True}, (True, "Успешно привязано")),
+    ({'telegramBound': True, 'found': True, 'bound': False},
+     (False, "Этот Telegram аккаунт уже привязан к другому игроку")),
+    ({'telegramBound': False, 'found': False, 'bound': False}, (False, "PIN-код не найден")),
+    ({'telegramBound': False, 'found': True, 'bound': False},
+     (False, "Этот PIN-код уже привязан к другому Telegram аккаунту")),
+    (psycopg2.errors.UniqueViolation('duplicate key'),
+     (False, "Этот Telegram аккаунт уже привязан к другому игроку")),
+])
+def test_bind_is_one_statement(monkeypatch, result, expected):
+    executed, released = [], []
+    connection = _Connection(result, executed)
+    monkeypatch.setattr(db, 'get_db_connection', lambda: connection)
+    monkeypatch.setattr(db, 'release_connection', released.append)
+    assert db.bind_telegram_to_player('123456', '42', 'en') == expected
+    assert executed == [(db.BIND_TELEGRAM_QUERY, {'pin': '123456', 'telegram_id': '42', 'language': 'en'})]
+    assert released == [connection]
@@ -0,0 +1,221 @@
+"""Окно BotScheduleFire, отметка RPE расписаний и волны напоминаний на заглушках db и data"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import psycopg2.errors
+import pytest
+import pytz
+
+from uteam_bot import data, db
+from uteam_bot import scheduler as sch
+
+START = datetime(2026, 3, 2, 5, 0, tzinfo=pytz.utc)
+
+
+class Clock(datetime):
+    """datetime модуля scheduler с управляемым now()"""
+
+    current = START
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current if tz is not None else cls.current.replace(tzinfo=None)
+
+
+class FireTable:
+    """Заглушка fetch_due_schedules и advance_schedule_fire"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.fetched = []
+        self.advanced = []
+        self.fail = None
+
+    def fetch(self, since, until, survey_types):
+        self.fetched.append((since, until))
+        if self.fail is not None:
+            raise self.fail
+        return [row for row in self.rows if since < row['fireAt'] <= until]
+
+    def advance(self, until):
+        self.advanced.append(until)
+        return 0
+
+
+@pytest.fixture
+def fire_table(monkeypatch):
+    table = FireTable()
+    Clock.current = START
+    monkeypatch.setattr(sch, 'datetime', Clock)
+    monkeypatch.setattr(db, 'writer_enabled', lambda: True)
+    monkeypatch.setattr(db, 'fetch_due_schedules', table.fetch)
+    monkeypatch.setattr(db, 'advance_schedule_fire', table.advance)
+    return table
+
+
+def _index():
+    return sch.ScheduleIndex(('morning', 'rpe', 'rpe_match'))
+
+
+def _fire(minutes, schedule_id='s1', survey_type='morning', timezone='Europe/Moscow'):
+    return {'id': schedule_id, 'surveyType': survey_type, 'timezone': timezone,
+            'fireAt': START + timedelta(minutes=minutes)}
+
+
+def test_first_tick_catches_up_and_next_tick_continues(fire_table):
+    index = _index()
+    index.refresh()
+    assert fire_table.fetched == [(START - sch.MAX_CATCH_UP, START)]
+    assert fire_table.advanced == [START] and index.window_end == START
+
+    Clock.current = START + timedelta(minutes=1)
+    index.refresh()
+    assert fire_table.fetched[-1] == (START, Clock.current)
+
+
+def test_window_is_capped_after_a_long_pause(fire_table):
+    index = _index()
+    index.refresh()
+    Clock.current = START + timedelta(hours=1)
+    index.refresh()
+    assert fire_table.fetched[-1] == (Clock.current - sch.MAX_CATCH_UP, Clock.current)
+
+
+def test_failed_fetch_keeps_the_window(fire_table):
+    index = _index()
+    index.refresh()
+    fire_table.fail = psycopg2.OperationalError('нет подключения')
+    Clock.current = START + timedelta(minutes=1)
+    with pytest.raises(psycopg2.OperationalError):
+        index.refresh()
+    assert index.window_end == START and index.due_rows == [] and len(fire_table.advanced) == 1
+
+    fire_table.fail = None
+    Clock.current = START + timedelta(minutes=2)
+    index.refresh()
+    assert fire_table.fetched[-1] == (START, Clock.current)
+
+
+def test_warm_up_prime_does_not_consume_the_window(fire_table):
+    # Расписание сработало за минуту до перезапуска и еще не разослано
+    fire_table.rows = [_fire(-1)]
+    index = _index()
+    assert index.prime() == 1
+    assert fire_table.advanced == [] and index.window_end is None and list(index.due()) == []
+
+    Clock.current = START + timedelta(seconds=50)
+    index.refresh()
+    assert [schedule['id'] for schedule, _ in index.due()] == ['s1']
+    assert fire_table.advanced == [Clock.current]
+
+
+def test_due_uses_team_local_fire_time(fire_table):
+    fire_table.rows = [_fire(-1, timezone='Asia/Yekaterinburg')]
+    index = _index()
+    index.refresh()
+    [(schedule, local)] = list(index.due())
+    assert local.strftime('%Y-%m-%d %H:%M') == '2026-03-02 09:59'
+
+
+def test_missing_fire_table_falls_back_to_full_load(fire_table, monkeypatch):
+    fire_table.fail = psycopg2.errors.UndefinedTable('relation "BotScheduleFire" does not exist')
+    monkeypatch.setattr(db, 'fetch_survey_schedules', lambda survey_types: [
+        {'id': 'm1', 'teamId': 't1', 'enabled': True, 'sendTime': '08:00', 'timezone': 'Europe/Moscow'},
+        {'id': 'm2', 'teamId': 't2', 'enabled': False, 'sendTime': '08:00', 'timezone': 'Europe/Moscow'},
+    ])
+    index = _index()
+    assert index.refresh() == 2
+    assert index.mode == 'full' and not index.fire_table
+    assert [s['id'] for s in index.by_timezone['Europe/Moscow']['08:00']] == ['m1']
+
+
+def _state():
+    return SimpleNamespace(
+        sent_schedules={'rpe': set(), 'rpe_match': set()}, expired_schedules=0,
+        reminder_window_end=None, reminders_sent=0, ledger=SimpleNamespace(wake=lambda: None),
+    )
+
+
+def test_mark_sent_keeps_ids_after_failed_update(monkeypatch):
+    state = _state()
+    state.sent_schedules['rpe'].update({'r1', 'r2'})
+    monkeypatch.setattr(db, 'writer_enabled', lambda: True)
+
+    async def fail(ids_by_type):
+        raise psycopg2.OperationalError('нет подключения')
+
+    monkeypatch.setattr(data, 'mark_schedules_sent', fail)
+    asyncio.run(sch.mark_schedules_sent(state))
+    assert state.sent_schedules['rpe'] == {'r1', 'r2'}
+
+    calls = []
+
+    async def mark(ids_by_type):
+        calls.append({survey_type: sorted(ids) for survey_type, ids in ids_by_type.items()})
+        return {survey_type: len(ids) for survey_type, ids in ids_by_type.items()}
+
+    monkeypatch.setattr(data, 'mark_schedules_sent', mark)
+    asyncio.run(sch.mark_schedules_sent(state))
+    # Пустые типы не отправляются, один UPDATE на таблицу
+    assert calls == [{'rpe': ['r1', 'r2']}]
+    assert state.sent_schedules == {'rpe': set(), 'rpe_match': set()}
+
+
+def test_expired_schedules_are_counted(monkeypatch):
+    state = _state()
+    results = iter([{'rpe': 2, 'rpe_match': 1}, psycopg2.OperationalError('нет подключения')])
+
+    async def expire():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(data, 'expire_stale_schedules', expire)
+    asyncio.run(sch.expire_stale_schedules(state))
+    asyncio.run(sch.expire_stale_schedules(state))
+    assert state.expired_schedules == 3
+
+
+def test_reminder_waves_advance_the_window_only_on_success(monkeypatch):
+    Clock.current = START
+    monkeypatch.setattr(sch, 'datetime', Clock)
+    config = SimpleNamespace(reminder_offsets_minutes=[60, 180], survey_base_url='https://example.test')
+    state = _state()
+    windows, delivered = [], defaultdict(list)
+    recipient = {
+        'id': 'p1', 'telegramId': 100, 'clubId': 'c1', 'teamId': 't1', 'scheduleId': 's1',
+        'surveyType': 'morning', 'localDate': '2026-03-02', 'language': 'ru', 'pinCode': '123456',
+    }
+    recipients = [[recipient], psycopg2.OperationalError('нет подключения'), []]
+
+    async def fetch(since, until, offsets):
+        windows.append((since, until, offsets))
+        result = recipients.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def deliver(bot, ledger, telegram_id, text, button_text, link, **record):
+        delivered[telegram_id].append(record)
+
+    monkeypatch.setattr(data, 'fetch_reminder_recipients', fetch)
+    monkeypatch.setattr(sch, 'deliver', deliver)
+
+    asyncio.run(sch.send_reminders(None, config, state))
+    assert windows[0] == (START - timedelta(minutes=1), START, [60, 180])
+    assert delivered[100] == [{'survey_type': 'morning', 'local_date': '2026-03-02', 'source': 'reminder',
+                               'schedule_id': 's1', 'player_id': 'p1', 'team_id': 't1'}]
+    assert state.reminders_sent == 1 and state.reminder_window_end == START
+
+    Clock.current = START + timedelta(minutes=1)
+    asyncio.run(sch.send_reminders(None, config, state))
+    assert state.reminder_window_end == START
+
+    Clock.current = START + timedelta(minutes=2)
+    asyncio.run(sch.send_reminders(None, config, state))
+    assert windows[-1][:2] == (START, Clock.current)
+    assert state.reminder_window_end == Clock.current
@@ -0,0 +1,55 @@
+"""Векторный разбор времени и перевод единиц против поштучного порта unit-converter.ts"""
+
+import numpy as np
+import pytest
+
+from uteam_bot import units
+
+FORMATS = (None, 'hh:mm:ss', 'mm:ss', 'hh:mm')
+
+
+def _fuzzed_times(count, seed=7):
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list('0123456789' * 4 + ':::...,,  -a'))
+    fuzzed = [''.join(rng.choice(alphabet, rng.integers(0, 12))) for _ in range(count // 2)]
+    structured = []
+    for _ in range(count - len(fuzzed)):
+        fields = rng.integers(0, 100, rng.integers(1, 4)).tolist()
+        separator = str(rng.choice([':', '.', ',', ' ']))
+        text = separator.join(str(field).zfill(int(rng.integers(1, 3))) for field in fields)
+        if rng.random() < 0.3:
+            text += str(rng.choice(['.', ','])) + str(rng.integers(0, 1000))
+        structured.append(text)
+    return np.array(fuzzed + structured, dtype=object)
+
+
+@pytest.mark.parametrize('expected_format', FORMATS)
+def test_parse_time_matches_per_cell_port(expected_format):
+    values = _fuzzed_times(20000)
+    fast = units.parse_time(values, expected_format)
+    slow = np.array([units._parse_time_text(value, expected_format) for value in values], dtype=np.float64)
+    mismatched = ~np.isclose(fast, slow, rtol=1e-12, atol=1e-9, equal_nan=True)
+    assert not mismatched.any(), values[mismatched][:10].tolist()
+
+
+def test_parse_time_examples():
+    values = np.array(['01:19:22', '45:30', '12:30', '90', '1:02:03.5', '', None], dtype=object)
+    seconds = units.parse_time(values, None)
+    np.testing.assert_allclose(seconds[:5], [4762, 45 * 60 + 30, 12 * 3600 + 30 * 60, 90, 3723.5])
+    assert np.isnan(seconds[5:]).all()
+    np.testing.assert_allclose(units.parse_time(np.array(['12:30'], dtype=object), 'mm:ss'), [750])
+
+
+def test_parse_float_decimal_comma_and_empty():
+    values = np.array(['1,5', '2.25', '', None, 'abc', '3m'], dtype=object)
+    np.testing.assert_allclose(units.parse_float(values, decimal_comma=True),
+                               [1.5, 2.25, np.nan, np.nan, np.nan, 3], equal_nan=True)
+    assert units.parse_float(np.array([], dtype=object), decimal_comma=True).shape == (0,)
+    assert units.format_time(np.array([]), 'hh:mm:ss').shape == (0,)
+
+
+def test_convert_unit_round_trip():
+    meters = np.array([0.0, 1234.5, np.nan])
+    np.testing.assert_allclose(units.convert_unit(units.convert_unit(meters, 'm', 'km'), 'km', 'm'), meters,
+                               equal_nan=True)
+    np.testing.assert_allclose(units.convert_unit(np.array([36.0]), 'km/h', 'm/s'), [10.0], rtol=1e-4)
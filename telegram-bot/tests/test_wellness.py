@@ -0,0 +1,70 @@
+"""compute_wellness против поштучного расчета базы (AVG и STDDEV_SAMP за 28 предыдущих дней)"""
+
+import statistics
+
+import numpy as np
+import pytest
+
+from uteam_bot import db, wellness
+
+
+def _answers(players=40, days=120, seed=3):
+    rng = np.random.default_rng(seed)
+    player_index, day_index = np.nonzero(rng.random((players, days)) < 0.7)
+    values = rng.integers(1, 11, (len(player_index), len(wellness.METRICS))).astype(np.float64)
+    values[:, 0] = rng.choice(np.arange(4, 11, 0.5), len(player_index))
+    # Игрок с одинаковыми ответами: SD = 0, z-оценки нет
+    values[player_index == 0] = 5.0
+    return player_index, day_index, values, players, days
+
+
+def _reference(player_index, day_index, values):
+    answers = {}
+    for player, day, row in zip(player_index.tolist(), day_index.tolist(), values.tolist()):
+        answers.setdefault(player, {})[day] = row
+    expected = {}
+    for player, by_day in answers.items():
+        for day, row in by_day.items():
+            window = [by_day[d] for d in range(day - wellness.BASELINE_DAYS, day) if d in by_day]
+            z = []
+            for number, value in enumerate(row):
+                column = [answer[number] for answer in window]
+                if len(column) < wellness.MIN_BASELINE:
+                    z.append(np.nan)
+                    continue
+                sd = statistics.stdev(column)
+                z.append((value - statistics.fmean(column)) / sd if sd > 1e-6 else np.nan)
+            expected[player, day] = (len(window), z)
+    return expected
+
+
+def test_z_scores_match_per_player_baseline():
+    player_index, day_index, values, players, days = _answers()
+    z, readiness, baseline = wellness.compute_wellness(player_index, day_index, values, players, days)
+    for (player, day), (count, expected_z) in _reference(player_index, day_index, values).items():
+        assert baseline[player, day] == count
+        np.testing.assert_allclose(z[player, day], expected_z, rtol=1e-9, atol=1e-9, equal_nan=True)
+        scored = [value for value in expected_z if not np.isnan(value)]
+        if scored:
+            np.testing.assert_allclose(readiness[player, day], statistics.fmean(scored), rtol=1e-9, atol=1e-9)
+        else:
+            assert np.isnan(readiness[player, day])
+
+
+def test_readiness_score_scale():
+    scores = wellness.readiness_score(np.array([0.0, 1.0, -2.5, 7.0, -9.0, np.nan]))
+    np.testing.assert_array_equal(scores[:5], [50, 60, 25, 100, 0])
+    assert np.isnan(scores[5])
+
+
+def test_follow_survives_missing_connection(monkeypatch, capsys):
+    monkeypatch.setattr(db, 'get_db_connection', lambda: None)
+
+    def stop(seconds):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(wellness.time, 'sleep', stop)
+    # Шаг без базы не завершает процесс: follow доходит до паузы перед следующим шагом
+    with pytest.raises(KeyboardInterrupt):
+        wellness.follow(dry_run=True)
+    assert 'Ошибка шага: нет подключения к базе данных' in capsys.readouterr().out
@@ -0,0 +1,38 @@
+"""
+Общее ядро Telegram-бота UTeam.
+
+Модули:
+    config    — параметры БД, токен и флаги вариантов запуска
+    db        — SQL-запросы бота и пул подключений
+    scheduler — проверка расписаний и рассылка
+    sender    — отправка сообщений в Telegram
+    templates — тексты сообщений и ссылки на опросы
+    http      — HTTP endpoints
+    handlers  — хендлеры aiogram
+    startup   — профиль запуска и прогрев
+
+Импорт пакета загружает только config; aiogram, aiohttp, psycopg2 и
+apscheduler подключаются в run()/main() под профилем запуска.
+"""
+
+from .config import BotConfig
+
+
+def main(config=None, profile=None):
+    from .app import main as _main
+    return _main(config, profile)
+
+
+def run(config=None):
+    """Точка входа для скриптов запуска"""
+    import asyncio
+    from .startup import StartupProfile
+
+    print("[BOT] Запуск Telegram-бота с прямым доступом к базе данных...")
+    profile = StartupProfile()
+    profile.import_modules()
+    profile.import_modules(['uteam_bot.app'])
+    asyncio.run(main(config, profile))
+
+
+__all__ = ['BotConfig', 'main', 'run']
@@ -0,0 +1,79 @@
+"""
+Сборка и запуск процесса бота: aiogram, планировщик и HTTP сервер
+"""
+
+import asyncio
+import signal
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from . import data, db
+from .config import BotConfig
+from .handlers import register_handlers
+from .http import create_app
+from .scheduler import setup_scheduler
+from .startup import StartupProfile, warm_up
+from .state import BotState
+from .timing import setup_timing
+
+
+async def main(config=None, profile=None):
+    config = config or BotConfig.from_env()
+    profile = profile or StartupProfile()
+    db.configure(config.db)
+    data.configure(config.db_pool_max)
+    db.configure_writer(config.writer_db)
+    state = BotState(config)
+    state.profile = profile
+    # Замер задержки loop работает с самого начала, чтобы поймать блокировки прогрева
+    if config.asyncio_debug:
+        state.loop_monitor.enable_asyncio_debug(asyncio.get_running_loop())
+    loop_monitor_task = asyncio.create_task(state.loop_monitor.run())
+
+    bot = Bot(token=config.token)
+    dp = Dispatcher()
+    # Доступно хендлерам как аргумент bot_state
+    dp['bot_state'] = state
+    setup_timing(dp, bot, state.handler_metrics, state.update_profiler)
+    register_handlers(dp)
+
+    # HTTP сервер поднимается первым: /ready отвечает 503, пока идет прогрев
+    with profile.phase('http server'):
+        runner = web.AppRunner(create_app(bot, config, state))
+        await runner.setup()
+        site = web.TCPSite(runner, config.http_host, config.http_port)
+        await site.start()
+    print(f'HTTP server started on port {config.http_port}')
+
+    state.ready = await warm_up(bot, config, state, profile)
+    if config.profile_startup:
+        profile.report()
+    if not state.ready:
+        print("[Startup] Прогрев не завершен, /ready включится после первой успешной проверки расписаний")
+
+    setup_scheduler(bot, config, state)
+    ledger_task = asyncio.create_task(state.ledger.run(data.flush_ledger))
+
+    # Корректная обработка SIGINT/SIGTERM: останавливаем polling и сразу
+    # начинаем запись журнала, пока завершаются активные отправки
+    loop = asyncio.get_running_loop()
+
+    def shutdown(sig):
+        print(f"[BOT] Получен {sig.name}, остановка...")
+        state.ledger.wake()
+        asyncio.ensure_future(dp.stop_polling())
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, shutdown, sig)
+    # Запуск aiogram
+    try:
+        await dp.start_polling(bot, handle_signals=False)
+    finally:
+        await runner.cleanup()
+        ledger_task.cancel()
+        loop_monitor_task.cancel()
+        written = await data.flush_ledger(state.ledger)
+        print(f"[Ledger] Записано при остановке: {written}, не записано: {len(state.ledger)}")
+        db.close_writer()
+        db.close_pool()
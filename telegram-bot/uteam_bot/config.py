@@ -0,0 +1,131 @@
+"""
+Конфигурация бота: подключение к базе данных, токен и флаги вариантов
+(боевой, «fixed», «debug») собраны в одном месте.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Конфигурация базы данных для бота (переменные окружения имеют приоритет)
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'rc1d-40uv9fbi8p02b5c0.mdb.yandexcloud.net'),
+    'port': int(os.getenv('DB_PORT', 6432)),
+    'database': os.getenv('DB_NAME', 'uteam'),
+    'user': os.getenv('DB_USER', 'uteam_bot_reader'),
+    'password': os.getenv('DB_PASSWORD', 'uteambot567234!'),
+    'sslmode': os.getenv('DB_SSLMODE', 'verify-ca'),
+    'sslrootcert': os.getenv('DB_SSLROOTCERT', './CA.pem'),
+}
+
+# Пользователь с правами на запись (журнал отправок); без пароля запись отключена
+WRITER_DB_CONFIG = dict(
+    DB_CONFIG,
+    user=os.getenv('BOT_WRITER_DB_USER', 'uteam_bot_writer'),
+    password=os.getenv('BOT_WRITER_DB_PASSWORD'),
+)
+
+SURVEY_TYPES = ('morning', 'rpe', 'rpe_match')
+DEFAULT_TIMEZONE = 'Europe/Moscow'
+SURVEY_BASE_URL = 'https://api.uteam.club/survey'
+
+
+def _env_flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_minutes(name):
+    """Список минут через запятую, например "60,180" """
+    value = os.getenv(name, '')
+    return tuple(sorted(int(part) for part in value.split(',') if part.strip()))
+
+
+@dataclass
+class BotConfig:
+    """Настройки одного процесса бота"""
+    token: str = None
+    db: dict = field(default_factory=lambda: dict(DB_CONFIG))
+    writer_db: dict = field(default_factory=lambda: dict(WRITER_DB_CONFIG))
+    # Подробные логи планировщика (бывший telegram-bot-debug.py)
+    debug: bool = False
+    # Сравнивать время расписания с точностью до секунд (HH:MM:SS) вместо HH:MM
+    compare_seconds: bool = False
+    # Какие типы расписаний загружает планировщик
+    survey_types: tuple = SURVEY_TYPES
+    default_timezone: str = DEFAULT_TIMEZONE
+    survey_base_url: str = SURVEY_BASE_URL
+    http_host: str = '0.0.0.0'
+    http_port: int = 8080
+    scheduler_interval_minutes: int = 1
+    # Как часто закрывать RPE расписания прошедших тренировок и матчей
+    expire_interval_minutes: int = 60
+    db_pool_min: int = 1
+    db_pool_max: int = 10
+    # Сколько секунд помнить результат ручной отправки для дедупликации повторов
+    idempotency_ttl_seconds: int = 300
+    # Напоминания не ответившим: смещения волн от рассылки по расписанию, минуты (пусто — выключены)
+    reminder_offsets_minutes: tuple = ()
+    # Как часто перечитывать кэш готовности и нагрузки для ответа после опроса
+    feedback_refresh_minutes: int = 15
+    # Окно запроса GET /deliveries по умолчанию, дней
+    deliveries_default_days: int = 30
+    # Журнал отправок: размер пачки, интервал записи (сек) и предел буфера
+    ledger_flush_size: int = 500
+    ledger_flush_interval: float = 5.0
+    ledger_max_pending: int = 20000
+    # Попытки ввода PIN-кода: на пользователя за окно (сек) и на весь бот в минуту
+    pin_attempts_per_user: int = 5
+    pin_attempts_window: int = 600
+    pin_attempts_global: int = 120
+    # Загружать только наступившие расписания из BotScheduleFire (нужен пользователь-писатель)
+    schedule_fire_table: bool = True
+    # Печатать профиль запуска (время импортов и прогрева)
+    profile_startup: bool = True
+    # Доля апдейтов, профилируемых cProfile (0 — выключено), сколько самых медленных хранить и где
+    update_profile_rate: float = 0.0
+    update_profile_keep: int = 10
+    update_profile_dir: str = 'profiles'
+    # Замер задержки event loop: период (сек) и порог (сек), после которого снимается стек
+    loop_lag_interval: float = 0.5
+    loop_lag_threshold: float = 0.1
+    # Режим отладки asyncio с отчетом о медленных колбэках (замедляет loop)
+    asyncio_debug: bool = False
+
+    @property
+    def ledger_enabled(self):
+        return bool(self.writer_db.get('password'))
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Собирает конфигурацию из переменных окружения; overrides имеют приоритет"""
+        values = {
+            'token': os.getenv('TELEGRAM_BOT_TOKEN'),
+            'debug': _env_flag('BOT_DEBUG'),
+            'compare_seconds': _env_flag('BOT_COMPARE_SECONDS'),
+            'http_port': int(os.getenv('BOT_HTTP_PORT', 8080)),
+            'db_pool_min': int(os.getenv('BOT_DB_POOL_MIN', 1)),
+            'db_pool_max': int(os.getenv('BOT_DB_POOL_MAX', 10)),
+            'profile_startup': _env_flag('BOT_PROFILE_STARTUP', True),
+            'update_profile_rate': float(os.getenv('BOT_PROFILE_UPDATES_RATE', 0.0)),
+            'update_profile_keep': int(os.getenv('BOT_PROFILE_UPDATES_KEEP', 10)),
+            'update_profile_dir': os.getenv('BOT_PROFILE_UPDATES_DIR', 'profiles'),
+            'loop_lag_threshold': float(os.getenv('BOT_LOOP_LAG_THRESHOLD_MS', 100)) / 1000,
+            'asyncio_debug': _env_flag('BOT_ASYNCIO_DEBUG'),
+            'pin_attempts_per_user': int(os.getenv('BOT_PIN_ATTEMPTS_PER_USER', 5)),
+            'pin_attempts_global': int(os.getenv('BOT_PIN_ATTEMPTS_GLOBAL', 120)),
+            'schedule_fire_table': _env_flag('BOT_SCHEDULE_FIRE_TABLE', True),
+            'idempotency_ttl_seconds': int(os.getenv('BOT_IDEMPOTENCY_TTL', 300)),
+            'reminder_offsets_minutes': _env_minutes('BOT_REMINDER_OFFSETS'),
+            'feedback_refresh_minutes': int(os.getenv('BOT_FEEDBACK_REFRESH_MINUTES', 15)),
+            'ledger_flush_size': int(os.getenv('BOT_LEDGER_FLUSH_SIZE', 500)),
+            'ledger_flush_interval': float(os.getenv('BOT_LEDGER_FLUSH_INTERVAL', 5.0)),
+            'ledger_max_pending': int(os.getenv('BOT_LEDGER_MAX_PENDING', 20000)),
+        }
+        values.update(overrides)
+        return cls(**values)
@@ -0,0 +1,106 @@
+"""
+Асинхронный слой данных для хендлеров и планировщика.
+
+Синхронные функции db выполняются в потоках, не блокируя event loop;
+одинаковые одновременные чтения объединяются через SingleFlight, так что
+число запросов к БД при всплеске растет с числом разных ключей, а не запросов.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import db
+from .singleflight import SingleFlight
+from .timing import add_db_time
+
+flight = SingleFlight()
+_executor = None
+
+
+def configure(max_workers):
+    """Число потоков для запросов к БД; не больше размера пула, иначе пул исчерпается"""
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+
+
+async def _run(fn, *args):
+    if _executor is None:
+        configure(10)
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args))
+    finally:
+        # Время БД засчитывается апдейту, который сейчас обрабатывается (см. timing)
+        add_db_time(time.perf_counter() - started)
+
+
+async def is_telegram_bound(telegram_id):
+    return await flight.do(('bound', str(telegram_id)), _run, db.is_telegram_bound, telegram_id)
+
+
+async def get_player_language(telegram_id):
+    return await flight.do(('language', str(telegram_id)), _run, db.get_player_language, telegram_id)
+
+
+async def get_team_players(team_id, selected_player_ids=None):
+    key = ('team_players', team_id, tuple(selected_player_ids or ()))
+    return await flight.do(key, _run, db.get_team_players, team_id, selected_player_ids)
+
+
+async def refresh_schedule_index(index):
+    """Перезагрузка индекса расписаний; повторный вызов во время загрузки ждет текущую"""
+    return await flight.do(('schedules', id(index)), _run, index.refresh)
+
+
+async def prime_schedule_index(index):
+    """Прогрев индекса расписаний без расхода окна BotScheduleFire"""
+    return await flight.do(('schedules', id(index)), _run, index.prime)
+
+
+async def fetch_reminder_recipients(since, until, offsets):
+    return await _run(db.fetch_reminder_recipients, since, until, offsets)
+
+
+async def refresh_feedback(cache):
+    return await flight.do(('feedback', id(cache)), _run, cache.refresh)
+
+
+async def bind_telegram_to_player(pin_code, telegram_id, language='ru'):
+    return await _run(db.bind_telegram_to_player, pin_code, telegram_id, language)
+
+
+async def unbind_telegram_id(telegram_id):
+    return await _run(db.unbind_telegram_id, telegram_id)
+
+
+async def update_player_language(telegram_id, lang_code):
+    return await _run(db.update_player_language, telegram_id, lang_code)
+
+
+async def flush_ledger(ledger):
+    """Пишет накопленные записи журнала многострочным INSERT; take/requeue выполняются в потоке event loop"""
+    async with ledger.flush_lock:
+        rows = ledger.take()
+        if not rows:
+            return 0
+        try:
+            written = await _run(db.insert_deliveries, rows)
+        except Exception as e:
+            ledger.requeue(rows, e)
+            return 0
+        ledger.written += written
+        return written
+
+
+async def mark_schedules_sent(ids_by_type):
+    return await _run(db.mark_schedules_sent, ids_by_type)
+
+
+async def expire_stale_schedules():
+    return await _run(db.expire_stale_schedules)
+
+
+async def fetch_deliveries(**filters):
+    return await _run(functools.partial(db.fetch_deliveries, **filters))
@@ -0,0 +1,1160 @@
+"""
+Доступ к базе данных: все SQL-запросы бота в одном модуле
+"""
+
+import threading
+import time
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+import psycopg2.pool
+
+from .config import DB_CONFIG, SURVEY_TYPES
+
+_db_config = dict(DB_CONFIG)
+_pool = None
+
+# Результат последнего обращения к базе — для health-проб без лишних запросов
+health = {'lastOkAt': None, 'lastErrorAt': None, 'lastError': None}
+
+
+def _mark_ok():
+    health['lastOkAt'] = time.time()
+
+
+def _mark_error(error):
+    health['lastErrorAt'] = time.time()
+    health['lastError'] = str(error)
+
+
+# Сегодняшняя дата (YYYY-MM-DD) в таймзоне каждой команды; некорректная
+# таймзона заменяется на Europe/Moscow, как и в планировщике
+TEAM_TODAY_CTE = """
+    WITH team_today AS (
+        SELECT
+            t."id",
+            t."timezone",
+            TO_CHAR(NOW() AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'), 'YYYY-MM-DD') as "today"
+        FROM "Team" t
+        LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+    )
+"""
+
+# Запросы расписаний по типу опроса
+SCHEDULE_QUERIES = {
+    # Старые опросы (утренние) с recipientsConfig
+    'morning': """
+    SELECT
+        ss."id",
+        ss."teamId",
+        ss."sendTime",
+        ss."enabled",
+        ss."surveyType",
+        t."timezone",
+        NULL as "trainingId",
+        ss."recipientsConfig"
+    FROM "SurveySchedule" ss
+    LEFT JOIN "Team" t ON ss."teamId" = t."id"
+    WHERE ss."enabled" = true AND ss."surveyType" = 'morning'
+    """,
+    # RPE расписания тренировок, которые проходят сегодня в таймзоне команды
+    'rpe': TEAM_TODAY_CTE + """
+    SELECT
+        rs."id",
+        rs."teamId",
+        TO_CHAR(rs."scheduledTime", 'HH24:MI') as "sendTime",
+        true as "enabled",
+        'rpe' as "surveyType",
+        t."timezone",
+        rs."trainingId",
+        tr."date" as "trainingDate",
+        rs."recipientsConfig"
+    FROM "RPESchedule" rs
+    JOIN team_today t ON rs."teamId" = t."id"
+    JOIN "Training" tr ON rs."trainingId" = tr."id"
+    WHERE rs."status" = 'scheduled' AND tr."date" = t."today"
+    """,
+    # RPE расписания матчей, которые проходят сегодня в таймзоне команды
+    'rpe_match': TEAM_TODAY_CTE + """
+    SELECT
+        rsm."id",
+        rsm."teamId",
+        TO_CHAR(rsm."scheduledTime", 'HH24:MI') as "sendTime",
+        true as "enabled",
+        'rpe_match' as "surveyType",
+        t."timezone",
+        NULL as "trainingId",
+        m."date" as "matchDate",
+        rsm."recipientsConfig"
+    FROM "RPEScheduleMatch" rsm
+    JOIN team_today t ON rsm."teamId" = t."id"
+    JOIN "Match" m ON rsm."matchId" = m."id"
+    WHERE rsm."status" = 'scheduled' AND m."date" = t."today"
+    """,
+}
+
+PLAYER_COLUMNS = """
+    p."id",
+    p."firstName",
+    p."lastName",
+    p."telegramId",
+    p."pinCode",
+    p."language",
+    t."clubId"
+"""
+
+# Расписания, чей момент срабатывания (BotScheduleFire, UTC) попал в окно (since, until]
+DUE_SCHEDULES_QUERY = """
+SELECT
+    f."scheduleId" as "id",
+    f."teamId",
+    TO_CHAR(f."sendTime", 'HH24:MI') as "sendTime",
+    true as "enabled",
+    f."surveyType",
+    f."timezone",
+    rs."trainingId",
+    CASE WHEN f."surveyType" = 'rpe' THEN TO_CHAR(f."eventDate", 'YYYY-MM-DD') END as "trainingDate",
+    CASE WHEN f."surveyType" = 'rpe_match' THEN TO_CHAR(f."eventDate", 'YYYY-MM-DD') END as "matchDate",
+    f."fireAt",
+    COALESCE(ss."recipientsConfig", rs."recipientsConfig", rsm."recipientsConfig") as "recipientsConfig"
+FROM "BotScheduleFire" f
+LEFT JOIN "SurveySchedule" ss ON f."surveyType" = 'morning' AND ss."id" = f."scheduleId"
+LEFT JOIN "RPESchedule" rs ON f."surveyType" = 'rpe' AND rs."id" = f."scheduleId"
+LEFT JOIN "RPEScheduleMatch" rsm ON f."surveyType" = 'rpe_match' AND rsm."id" = f."scheduleId"
+WHERE f."fireAt" > %(since)s AND f."fireAt" <= %(until)s
+  AND f."surveyType" = ANY(%(survey_types)s)
+  AND (f."surveyType" = 'morning' OR f."eventDate" IS NOT NULL)
+ORDER BY f."fireAt"
+"""
+
+# Ежедневные расписания, чей момент уже прошел, переносятся на следующий день
+ADVANCE_FIRE_QUERY = """
+UPDATE "BotScheduleFire"
+SET "fireAt" = bot_schedule_next_fire("sendTime", "timezone", NULL, %(until)s), "updatedAt" = NOW()
+WHERE "surveyType" = 'morning' AND "fireAt" <= %(until)s
+"""
+
+# RPE расписания, чья тренировка или матч уже прошли, а опрос так и не ушел
+EXPIRE_QUERIES = {
+    'rpe': TEAM_TODAY_CTE + """
+    UPDATE "RPESchedule"
+    SET "status" = 'expired', "updatedAt" = NOW()
+    WHERE "id" IN (
+        SELECT rs."id"
+        FROM "RPESchedule" rs
+        JOIN team_today t ON rs."teamId" = t."id"
+        JOIN "Training" tr ON rs."trainingId" = tr."id"
+        WHERE rs."status" = 'scheduled' AND tr."date" < t."today"
+    )
+    """,
+    'rpe_match': TEAM_TODAY_CTE + """
+    UPDATE "RPEScheduleMatch"
+    SET "status" = 'expired', "updatedAt" = NOW()
+    WHERE "id" IN (
+        SELECT rsm."id"
+        FROM "RPEScheduleMatch" rsm
+        JOIN team_today t ON rsm."teamId" = t."id"
+        JOIN "Match" m ON rsm."matchId" = m."id"
+        WHERE rsm."status" = 'scheduled' AND m."date" < t."today"
+    )
+    """,
+}
+
+# Разосланные RPE расписания; status = 'scheduled' защищает от перезаписи отмены
+MARK_SENT_QUERIES = {
+    'rpe': """
+    UPDATE "RPESchedule"
+    SET "status" = 'sent', "sentAt" = NOW(), "updatedAt" = NOW()
+    WHERE "id" = ANY(%s::uuid[]) AND "status" = 'scheduled'
+    """,
+    'rpe_match': """
+    UPDATE "RPEScheduleMatch"
+    SET "status" = 'sent', "sentAt" = NOW(), "updatedAt" = NOW()
+    WHERE "id" = ANY(%s::uuid[]) AND "status" = 'scheduled'
+    """,
+}
+
+# Напоминания тем, кто не ответил. Волна — первая успешная отправка расписания за
+# localDate по BotDeliveryLog; для каждого смещения из offsets (минуты), чей момент
+# попал в окно (since, until], выбираются получатели волны без ответа после начала
+# дня команды (утренний опрос) или после отправки (RPE) и без напоминания этой волны
+REMINDER_QUERY = f"""
+WITH sent AS (
+    SELECT l."scheduleId", l."teamId", l."surveyType", l."localDate", l."playerId", MIN(l."createdAt") as "sentAt"
+    FROM "BotDeliveryLog" l
+    WHERE l."localDate" >= TO_CHAR(%(until)s::timestamptz - interval '2 days', 'YYYY-MM-DD')
+      AND l."source" = 'scheduler' AND l."outcome" = 'sent'
+      AND l."scheduleId" IS NOT NULL AND l."playerId" IS NOT NULL
+    GROUP BY l."scheduleId", l."teamId", l."surveyType", l."localDate", l."playerId"
+),
+due AS (
+    SELECT w.*, o."wave", w."sentAt" + o."minutes" * interval '1 minute' as "remindAt"
+    FROM (
+        SELECT "scheduleId", "teamId", "surveyType", "localDate", MIN("sentAt") as "sentAt"
+        FROM sent
+        GROUP BY "scheduleId", "teamId", "surveyType", "localDate"
+    ) w
+    CROSS JOIN unnest(%(offsets)s::int[]) WITH ORDINALITY o("minutes", "wave")
+    WHERE w."sentAt" + o."minutes" * interval '1 minute' > %(since)s
+      AND w."sentAt" + o."minutes" * interval '1 minute' <= %(until)s
+)
+SELECT
+    d."scheduleId",
+    d."teamId",
+    d."surveyType",
+    d."localDate",
+    d."wave",
+    rs."trainingId",
+    {PLAYER_COLUMNS}
+FROM due d
+JOIN sent s ON s."scheduleId" = d."scheduleId" AND s."localDate" = d."localDate"
+JOIN "Player" p ON p."id" = s."playerId" AND p."telegramId" IS NOT NULL
+LEFT JOIN "Team" t ON t."id" = p."teamId"
+LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+LEFT JOIN "RPESchedule" rs ON d."surveyType" = 'rpe' AND rs."id" = d."scheduleId"
+WHERE NOT EXISTS (
+    SELECT 1 FROM "MorningSurveyResponse" r
+    WHERE d."surveyType" = 'morning' AND r."playerId" = p."id"
+      AND r."createdAt" >= d."localDate"::date::timestamp AT TIME ZONE COALESCE(z."name", 'Europe/Moscow')
+)
+AND NOT EXISTS (
+    SELECT 1 FROM "RPESurveyResponse" r
+    WHERE d."surveyType" IN ('rpe', 'rpe_match') AND r."playerId" = p."id" AND r."createdAt" >= d."sentAt"
+)
+AND NOT EXISTS (
+    SELECT 1 FROM "BotDeliveryLog" r
+    WHERE r."playerId" = p."id" AND r."scheduleId" = d."scheduleId" AND r."localDate" = d."localDate"
+      AND r."source" = 'reminder' AND r."createdAt" >= d."remindAt"
+)
+ORDER BY d."teamId", d."scheduleId", d."wave"
+"""
+
+# Запросы к Player из горячего пути бота; их планы проверяет uteam_bot.planbench
+PLAYER_QUERIES = {
+    'team_players': f"""
+    SELECT {PLAYER_COLUMNS}
+    FROM "Player" p
+    LEFT JOIN "Team" t ON p."teamId" = t."id"
+    WHERE p."teamId" = %s AND p."telegramId" IS NOT NULL
+    """,
+    'id_by_telegram': 'SELECT id FROM "Player" WHERE "telegramId" = %s',
+    'language_by_telegram': 'SELECT "language" FROM "Player" WHERE "telegramId" = %s',
+}
+
+# Привязка по PIN-коду за один запрос. Условие "telegramId" IS NULL проверяется
+# на самой строке, поэтому из двух одновременных привязок одного PIN пройдет одна;
+# уникальный индекс по telegramId не даст привязать один аккаунт к двум игрокам
+BIND_TELEGRAM_QUERY = """
+WITH already AS (
+    SELECT 1 FROM "Player" WHERE "telegramId" = %(telegram_id)s::bigint
+),
+target AS (
+    SELECT "id", "telegramId" FROM "Player" WHERE "pinCode" = %(pin)s ORDER BY "id" LIMIT 1
+),
+bound AS (
+    UPDATE "Player" p
+    SET "telegramId" = %(telegram_id)s::bigint, "language" = %(language)s, "updatedAt" = NOW()
+    FROM target
+    WHERE p."id" = target."id" AND p."telegramId" IS NULL AND NOT EXISTS (SELECT 1 FROM already)
+    RETURNING p."id"
+)
+SELECT
+    EXISTS (SELECT 1 FROM already) as "telegramBound",
+    EXISTS (SELECT 1 FROM target) as "found",
+    EXISTS (SELECT 1 FROM bound) as "bound"
+"""
+
+
+def configure(db_config):
+    """Задает параметры подключения для всех функций модуля"""
+    global _db_config
+    _db_config = dict(db_config)
+
+
+def open_pool(db_config=None, minconn=1, maxconn=10):
+    """Открывает пул подключений; minconn соединений устанавливаются сразу"""
+    global _pool, _db_config
+    if db_config is not None:
+        _db_config = dict(db_config)
+    if _pool is None:
+        _pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, **_db_config)
+        _mark_ok()
+        print(f"[DB] Пул подключений открыт ({minconn}..{maxconn})")
+    return _pool
+
+
+def pool_stats():
+    """Занятые и свободные соединения пула"""
+    if _pool is None:
+        return None
+    return {'inUse': len(_pool._used), 'idle': len(_pool._pool), 'max': _pool.maxconn}
+
+
+def is_reachable(max_age=120):
+    """База считается доступной, если последнее обращение успешно и не старше max_age секунд"""
+    last_ok = health['lastOkAt']
+    if last_ok is None:
+        return False
+    if health['lastErrorAt'] and health['lastErrorAt'] > last_ok:
+        return False
+    return time.time() - last_ok <= max_age
+
+
+def close_pool():
+    """Закрывает все соединения пула"""
+    global _pool
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+
+
+def get_db_connection():
+    """Берет подключение из пула (или создает новое, если пул не открыт)"""
+    try:
+        if _pool is None:
+            return psycopg2.connect(**_db_config)
+        connection = _pool.getconn()
+        if connection.closed:
+            # Сервер закрыл соединение, пока оно лежало в пуле
+            _pool.putconn(connection, close=True)
+            connection = _pool.getconn()
+        return connection
+    except Exception as e:
+        _mark_error(e)
+        print(f"[DB] Ошибка подключения к базе данных: {e}")
+        return None
+
+
+def release_connection(connection):
+    """Возвращает подключение в пул, завершив открытую транзакцию"""
+    broken = bool(connection.closed)
+    if broken:
+        _mark_error("соединение закрыто сервером")
+    else:
+        try:
+            connection.rollback()
+        except Exception as e:
+            _mark_error(e)
+            broken = True
+        else:
+            _mark_ok()
+    if _pool is None:
+        connection.close()
+    else:
+        _pool.putconn(connection, close=broken)
+
+
+def fetch_survey_schedules(survey_types=SURVEY_TYPES):
+    """Как get_survey_schedules, но ошибки базы пробрасываются вызывающему"""
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        schedules = []
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            for survey_type in survey_types:
+                cursor.execute(SCHEDULE_QUERIES[survey_type])
+                schedules.extend(dict(schedule) for schedule in cursor.fetchall())
+        return schedules
+    finally:
+        release_connection(connection)
+
+
+def fetch_due_schedules(since, until, survey_types=SURVEY_TYPES):
+    """Расписания с моментом срабатывания в (since, until]; ошибки базы пробрасываются"""
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(DUE_SCHEDULES_QUERY, {
+                'since': since, 'until': until, 'survey_types': list(survey_types),
+            })
+            return [dict(schedule) for schedule in cursor.fetchall()]
+    finally:
+        release_connection(connection)
+
+
+def fetch_reminder_recipients(since, until, offsets):
+    """Получатели напоминаний с моментом в (since, until]; ошибки базы пробрасываются"""
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(REMINDER_QUERY, {'since': since, 'until': until, 'offsets': list(offsets)})
+            return [dict(row) for row in cursor.fetchall()]
+    finally:
+        release_connection(connection)
+
+
+def get_survey_schedules(survey_types=SURVEY_TYPES):
+    """Получает все активные расписания рассылок с таймзоной команды и настройками получателей"""
+    try:
+        return fetch_survey_schedules(survey_types)
+    except Exception as e:
+        print(f"[DB] Ошибка получения расписаний: {e}")
+        return []
+
+
+def get_team_players(team_id, selected_player_ids=None):
+    """Получает игроков команды с telegramId, с возможностью фильтрации по списку ID"""
+    connection = get_db_connection()
+    if not connection:
+        return []
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            query = PLAYER_QUERIES['team_players']
+            params = [team_id]
+            if selected_player_ids:
+                # Фильтруем по выбранным ID игроков
+                query += ' AND p."id" = ANY(%s::uuid[])'
+                params.append(list(selected_player_ids))
+            cursor.execute(query, params)
+            return [dict(player) for player in cursor.fetchall()]
+    except Exception as e:
+        print(f"[DB] Ошибка получения игроков команды {team_id}: {e}")
+        return []
+    finally:
+        release_connection(connection)
+
+
+def bind_telegram_to_player(pin_code, telegram_id, language='ru'):
+    """Привязывает Telegram ID к игроку по PIN-коду одним запросом"""
+    connection = get_db_connection()
+    if not connection:
+        return False, "Ошибка подключения к базе данных"
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(BIND_TELEGRAM_QUERY, {
+                'pin': pin_code, 'telegram_id': telegram_id, 'language': language,
+            })
+            result = cursor.fetchone()
+            connection.commit()
+    except psycopg2.errors.UniqueViolation:
+        # Тот же telegramId успели привязать параллельным запросом
+        return False, "Этот Telegram аккаунт уже привязан к другому игроку"
+    except Exception as e:
+        print(f"[DB] Ошибка привязки Telegram: {e}")
+        return False, "Ошибка базы данных"
+    finally:
+        release_connection(connection)
+
+    if result['bound']:
+        return True, "Успешно привязано"
+    if result['telegramBound']:
+        return False, "Этот Telegram аккаунт уже привязан к другому игроку"
+    if not result['found']:
+        return False, "PIN-код не найден"
+    return False, "Этот PIN-код уже привязан к другому Telegram аккаунту"
+
+
+def unbind_telegram_id(telegram_id):
+    """Удаляет telegramId у игрока по Telegram user id"""
+    connection = get_db_connection()
+    if not connection:
+        return False, "Ошибка подключения к базе данных"
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE "Player" SET "telegramId" = NULL, "updatedAt" = NOW() WHERE "telegramId" = %s',
+                (str(telegram_id),)
+            )
+            connection.commit()
+            if cursor.rowcount > 0:
+                return True, "TelegramID успешно отвязан"
+            else:
+                return False, "TelegramID не найден в базе"
+    except Exception as e:
+        print(f"[DB] Ошибка отвязки Telegram: {e}")
+        return False, "Ошибка базы данных"
+    finally:
+        release_connection(connection)
+
+
+def get_player_language(telegram_id):
+    """Возвращает язык игрока из базы или None"""
+    connection = get_db_connection()
+    if not connection:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(PLAYER_QUERIES['language_by_telegram'], (str(telegram_id),))
+            row = cursor.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        print(f"[DB] Ошибка получения языка пользователя: {e}")
+        return None
+    finally:
+        release_connection(connection)
+
+
+def update_player_language(telegram_id, lang_code):
+    """Сохраняет выбранный язык привязанного игрока"""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE "Player" SET "language" = %s, "updatedAt" = NOW() WHERE "telegramId" = %s',
+                (lang_code, str(telegram_id))
+            )
+            connection.commit()
+            return cursor.rowcount > 0
+    except Exception as e:
+        print(f"[DB] Ошибка обновления языка: {e}")
+        return False
+    finally:
+        release_connection(connection)
+
+
+def is_telegram_bound(telegram_id):
+    """Проверяет, привязан ли TelegramID к какому-либо игроку"""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(PLAYER_QUERIES['id_by_telegram'], (str(telegram_id),))
+            return cursor.fetchone() is not None
+    except Exception as e:
+        print(f"[DB] Ошибка проверки привязки TelegramID: {e}")
+        return False
+    finally:
+        release_connection(connection)
+
+
+# Данные для ответа после опроса (uteam_bot.feedback): личная база утреннего
+# опроса за 28 дней до сегодня и последняя строка нагрузки каждого привязанного игрока
+FEEDBACK_QUERIES = {
+    'wellness': """
+    SELECT
+        p."telegramId",
+        COUNT(*) as "days",
+        AVG(w."sleepDuration") as "sleepDurationMean", STDDEV_SAMP(w."sleepDuration") as "sleepDurationSd",
+        AVG(w."sleepQuality") as "sleepQualityMean", STDDEV_SAMP(w."sleepQuality") as "sleepQualitySd",
+        AVG(w."recovery") as "recoveryMean", STDDEV_SAMP(w."recovery") as "recoverySd",
+        AVG(w."mood") as "moodMean", STDDEV_SAMP(w."mood") as "moodSd",
+        AVG(w."muscleCondition") as "muscleConditionMean", STDDEV_SAMP(w."muscleCondition") as "muscleConditionSd"
+    FROM "Player" p
+    LEFT JOIN "Team" t ON t."id" = p."teamId"
+    LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+    JOIN "PlayerWellnessDaily" w ON w."playerId" = p."id"
+        AND w."date" < (NOW() AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'))::date
+        AND w."date" >= (NOW() AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'))::date - 28
+    WHERE p."telegramId" IS NOT NULL
+    GROUP BY p."telegramId"
+    """,
+    'load': """
+    SELECT DISTINCT ON (p."telegramId")
+        p."telegramId",
+        COALESCE(z."name", 'Europe/Moscow') as "timezone",
+        l."date",
+        l."acuteEwma",
+        l."chronicEwma",
+        l."dailyLoad"
+    FROM "Player" p
+    LEFT JOIN "Team" t ON t."id" = p."teamId"
+    LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+    JOIN "PlayerLoadDaily" l ON l."playerId" = p."id"
+    WHERE p."telegramId" IS NOT NULL
+    ORDER BY p."telegramId", l."date" DESC
+    """,
+}
+
+
+def fetch_feedback():
+    """Строки FEEDBACK_QUERIES по виду; вид без таблицы (миграция не применена) — пустой.
+
+    Прочие ошибки базы пробрасываются.
+    """
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        result = {}
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            for kind, query in FEEDBACK_QUERIES.items():
+                cursor.execute('SAVEPOINT feedback')
+                try:
+                    cursor.execute(query)
+                except psycopg2.errors.UndefinedTable:
+                    cursor.execute('ROLLBACK TO SAVEPOINT feedback')
+                    result[kind] = []
+                    continue
+                result[kind] = [dict(row) for row in cursor.fetchall()]
+        return result
+    finally:
+        release_connection(connection)
+
+
+# --- Запись: журнал отправок, BotScheduleFire и статусы RPE расписаний ---
+
+DELIVERY_COLUMNS = (
+    'scheduleId', 'playerId', 'teamId', 'telegramId', 'surveyType', 'source',
+    'localDate', 'outcome', 'error', 'latencyMs', 'messageId',
+)
+
+_writer_config = None
+_writer_connection = None
+_writer_lock = threading.Lock()
+
+
+def configure_writer(writer_config):
+    """Задает пользователя с правами на запись; без пароля запись отключена"""
+    global _writer_config
+    _writer_config = dict(writer_config) if writer_config and writer_config.get('password') else None
+
+
+def get_writer_connection():
+    """Постоянное подключение пользователя-писателя; переоткрывается, если сервер его закрыл"""
+    global _writer_connection
+    if _writer_config is None:
+        return None
+    if _writer_connection is None or _writer_connection.closed:
+        _writer_connection = psycopg2.connect(**_writer_config)
+    return _writer_connection
+
+
+def close_writer():
+    global _writer_connection
+    if _writer_connection is not None and not _writer_connection.closed:
+        _writer_connection.close()
+    _writer_connection = None
+
+
+def writer_enabled():
+    return _writer_config is not None
+
+
+def advance_schedule_fire(until):
+    """Переносит прошедшие ежедневные расписания на следующий день; ошибки пробрасываются"""
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            return 0
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(ADVANCE_FIRE_QUERY, {'until': until})
+                advanced = cursor.rowcount
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return advanced
+
+
+def mark_schedules_sent(ids_by_type):
+    """Переводит RPE расписания в 'sent' с sentAt; ids_by_type — {тип: [id]}, возвращает {тип: число}"""
+    marked = {}
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            return marked
+        try:
+            with connection.cursor() as cursor:
+                for survey_type, ids in ids_by_type.items():
+                    cursor.execute(MARK_SENT_QUERIES[survey_type], ([str(i) for i in ids],))
+                    marked[survey_type] = cursor.rowcount
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return marked
+
+
+def expire_stale_schedules():
+    """Переводит RPE расписания прошедших тренировок и матчей в 'expired'; возвращает {тип: число}"""
+    expired = {}
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            return expired
+        try:
+            with connection.cursor() as cursor:
+                for survey_type, query in EXPIRE_QUERIES.items():
+                    cursor.execute(query)
+                    expired[survey_type] = cursor.rowcount
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return expired
+
+
+def insert_deliveries(rows):
+    """Добавляет записи журнала одним многострочным INSERT; ошибки пробрасываются"""
+    if not rows:
+        return 0
+    columns = ', '.join(f'"{column}"' for column in DELIVERY_COLUMNS)
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            return 0
+        try:
+            with connection.cursor() as cursor:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    f'INSERT INTO "BotDeliveryLog" ({columns}) VALUES %s',
+                    [tuple(row.get(column) for column in DELIVERY_COLUMNS) for row in rows],
+                    page_size=1000,
+                )
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return len(rows)
+
+
+def fetch_deliveries(player_id=None, team_id=None, telegram_id=None, days=30, limit=500):
+    """Попытки отправки за последние days дней по игроку, команде или telegramId"""
+    filters = ['"createdAt" >= NOW() - make_interval(days => %s)']
+    params = [int(days)]
+    for column, value, cast in (('playerId', player_id, '::uuid'), ('teamId', team_id, '::uuid'),
+                                ('telegramId', telegram_id, '::bigint')):
+        if value is not None:
+            filters.append(f'"{column}" = %s{cast}')
+            params.append(value)
+    params.append(int(limit))
+
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(f"""
+            SELECT "id", {', '.join(f'"{column}"' for column in DELIVERY_COLUMNS)}, "createdAt"
+            FROM "BotDeliveryLog"
+            WHERE {' AND '.join(filters)}
+            ORDER BY "createdAt" DESC
+            LIMIT %s
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+    finally:
+        release_connection(connection)
+
+
+PLAYER_LOAD_COLUMNS = (
+    'playerId', 'teamId', 'clubId', 'date', 'dailyLoad', 'sessions', 'weeklyLoad',
+    'monotony', 'strain', 'acwr', 'acuteEwma', 'chronicEwma', 'acwrEwma',
+)
+
+
+def _save_watermark(cursor, table, club_id, watermark):
+    """Сдвигает водяной знак клуба в таблице table (PlayerLoadWatermark, WellnessWatermark)"""
+    if watermark is not None:
+        cursor.execute(f"""
+        INSERT INTO "{table}" ("clubId", "createdAt") VALUES (%s::uuid, %s)
+        ON CONFLICT ("clubId") DO UPDATE SET "createdAt" = EXCLUDED."createdAt", "updatedAt" = NOW()
+        """, (club_id, watermark))
+
+
+def _save_load_watermark(cursor, club_id, watermark, change_ids):
+    """Сдвигает водяной знак клуба и удаляет обработанные правки (drizzle/0043)"""
+    _save_watermark(cursor, 'PlayerLoadWatermark', club_id, watermark)
+    if change_ids:
+        cursor.execute('DELETE FROM "PlayerLoadChange" WHERE "id" = ANY(%s)', (list(change_ids),))
+
+
+def _write_player_loads(delete_query, delete_params, csv_buffer, club_id, watermark, change_ids):
+    columns = ', '.join(f'"{column}"' for column in PLAYER_LOAD_COLUMNS)
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(delete_query, delete_params)
+                deleted = cursor.rowcount
+                cursor.copy_expert(f'COPY "PlayerLoadDaily" ({columns}) FROM STDIN WITH (FORMAT csv)', csv_buffer)
+                written = cursor.rowcount
+                _save_load_watermark(cursor, club_id, watermark, change_ids)
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return deleted, written
+
+
+def replace_player_loads(club_id, csv_buffer, watermark=None, change_ids=()):
+    """Заменяет строки PlayerLoadDaily клуба одним COPY в одной транзакции; ошибки пробрасываются"""
+    return _write_player_loads(
+        'DELETE FROM "PlayerLoadDaily" WHERE "clubId" = %s::uuid', (club_id,),
+        csv_buffer, club_id, watermark, change_ids,
+    )
+
+
+def apply_player_loads(club_id, player_ids, from_dates, csv_buffer, watermark=None, change_ids=()):
+    """Заменяет строки игроков клуба начиная с их дат from_dates; ошибки пробрасываются"""
+    return _write_player_loads(
+        """
+        DELETE FROM "PlayerLoadDaily" d
+        USING unnest(%s::uuid[], %s::date[]) f("playerId", "fromDate")
+        WHERE d."clubId" = %s::uuid AND d."playerId" = f."playerId" AND d."date" >= f."fromDate"
+        """, (list(player_ids), list(from_dates), club_id),
+        csv_buffer, club_id, watermark, change_ids,
+    )
+
+
+PLAYER_WELLNESS_COLUMNS = (
+    'playerId', 'teamId', 'clubId', 'date',
+    'sleepDuration', 'sleepQuality', 'recovery', 'mood', 'muscleCondition', 'baselineDays',
+    'zSleepDuration', 'zSleepQuality', 'zRecovery', 'zMood', 'zMuscleCondition',
+    'readiness', 'readinessScore',
+)
+
+# Распределение готовности по команде за день; readiness <= -1 — заметно ниже личной нормы
+TEAM_WELLNESS_QUERY = """
+INSERT INTO "TeamWellnessDaily" (
+    "teamId", "clubId", "date", "players", "scored",
+    "readinessMean", "readinessP25", "readinessMedian", "readinessP75", "flagged"
+)
+SELECT
+    "teamId",
+    "clubId",
+    "date",
+    COUNT(*),
+    COUNT("readiness"),
+    AVG("readiness"),
+    percentile_cont(0.25) WITHIN GROUP (ORDER BY "readiness"),
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY "readiness"),
+    percentile_cont(0.75) WITHIN GROUP (ORDER BY "readiness"),
+    COUNT(*) FILTER (WHERE "readiness" <= -1)
+FROM "PlayerWellnessDaily"
+WHERE "clubId" = %(club_id)s::uuid AND "teamId" IS NOT NULL
+  AND (%(since)s::date IS NULL OR "date" >= %(since)s::date)
+GROUP BY "teamId", "clubId", "date"
+"""
+
+
+def replace_wellness(club_id, csv_buffer, player_ids=None, from_dates=None, watermark=None):
+    """Записывает строки PlayerWellnessDaily клуба и пересчитывает TeamWellnessDaily.
+
+    Без player_ids строки клуба заменяются целиком, иначе — строки игроков
+    начиная с их дат from_dates, а командные — начиная с самой ранней из них.
+    Все в одной транзакции; ошибки пробрасываются.
+    """
+    columns = ', '.join(f'"{column}"' for column in PLAYER_WELLNESS_COLUMNS)
+    since = min(from_dates) if player_ids else None
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                if player_ids:
+                    cursor.execute("""
+                    DELETE FROM "PlayerWellnessDaily" d
+                    USING unnest(%s::uuid[], %s::date[]) f("playerId", "fromDate")
+                    WHERE d."clubId" = %s::uuid AND d."playerId" = f."playerId" AND d."date" >= f."fromDate"
+                    """, (list(player_ids), list(from_dates), club_id))
+                else:
+                    cursor.execute('DELETE FROM "PlayerWellnessDaily" WHERE "clubId" = %s::uuid', (club_id,))
+                cursor.copy_expert(f'COPY "PlayerWellnessDaily" ({columns}) FROM STDIN WITH (FORMAT csv)', csv_buffer)
+                written = cursor.rowcount
+                cursor.execute("""
+                DELETE FROM "TeamWellnessDaily"
+                WHERE "clubId" = %(club_id)s::uuid AND (%(since)s::date IS NULL OR "date" >= %(since)s::date)
+                """, {'club_id': club_id, 'since': since})
+                cursor.execute(TEAM_WELLNESS_QUERY, {'club_id': club_id, 'since': since})
+                team_rows = cursor.rowcount
+                _save_watermark(cursor, 'WellnessWatermark', club_id, watermark)
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return written, team_rows
+
+
+# --- Загрузка GPS отчетов (uteam_bot.gps_ingest) ---
+
+GPS_REPORT_DATA_COLUMNS = ('gpsReportId', 'playerId', 'canonicalMetric', 'value', 'unit')
+
+# Дата события отчета: тренировка или матч (старые отчеты — только eventId)
+GPS_REPORT_EVENT_JOINS = """
+LEFT JOIN "Training" tr ON tr."id" = COALESCE(r."trainingId", CASE WHEN r."eventType" = 'training' THEN r."eventId" END)
+LEFT JOIN "Match" m ON m."id" = COALESCE(r."matchId", CASE WHEN r."eventType" = 'match' THEN r."eventId" END)
+"""
+GPS_REPORT_EVENT_DATE = """COALESCE(tr."date", m."date")::date"""
+
+GPS_INGEST_QUERIES = {
+    'report': f"""
+    SELECT r."id", r."clubId", r."teamId", r."gpsProfileId", r."gpsSystem", r."fileName", r."filePath",
+        r."ingestStatus", r."eventType", {GPS_REPORT_EVENT_DATE} as "eventDate"
+    FROM "GpsReport" r
+    {GPS_REPORT_EVENT_JOINS}
+    WHERE r."id" = %s::uuid
+    """,
+    # Маппинг колонок профиля и каноническая единица метрики
+    'mappings': """
+    SELECT m."sourceColumn", m."sourceUnit", m."canonicalMetric", c."canonicalUnit"
+    FROM "GpsColumnMapping" m
+    JOIN "GpsCanonicalMetric" c ON c."code" = m."canonicalMetric" AND c."isActive"
+    WHERE m."gpsProfileId" = %s::uuid AND m."isVisible"
+    ORDER BY m."displayOrder"
+    """,
+    'team_players': """
+    SELECT "id", "firstName", "lastName"
+    FROM "Player"
+    WHERE "teamId" = %s::uuid
+    """,
+    # Подтвержденные сопоставления имен GPS системы клуба (uteam_bot.name_matcher)
+    'name_mappings': """
+    SELECT "nameKey", "playerId"
+    FROM "GpsPlayerNameMapping"
+    WHERE "clubId" = %s::uuid AND "gpsSystem" = %s
+    """,
+}
+
+CLUB_ROSTER_QUERY = """
+SELECT p."id", p."firstName", p."lastName", p."teamId"
+FROM "Player" p
+JOIN "Team" t ON t."id" = p."teamId"
+WHERE t."clubId" = %(club_id)s::uuid AND (%(team_id)s::uuid IS NULL OR p."teamId" = %(team_id)s::uuid)
+"""
+
+SAVE_NAME_MAPPINGS_QUERY = """
+INSERT INTO "GpsPlayerNameMapping" ("clubId", "gpsSystem", "nameKey", "filePlayerName", "playerId")
+SELECT %(club_id)s::uuid, %(gps_system)s, v."nameKey", v."filePlayerName", v."playerId"
+FROM unnest(%(keys)s::text[], %(names)s::text[], %(players)s::uuid[]) v("nameKey", "filePlayerName", "playerId")
+ON CONFLICT ("clubId", "gpsSystem", "nameKey") DO UPDATE
+SET "filePlayerName" = EXCLUDED."filePlayerName", "playerId" = EXCLUDED."playerId", "confirmedAt" = NOW()
+"""
+
+
+def fetch_gps_ingest(report_id):
+    """Отчет, маппинг колонок его профиля, игроки команды и подтвержденные сопоставления
+    имен ({nameKey: playerId}) GPS системы отчета; ошибки базы пробрасываются"""
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(GPS_INGEST_QUERIES['report'], (report_id,))
+            report = cursor.fetchone()
+            if report is None:
+                return None, [], [], {}
+            mappings, players = [], []
+            if report['gpsProfileId']:
+                cursor.execute(GPS_INGEST_QUERIES['mappings'], (report['gpsProfileId'],))
+                mappings = [dict(row) for row in cursor.fetchall()]
+            cursor.execute(GPS_INGEST_QUERIES['team_players'], (report['teamId'],))
+            players = [dict(row) for row in cursor.fetchall()]
+            cursor.execute(GPS_INGEST_QUERIES['name_mappings'], (report['clubId'], report['gpsSystem']))
+            confirmed = {row['nameKey']: str(row['playerId']) for row in cursor.fetchall()}
+            return dict(report), mappings, players, confirmed
+    finally:
+        release_connection(connection)
+
+
+def fetch_club_roster(club_id, team_id=None, gps_system=None):
+    """Игроки клуба (или команды) и подтвержденные сопоставления имен GPS системы
+    ({nameKey: playerId}, пусто без gps_system); ошибки базы пробрасываются"""
+    connection = get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+
+    try:
+        with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            cursor.execute(CLUB_ROSTER_QUERY, {'club_id': club_id, 'team_id': team_id})
+            players = [dict(row) for row in cursor.fetchall()]
+            confirmed = {}
+            if gps_system:
+                cursor.execute(GPS_INGEST_QUERIES['name_mappings'], (club_id, gps_system))
+                confirmed = {row['nameKey']: str(row['playerId']) for row in cursor.fetchall()}
+            return players, confirmed
+    finally:
+        release_connection(connection)
+
+
+def save_gps_name_mappings(club_id, gps_system, rows):
+    """Сохраняет подтвержденные сопоставления (nameKey, filePlayerName, playerId); ошибки пробрасываются.
+
+    Строки с одним nameKey схлопываются (действует последняя): ON CONFLICT DO UPDATE
+    не может изменить одну строку дважды.
+    """
+    rows = list({row[0]: row for row in rows}.values())
+    if not rows:
+        return 0
+    keys, names, players = (list(column) for column in zip(*rows))
+    params = {'club_id': club_id, 'gps_system': gps_system, 'keys': keys, 'names': names, 'players': players}
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(SAVE_NAME_MAPPINGS_QUERY, params)
+                saved = cursor.rowcount
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return saved
+
+
+GPS_METRIC_ARRAY_COLUMNS = (
+    'gpsReportId', 'canonicalMetric', 'clubId', 'teamId', 'eventType', 'eventDate', 'unit', 'playerIds', 'values',
+)
+
+
+def _write_gps_metric_arrays(cursor, report_ids, csv_buffer):
+    columns = ', '.join(f'"{column}"' for column in GPS_METRIC_ARRAY_COLUMNS)
+    cursor.execute('DELETE FROM "GpsReportMetricArray" WHERE "gpsReportId" = ANY(%s::uuid[])', (list(report_ids),))
+    cursor.copy_expert(f'COPY "GpsReportMetricArray" ({columns}) FROM STDIN WITH (FORMAT csv)', csv_buffer)
+    return cursor.rowcount
+
+
+def replace_gps_metric_arrays(report_ids, csv_buffer):
+    """Заменяет колоночную копию отчетов report_ids одним COPY; ошибки пробрасываются"""
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                written = _write_gps_metric_arrays(cursor, report_ids, csv_buffer)
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return written
+
+
+def replace_gps_report_data(report_id, csv_buffer, players_count, arrays_buffer=None):
+    """Заменяет строки GpsReportData отчета одним COPY и отмечает отчет обработанным.
+
+    arrays_buffer — CSV колоночной копии (GpsReportMetricArray) тех же значений.
+    Все в одной транзакции; ошибки пробрасываются.
+    """
+    columns = ', '.join(f'"{column}"' for column in GPS_REPORT_DATA_COLUMNS)
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM "GpsReportData" WHERE "gpsReportId" = %s::uuid', (report_id,))
+                cursor.copy_expert(f'COPY "GpsReportData" ({columns}) FROM STDIN WITH (FORMAT csv)', csv_buffer)
+                written = cursor.rowcount
+                if arrays_buffer is not None:
+                    _write_gps_metric_arrays(cursor, [report_id], arrays_buffer)
+                cursor.execute("""
+                UPDATE "GpsReport"
+                SET "ingestStatus" = 'completed', "ingestError" = NULL, "status" = 'processed',
+                    "isProcessed" = true, "processedAt" = NOW(), "playersCount" = %s, "updatedAt" = NOW()
+                WHERE "id" = %s::uuid
+                """, (players_count, report_id))
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return written
+
+
+def mark_gps_report_failed(report_id, error):
+    """Сохраняет ошибку загрузки в GpsReport; ошибки базы только логируются"""
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                UPDATE "GpsReport"
+                SET "ingestStatus" = 'failed', "ingestError" = %s, "errorMessage" = %s, "updatedAt" = NOW()
+                WHERE "id" = %s::uuid
+                """, (error, error, report_id))
+            connection.commit()
+            return True
+        except Exception as e:
+            if not connection.closed:
+                connection.rollback()
+            print(f"[DB] Ошибка записи статуса GPS отчета {report_id}: {e}")
+            return False
+
+
+# --- Игровые модели (uteam_bot.game_models) ---
+
+# Обновление существующих моделей и вставка новых одним запросом: уникального
+# индекса по ("playerId", "clubId") в таблице нет, поэтому без ON CONFLICT
+UPSERT_GAME_MODELS_QUERY = """
+WITH v AS (
+    SELECT *
+    FROM unnest(%(players)s::uuid[], %(matches)s::int[], %(minutes)s::int[], %(metrics)s::jsonb[], %(match_ids)s::jsonb[])
+        v("playerId", "matchesCount", "totalMinutes", "metrics", "matchIds")
+),
+updated AS (
+    UPDATE "PlayerGameModel" g
+    SET "calculatedAt" = NOW(), "matchesCount" = v."matchesCount", "totalMinutes" = v."totalMinutes",
+        "metrics" = v."metrics", "matchIds" = v."matchIds", "version" = g."version" + 1, "updatedAt" = NOW()
+    FROM v
+    WHERE g."clubId" = %(club_id)s::uuid AND g."playerId" = v."playerId"
+    RETURNING g."playerId"
+)
+INSERT INTO "PlayerGameModel" ("playerId", "clubId", "matchesCount", "totalMinutes", "metrics", "matchIds")
+SELECT v."playerId", %(club_id)s::uuid, v."matchesCount", v."totalMinutes", v."metrics", v."matchIds"
+FROM v
+WHERE v."playerId" NOT IN (SELECT "playerId" FROM updated)
+"""
+
+# Как cleanupAllInvalidGameModels: модели без матчей или с матчами без отчета
+# удаляются, если пересчет не дал игроку новой модели
+DELETE_GAME_MODELS_QUERY = """
+DELETE FROM "PlayerGameModel" g
+WHERE g."clubId" = %(club_id)s::uuid
+  AND NOT (g."playerId" = ANY(%(players)s::uuid[]))
+  AND CASE WHEN jsonb_typeof(g."matchIds") = 'array' THEN
+        jsonb_array_length(g."matchIds") = 0
+        OR EXISTS (
+            SELECT 1 FROM jsonb_array_elements_text(g."matchIds") m("id")
+            WHERE NOT (m."id" = ANY(%(valid_match_ids)s::text[]))
+        )
+      ELSE true END
+"""
+
+
+def replace_game_models(club_id, rows, valid_match_ids):
+    """Записывает модели клуба в одной транзакции; возвращает (записано, удалено).
+
+    rows — (playerId, matchesCount, totalMinutes, metrics JSON, matchIds JSON).
+    Ошибки пробрасываются.
+    """
+    players, matches, minutes, metrics, match_ids = (list(column) for column in zip(*rows)) if rows else ([],) * 5
+    params = {
+        'club_id': club_id, 'players': players, 'matches': matches, 'minutes': minutes,
+        'metrics': metrics, 'match_ids': match_ids, 'valid_match_ids': list(valid_match_ids),
+    }
+    with _writer_lock:
+        connection = get_writer_connection()
+        if connection is None:
+            raise psycopg2.OperationalError("пользователь-писатель не настроен (BOT_WRITER_DB_PASSWORD)")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(UPSERT_GAME_MODELS_QUERY, params)
+                cursor.execute(DELETE_GAME_MODELS_QUERY, params)
+                deleted = cursor.rowcount
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+    return len(rows), deleted
@@ -0,0 +1,54 @@
+"""
+Дедупликация ручных отправок по ключу идемпотентности
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class IdempotencyStore:
+    """Результаты отправок по ключу с коротким TTL.
+
+    Повторный запрос с тем же ключом получает исходный результат без
+    повторной отправки; одновременные дубликаты ждут первый запрос.
+    Неуспешные результаты не запоминаются, чтобы повтор мог отправить заново.
+    """
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl = ttl_seconds
+        # key -> (expires_at, future); порядок вставки совпадает с порядком истечения
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _purge(self, now):
+        while self._entries:
+            key, (expires_at, future) = next(iter(self._entries.items()))
+            if expires_at > now or not future.done():
+                break
+            self._entries.popitem(last=False)
+
+    async def run(self, key, send, is_success=lambda result: True):
+        """Выполняет send() один раз на ключ; возвращает (результат, повтор ли это)"""
+        now = time.monotonic()
+        self._purge(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return await asyncio.shield(entry[1]), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (now + self.ttl, future)
+        try:
+            result = await send()
+        except BaseException as e:
+            self._entries.pop(key, None)
+            future.set_exception(e)
+            # Исключение уже передано вызывающему; ждущие дубликаты получат его из future
+            future.exception()
+            raise
+        if not is_success(result):
+            self._entries.pop(key, None)
+        future.set_result(result)
+        return result, False
@@ -0,0 +1,267 @@
+"""
+Диагностика доставки утреннего или RPE опроса по всем игрокам сразу.
+
+Вместо 4-5 запросов на каждого игрока (quick-check.py, check-player-*.py)
+выполняются четыре запроса на всю выборку, а причина для каждого игрока
+вычисляется в памяти. Для RPE проверяются расписания тренировок и матчей
+на сегодня в таймзоне команды (RPESchedule, RPEScheduleMatch).
+
+Запуск:
+    python -m uteam_bot.diagnostics                       # все клубы, утренний опрос
+    python -m uteam_bot.diagnostics --club <clubId> --csv report.csv
+    python -m uteam_bot.diagnostics --club <clubId> --type rpe --only-problems
+    python -m uteam_bot.diagnostics --pin 550595
+"""
+
+import argparse
+import csv
+import sys
+from collections import Counter
+
+import psycopg2.errors
+import psycopg2.extras
+import pytz
+
+from . import db
+from .scheduler import parse_recipients
+
+# Коды причин в порядке проверки: игроку присваивается первая сработавшая
+REASONS = {
+    'no_telegram_id': 'Нет Telegram ID — игрок должен написать /start боту',
+    'no_schedule': 'Для команды не настроена рассылка (RPE — нет расписания на сегодня)',
+    'schedule_disabled': 'Рассылка команды отключена (RPE — отменена или просрочена)',
+    'excluded_by_recipients': 'Игрок не входит в список получателей (recipientsConfig)',
+    'no_active_survey': 'У клуба нет активного опросника этого типа (Survey)',
+    'suppressed_chat': 'Чат недоступен: бот заблокирован или аккаунт удален',
+    'timezone_invalid': 'Некорректная таймзона команды — рассылка уходит по UTC+3',
+    'ok': 'Все проверки пройдены',
+}
+
+PLAYERS_QUERY = """
+SELECT
+    p."id",
+    p."firstName",
+    p."lastName",
+    p."pinCode",
+    p."telegramId",
+    p."teamId",
+    t."name" as "teamName",
+    t."clubId",
+    t."timezone"
+FROM "Player" p
+JOIN "Team" t ON p."teamId" = t."id"
+WHERE (%(club_id)s::uuid IS NULL OR t."clubId" = %(club_id)s::uuid)
+  AND (%(team_id)s::uuid IS NULL OR t."id" = %(team_id)s::uuid)
+  AND (%(pin)s::text IS NULL OR p."pinCode" = %(pin)s::text)
+"""
+
+# Расписания команд по типу опроса; у команды их может быть несколько
+# (уникального ограничения на teamId нет, у RPE — по расписанию на тренировку),
+# поэтому включенные идут первыми, затем по времени отправки
+SCHEDULES_QUERIES = {
+    'morning': """
+    SELECT ss."teamId", ss."enabled", ss."sendTime", ss."recipientsConfig"
+    FROM "SurveySchedule" ss
+    WHERE ss."surveyType" = 'morning' AND ss."teamId" = ANY(%s::uuid[])
+    ORDER BY ss."teamId", ss."enabled" DESC, ss."sendTime", ss."id"
+    """,
+    # RPE тренировок и матчей, которые проходят сегодня в таймзоне команды;
+    # отмененные и просроченные считаются выключенными
+    'rpe': db.TEAM_TODAY_CTE + """
+    SELECT *
+    FROM (
+        SELECT rs."teamId", rs."status" IN ('scheduled', 'sent') as "enabled",
+            TO_CHAR(rs."scheduledTime", 'HH24:MI') as "sendTime", rs."recipientsConfig"
+        FROM "RPESchedule" rs
+        JOIN team_today t ON rs."teamId" = t."id"
+        JOIN "Training" tr ON rs."trainingId" = tr."id"
+        WHERE tr."date" = t."today" AND rs."teamId" = ANY(%(team_ids)s::uuid[])
+        UNION ALL
+        SELECT rsm."teamId", rsm."status" IN ('scheduled', 'sent'),
+            TO_CHAR(rsm."scheduledTime", 'HH24:MI'), rsm."recipientsConfig"
+        FROM "RPEScheduleMatch" rsm
+        JOIN team_today t ON rsm."teamId" = t."id"
+        JOIN "Match" m ON rsm."matchId" = m."id"
+        WHERE m."date" = t."today" AND rsm."teamId" = ANY(%(team_ids)s::uuid[])
+    ) s
+    ORDER BY "teamId", "enabled" DESC, "sendTime"
+    """,
+}
+
+SURVEY_TYPES = tuple(SCHEDULES_QUERIES)
+
+ACTIVE_SURVEYS_QUERY = """
+SELECT DISTINCT s."tenantId"
+FROM "Survey" s
+WHERE s."type" = %s AND s."isActive" = true AND s."tenantId" = ANY(%s::uuid[])
+"""
+
+# Чаты, последняя попытка отправки в которые завершилась блокировкой
+BLOCKED_CHATS_QUERY = """
+SELECT "telegramId"
+FROM (
+    SELECT DISTINCT ON (l."telegramId") l."telegramId", l."outcome"
+    FROM "BotDeliveryLog" l
+    WHERE l."telegramId" = ANY(%s::bigint[])
+    ORDER BY l."telegramId", l."createdAt" DESC
+) last_attempt
+WHERE "outcome" = 'blocked'
+"""
+
+COLUMNS = ('reason', 'playerId', 'firstName', 'lastName', 'pinCode', 'telegramId',
+           'teamName', 'clubId', 'timezone', 'sendTime')
+
+
+def load_snapshot(connection, club_id=None, team_id=None, pin=None, survey_type='morning'):
+    """Четыре запроса: игроки выборки, расписания их команд ({teamId: [расписания]},
+    включенные первыми), активные опросники их клубов и заблокированные чаты по журналу отправок"""
+    with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+        cursor.execute(PLAYERS_QUERY, {'club_id': club_id, 'team_id': team_id, 'pin': pin})
+        players = [dict(row) for row in cursor.fetchall()]
+
+        team_ids = list({str(p['teamId']) for p in players})
+        club_ids = list({str(p['clubId']) for p in players})
+
+        cursor.execute(SCHEDULES_QUERIES[survey_type], {'team_ids': team_ids} if survey_type == 'rpe' else (team_ids,))
+        schedules = {}
+        for row in cursor.fetchall():
+            schedules.setdefault(str(row['teamId']), []).append(dict(row))
+
+        cursor.execute(ACTIVE_SURVEYS_QUERY, (survey_type, club_ids))
+        active_clubs = {str(row['tenantId']) for row in cursor.fetchall()}
+
+        telegram_ids = [int(p['telegramId']) for p in players if p.get('telegramId')]
+        try:
+            cursor.execute(BLOCKED_CHATS_QUERY, (telegram_ids,))
+            blocked = {str(row['telegramId']) for row in cursor.fetchall()}
+        except psycopg2.errors.UndefinedTable:
+            # Миграция журнала отправок еще не применена
+            connection.rollback()
+            blocked = set()
+    return players, schedules, active_clubs, blocked
+
+
+def _recipients(schedule):
+    return set(map(str, parse_recipients(schedule.get('recipientsConfig')) or ())) or None
+
+
+def diagnose(players, schedules, active_clubs, suppressed=frozenset()):
+    """Возвращает строки отчета с кодом причины для каждого игрока.
+
+    schedules — {teamId: [расписания]}; игрок получает опрос, если его выбирает
+    хотя бы одно включенное расписание команды.
+    """
+    valid_timezones = set(pytz.all_timezones)
+    # recipientsConfig разбирается один раз на расписание
+    enabled_by_team = {
+        team_id: [(schedule, _recipients(schedule)) for schedule in team_schedules if schedule.get('enabled')]
+        for team_id, team_schedules in schedules.items()
+    }
+    suppressed = {str(telegram_id) for telegram_id in suppressed}
+
+    rows = []
+    for player in players:
+        team_id = str(player['teamId'])
+        team_schedules = schedules.get(team_id)
+        enabled = enabled_by_team.get(team_id) or []
+        schedule = next((s for s, selected in enabled if selected is None or str(player['id']) in selected), None)
+        telegram_id = player.get('telegramId')
+
+        if not telegram_id:
+            reason = 'no_telegram_id'
+        elif not team_schedules:
+            reason = 'no_schedule'
+        elif not enabled:
+            reason = 'schedule_disabled'
+        elif schedule is None:
+            reason = 'excluded_by_recipients'
+        elif str(player['clubId']) not in active_clubs:
+            reason = 'no_active_survey'
+        elif str(telegram_id) in suppressed:
+            reason = 'suppressed_chat'
+        elif player.get('timezone') not in valid_timezones:
+            reason = 'timezone_invalid'
+        else:
+            reason = 'ok'
+
+        rows.append({
+            'reason': reason,
+            'playerId': player['id'],
+            'firstName': player.get('firstName'),
+            'lastName': player.get('lastName'),
+            'pinCode': player.get('pinCode'),
+            'telegramId': telegram_id,
+            'teamName': player.get('teamName'),
+            'clubId': player.get('clubId'),
+            'timezone': player.get('timezone'),
+            'sendTime': (schedule or (team_schedules or [{}])[0]).get('sendTime'),
+        })
+    return rows
+
+
+def run_diagnostics(club_id=None, team_id=None, pin=None, suppressed=frozenset(), survey_type='morning'):
+    connection = db.get_db_connection()
+    if not connection:
+        raise RuntimeError("Нет подключения к базе данных")
+    try:
+        players, schedules, active_clubs, blocked = load_snapshot(connection, club_id, team_id, pin, survey_type)
+    finally:
+        db.release_connection(connection)
+    return diagnose(players, schedules, active_clubs, blocked | set(suppressed))
+
+
+def write_csv(rows, stream):
+    writer = csv.DictWriter(stream, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def print_table(rows, stream=sys.stdout):
+    widths = {col: max([len(col)] + [len(str(row[col] or '')) for row in rows]) for col in COLUMNS}
+    print('  '.join(col.ljust(widths[col]) for col in COLUMNS), file=stream)
+    for row in rows:
+        print('  '.join(str(row[col] or '').ljust(widths[col]) for col in COLUMNS), file=stream)
+
+
+def print_summary(rows, stream=sys.stdout):
+    counts = Counter(row['reason'] for row in rows)
+    print(f"\nИгроков проверено: {len(rows)}", file=stream)
+    for reason in REASONS:
+        if counts.get(reason):
+            print(f"  {reason:<24} {counts[reason]:>6}  {REASONS[reason]}", file=stream)
+
+
+def _read_ids(path):
+    with open(path, encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Диагностика доставки утреннего или RPE опроса")
+    parser.add_argument('--club', help='ID клуба')
+    parser.add_argument('--team', help='ID команды')
+    parser.add_argument('--pin', help='PIN-код одного игрока')
+    parser.add_argument('--type', choices=SURVEY_TYPES, default='morning',
+                        help='Тип опроса: утренний или RPE тренировок и матчей на сегодня')
+    parser.add_argument('--csv', help='Записать отчет в CSV-файл (- для stdout)')
+    parser.add_argument('--only-problems', action='store_true', help='Не выводить игроков с причиной ok')
+    parser.add_argument('--suppressed', help='Дополнительный файл с telegramId недоступных чатов, по одному в строке')
+    args = parser.parse_args(argv)
+
+    suppressed = _read_ids(args.suppressed) if args.suppressed else frozenset()
+    rows = run_diagnostics(args.club, args.team, args.pin, suppressed, args.type)
+    shown = [row for row in rows if row['reason'] != 'ok'] if args.only_problems else rows
+
+    if args.csv == '-':
+        write_csv(shown, sys.stdout)
+    elif args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            write_csv(shown, f)
+        print(f"Отчет записан в {args.csv}")
+    else:
+        print_table(shown)
+    print_summary(rows, sys.stderr if args.csv == '-' else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Личный ответ после опроса: готовность по утреннему опросу и тренд нагрузки по RPE.
+
+Кэш по telegramId загружается целиком (база утреннего опроса из PlayerWellnessDaily,
+последняя строка PlayerLoadDaily) при прогреве и раз в feedback_refresh_minutes.
+Подтверждение опроса считается из кэша и значений ответа без обращения к базе;
+RPE-ответ сразу сдвигает EWMA игрока в кэше; нагрузка дня в кэше одна — повторный
+ответ за день (веб-приложение заменяет прежний) заменяет ее, а не добавляет.
+"""
+
+import math
+import time
+from datetime import datetime
+
+import pytz
+
+from . import db
+
+METRICS = ('sleepDuration', 'sleepQuality', 'recovery', 'mood', 'muscleCondition')
+
+# Как в uteam_bot.wellness: минимум ответов в личной базе
+MIN_BASELINE = 7
+
+# Как в uteam_bot.loads: сглаживание EWMA за 7 и 28 дней
+ACUTE_LAMBDA = 2 / (7 + 1)
+CHRONIC_LAMBDA = 2 / (28 + 1)
+
+
+class FeedbackCache:
+    """Личные базы утреннего опроса и EWMA нагрузки по telegramId"""
+
+    def __init__(self, default_timezone='Europe/Moscow'):
+        self.default_timezone = default_timezone
+        # telegramId -> (число дней, {метрика: (среднее, SD)})
+        self.wellness = {}
+        # telegramId -> [таймзона, дата строки, acuteEwma, chronicEwma, нагрузка этой даты в EWMA]
+        self.loads = {}
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self):
+        """Перечитывает кэш из базы; ошибки базы пробрасываются (остается прежний кэш)"""
+        rows = db.fetch_feedback()
+        wellness = {}
+        for row in rows['wellness']:
+            baseline = {
+                metric: (row[f'{metric}Mean'], row[f'{metric}Sd']) for metric in METRICS
+            }
+            wellness[str(row['telegramId'])] = (row['days'], baseline)
+        loads = {
+            str(row['telegramId']): [
+                row['timezone'], row['date'], row['acuteEwma'], row['chronicEwma'], row['dailyLoad'] or 0,
+            ]
+            for row in rows['load']
+        }
+        self.wellness, self.loads = wellness, loads
+        self.loaded_at = time.time()
+        return len(wellness) + len(loads)
+
+    def readiness(self, telegram_id, answer):
+        """readinessScore 0..100 ответа answer ({метрика: значение}) или None без базы"""
+        entry = self.wellness.get(str(telegram_id))
+        if entry is None or entry[0] < MIN_BASELINE:
+            self.misses += 1
+            return None
+        days, baseline = entry
+        z_scores = []
+        for metric in METRICS:
+            mean, sd = baseline[metric]
+            value = answer.get(metric)
+            if value is None or mean is None or not sd or sd <= 1e-6:
+                continue
+            z_scores.append((float(value) - float(mean)) / float(sd))
+        if not z_scores:
+            self.misses += 1
+            return None
+        self.hits += 1
+        readiness = sum(z_scores) / len(z_scores)
+        return int(min(100, max(0, round(50 + 10 * readiness))))
+
+    def record_load(self, telegram_id, session_load=None):
+        """Сдвигает EWMA игрока на сегодня с нагрузкой сессии; возвращает ACWR без нее и с ней.
+
+        Нагрузка сегодняшнего дня, уже учтенная в EWMA (строка PlayerLoadDaily за сегодня
+        или прежний ответ), заменяется session_load, поэтому повторная отправка ответа
+        не удваивает нагрузку. Без session_load (длительность неизвестна) EWMA только
+        затухает до сегодня. None — у игрока еще нет строк нагрузки.
+        """
+        entry = self.loads.get(str(telegram_id))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        timezone, last_date, acute, chronic, day_load = entry
+        today = _today(timezone or self.default_timezone)
+        if last_date == today and day_load and session_load:
+            # Прежняя нагрузка дня убирается: EWMA возвращается к значению без нее
+            acute -= ACUTE_LAMBDA * day_load
+            chronic -= CHRONIC_LAMBDA * day_load
+        # Дни без сессий: EWMA затухает, как в пересчете loads
+        for _ in range(max(0, (today - last_date).days)):
+            acute *= 1 - ACUTE_LAMBDA
+            chronic *= 1 - CHRONIC_LAMBDA
+        before = _ratio(acute, chronic)
+        if session_load:
+            acute += ACUTE_LAMBDA * session_load
+            chronic += CHRONIC_LAMBDA * session_load
+            entry[1:] = [today, acute, chronic, session_load]
+        return before, _ratio(acute, chronic)
+
+    def as_dict(self):
+        return {
+            'wellness': len(self.wellness),
+            'loads': len(self.loads),
+            'loadedAt': self.loaded_at,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+def _today(timezone):
+    try:
+        tz = pytz.timezone(timezone)
+    except pytz.UnknownTimeZoneError:
+        tz = pytz.timezone('Europe/Moscow')
+    return datetime.now(tz).date()
+
+
+def _ratio(acute, chronic):
+    if not chronic or chronic <= 0 or math.isnan(chronic):
+        return None
+    return acute / chronic
+
+
+def session_load(payload):
+    """sRPE ответа (RPE × минуты) или None, если длительность не передана"""
+    try:
+        rpe = float(payload.get('rpeScore') or 0)
+        minutes = float(payload.get('durationMinutes') or 0)
+    except (TypeError, ValueError):
+        return None
+    return rpe * minutes if rpe > 0 and minutes > 0 else None
+
+
+def morning_answer(payload):
+    """Значения утреннего опроса из тела запроса"""
+    return {metric: payload.get(metric) for metric in METRICS if payload.get(metric) is not None}
+
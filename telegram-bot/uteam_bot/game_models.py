@@ -0,0 +1,159 @@
+"""
+Игровые модели игроков (PlayerGameModel) для всего клуба одним проходом.
+
+Определения совпадают с src/lib/game-model-calculator.ts: матч игрока учитывается,
+если duration в отчете матча не меньше 60 минут; усредняемые метрики (isAverageable)
+делятся на минуты игры, модель — среднее за последние 10 таких матчей по
+GpsReport.createdAt, значения — за минуту. Веб-приложение считает модель запросами
+на каждого игрока и отчет; здесь отчеты клуба и значения читаются один раз
+(uteam_bot.gps_columns), модели всех игроков считаются NumPy по тензору
+«игрок × отчет × метрика» и записываются в одной транзакции.
+
+Запуск:
+    python -m uteam_bot.game_models                        # все клубы
+    python -m uteam_bot.game_models --club <clubId> --dry-run
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from . import db, gps_columns
+from .config import BotConfig
+
+DURATION_METRIC = 'duration'
+# Минимум минут игры в матче и сколько последних матчей брать в модель
+MIN_MINUTES = 60
+LAST_MATCHES = 10
+
+AVERAGEABLE_QUERY = """
+SELECT "code"
+FROM "GpsCanonicalMetric"
+WHERE "isActive" AND "isAverageable" AND "code" <> 'duration'
+ORDER BY "code"
+"""
+
+# Отчеты матчей, новые первыми
+MATCH_REPORTS_QUERY = """
+SELECT "id", "clubId", "eventId"
+FROM "GpsReport"
+WHERE "eventType" = 'match' AND (%(club_id)s::uuid IS NULL OR "clubId" = %(club_id)s::uuid)
+ORDER BY "clubId", "createdAt" DESC
+"""
+
+
+def read_match_reports(club_id=None):
+    """Усредняемые метрики и отчеты матчей: (коды, {clubId: [(reportId, matchId), ...]})"""
+    connection = db.get_db_connection()
+    if not connection:
+        sys.exit("Нет подключения к базе данных")
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(AVERAGEABLE_QUERY)
+            codes = [row[0] for row in cursor.fetchall()]
+            cursor.execute(MATCH_REPORTS_QUERY, {'club_id': club_id})
+            reports = {}
+            for report_id, club, match_id in cursor.fetchall():
+                reports.setdefault(str(club), []).append((str(report_id), str(match_id)))
+    finally:
+        db.release_connection(connection)
+    return codes, reports
+
+
+def compute_models(report_ids, values, codes):
+    """Модели игроков по отчетам report_ids (новые первыми) и значениям values (MetricValues).
+
+    Возвращает (playerIds, matchesCount, totalMinutes, means, selected): means — матрица
+    игроков × codes за минуту (NaN — метрики нет), selected — отчеты модели игрока.
+    """
+    report_ids = np.asarray(report_ids, dtype=str)
+    order = np.argsort(report_ids)
+    values = values.select(np.isin(values.report_ids, report_ids))
+    report_index = order[np.searchsorted(report_ids[order], values.report_ids)]
+    players, player_index = np.unique(values.player_ids, return_inverse=True)
+    shape = (len(players), len(report_ids))
+
+    duration = values.metrics == DURATION_METRIC
+    minutes = np.full(shape, np.nan)
+    minutes[player_index[duration], report_index[duration]] = values.values[duration] / 60
+    played = minutes >= MIN_MINUTES
+    selected = played & (np.cumsum(played, axis=1) <= LAST_MATCHES)
+
+    metric_position = {code: position for position, code in enumerate(codes)}
+    metric_index = np.array([metric_position.get(metric, -1) for metric in values.metrics.tolist()], dtype=np.int64)
+    averageable = metric_index >= 0
+    tensor = np.full(shape + (len(codes),), np.nan)
+    tensor[player_index[averageable], report_index[averageable], metric_index[averageable]] = values.values[averageable]
+
+    used = selected[:, :, None] & (tensor > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_minute = np.where(used, tensor / minutes[:, :, None], 0.0)
+        counts = used.sum(axis=1)
+        means = np.where(counts > 0, per_minute.sum(axis=1) / counts, np.nan)
+    matches = selected.sum(axis=1)
+    # Math.round: половина округляется вверх
+    total_minutes = np.floor(np.where(selected, minutes, 0.0).sum(axis=1) + 0.5).astype(np.int64)
+    return players, matches, total_minutes, means, selected
+
+
+def model_rows(match_ids, codes, players, matches, total_minutes, means, selected):
+    """Строки для db.replace_game_models: игроки хотя бы с одним матчем модели"""
+    match_ids = np.asarray(match_ids, dtype=str)
+    rows = []
+    for number in np.flatnonzero(matches > 0).tolist():
+        metrics = {code: float(mean) for code, mean in zip(codes, means[number].tolist()) if not np.isnan(mean)}
+        rows.append((
+            str(players[number]), int(matches[number]), int(total_minutes[number]),
+            json.dumps(metrics), json.dumps(match_ids[selected[number]].tolist()),
+        ))
+    return rows
+
+
+def run(club_id=None, dry_run=False, stream=sys.stdout):
+    """Пересчитывает модели игроков каждого клуба с отчетами матчей"""
+    started = time.perf_counter()
+    if not dry_run:
+        # Модели читают колоночную копию: сначала достраиваем новые отчеты и правки
+        gps_columns.run(club_id, stream=stream)
+    elif gps_columns.stale_reports(club_id):
+        print("[GameModel] Есть отчеты без актуальной колоночной копии: --dry-run считает по старым массивам",
+              file=stream)
+    codes, reports = read_match_reports(club_id)
+    total = 0
+    for club, club_reports in reports.items():
+        report_ids, match_ids = zip(*club_reports)
+        values = gps_columns.load_values(club_id=club, report_ids=report_ids, metrics=codes + [DURATION_METRIC])
+        computed = compute_models(report_ids, values, codes)
+        rows = model_rows(match_ids, codes, *computed)
+        written = deleted = 0
+        if not dry_run:
+            written, deleted = db.replace_game_models(club, rows, match_ids)
+        total += len(rows)
+        print(f"[GameModel] Клуб {club}: отчетов {len(report_ids)}, значений {len(values)}, моделей {len(rows)} "
+              f"(записано {written}, удалено {deleted})", file=stream)
+    print(f"[GameModel] Итого моделей: {total} за {time.perf_counter() - started:.2f} с", file=stream)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пересчет игровых моделей игроков (PlayerGameModel)")
+    parser.add_argument('--club', help='ID клуба (по умолчанию все клубы)')
+    parser.add_argument('--dry-run', action='store_true', help='Посчитать без записи в базу')
+    args = parser.parse_args(argv)
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if not args.dry_run and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD (или --dry-run)")
+    try:
+        run(args.club, args.dry_run)
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()
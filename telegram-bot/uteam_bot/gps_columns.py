@@ -0,0 +1,286 @@
+"""
+Колоночная копия GPS отчетов: GpsReportMetricArray хранит по строке на отчет и метрику
+с массивами playerIds и values (double precision[]) вместо строки GpsReportData
+с текстовым значением на каждого игрока.
+
+Сезонная выборка метрики читает несколько сотен коротких строк и сразу получает
+float64 без приведения текста; загрузчики моделей и отчетов используют load_values.
+При загрузке отчета (uteam_bot.gps_ingest) массивы пишутся в той же транзакции,
+этот модуль строит их для старых отчетов и перестраивает отчеты с правками
+(GpsReport.updatedAt или GpsDataChangeLog позже builtAt).
+
+Запуск:
+    python -m uteam_bot.gps_columns                        # отчеты без массивов и с правками
+    python -m uteam_bot.gps_columns --club <clubId> --full  # все отчеты клуба
+    python -m uteam_bot.gps_columns --report <gpsReportId> --dry-run
+"""
+
+import argparse
+import csv
+import io
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+from . import db, units
+from .config import BotConfig
+
+# Отчетов в одной транзакции чтения и записи
+BATCH_REPORTS = 200
+
+REPORT_FIELDS = ('clubId', 'teamId', 'eventType', 'eventDate')
+
+# Отчеты, для которых массивы нужно построить или перестроить; массивы удаленных
+# отчетов и отчетов без данных тоже попадают сюда и удаляются при записи
+STALE_REPORTS_QUERY = """
+WITH built AS (
+    SELECT "gpsReportId", "clubId", MIN("builtAt") as "builtAt"
+    FROM "GpsReportMetricArray"
+    GROUP BY "gpsReportId", "clubId"
+)
+SELECT r."id"
+FROM "GpsReport" r
+LEFT JOIN built a ON a."gpsReportId" = r."id"
+WHERE (%(club_id)s::uuid IS NULL OR r."clubId" = %(club_id)s::uuid)
+  AND (%(report_id)s::uuid IS NULL OR r."id" = %(report_id)s::uuid)
+  AND (a."builtAt" IS NOT NULL OR EXISTS (SELECT 1 FROM "GpsReportData" d WHERE d."gpsReportId" = r."id"))
+  AND (%(full)s OR a."builtAt" IS NULL OR r."updatedAt" > a."builtAt"
+       OR EXISTS (SELECT 1 FROM "GpsDataChangeLog" l WHERE l."reportId" = r."id" AND l."changedAt" > a."builtAt")
+       OR NOT EXISTS (SELECT 1 FROM "GpsReportData" d WHERE d."gpsReportId" = r."id"))
+UNION
+SELECT a."gpsReportId"
+FROM built a
+WHERE %(report_id)s::uuid IS NULL
+  AND (%(club_id)s::uuid IS NULL OR a."clubId" = %(club_id)s::uuid)
+  AND NOT EXISTS (SELECT 1 FROM "GpsReport" r WHERE r."id" = a."gpsReportId")
+ORDER BY 1
+"""
+
+REPORTS_QUERY = f"""
+SELECT r."id", r."clubId", r."teamId", r."eventType", {db.GPS_REPORT_EVENT_DATE}
+FROM "GpsReport" r
+{db.GPS_REPORT_EVENT_JOINS}
+WHERE r."id" = ANY(%(report_ids)s::uuid[])
+"""
+
+# Числовые значения отчетов в порядке столбцов GpsReportData (как CSV загрузки)
+REPORT_DATA_QUERY = """
+SELECT "gpsReportId", "playerId", "canonicalMetric", "value", "unit"
+FROM "GpsReportData"
+WHERE "gpsReportId" = ANY(%(report_ids)s::uuid[]) AND "unit" <> 'string'
+"""
+
+# Значения из массивов по одному на строку; день события — от 1970-01-01
+VALUES_QUERY = """
+SELECT a."gpsReportId", a."teamId", a."eventDate" - DATE '1970-01-01', a."canonicalMetric", v."playerId", v."value"
+FROM "GpsReportMetricArray" a
+CROSS JOIN LATERAL unnest(a."playerIds", a."values") v("playerId", "value")
+WHERE (%(club_id)s::uuid IS NULL OR a."clubId" = %(club_id)s::uuid)
+  AND (%(team_id)s::uuid IS NULL OR a."teamId" = %(team_id)s::uuid)
+  AND (%(report_ids)s::uuid[] IS NULL OR a."gpsReportId" = ANY(%(report_ids)s::uuid[]))
+  AND (%(metrics)s::text[] IS NULL OR a."canonicalMetric" = ANY(%(metrics)s::text[]))
+  AND (%(since)s::date IS NULL OR a."eventDate" >= %(since)s::date)
+  AND (%(until)s::date IS NULL OR a."eventDate" <= %(until)s::date)
+ORDER BY a."canonicalMetric", a."eventDate", a."gpsReportId"
+"""
+
+
+class ReportValues:
+    """Значения GpsReportData в виде столбцов; values — float64, нечисловые — NaN"""
+
+    def __init__(self, report_ids, player_ids, metrics, values, units):
+        self.report_ids = report_ids
+        self.player_ids = player_ids
+        self.metrics = metrics
+        self.values = values
+        self.units = units
+
+    def __len__(self):
+        return len(self.values)
+
+    def select(self, mask):
+        return ReportValues(self.report_ids[mask], self.player_ids[mask], self.metrics[mask],
+                            self.values[mask], self.units[mask])
+
+
+class MetricValues:
+    """Значения из GpsReportMetricArray: плоские массивы, days — день события от 1970-01-01 (-1 — нет даты)"""
+
+    def __init__(self, report_ids, team_ids, days, metrics, player_ids, values):
+        self.report_ids = report_ids
+        self.team_ids = team_ids
+        self.days = days
+        self.metrics = metrics
+        self.player_ids = player_ids
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def select(self, mask):
+        return MetricValues(self.report_ids[mask], self.team_ids[mask], self.days[mask],
+                            self.metrics[mask], self.player_ids[mask], self.values[mask])
+
+
+def parse_copy(stream):
+    """CSV в порядке db.GPS_REPORT_DATA_COLUMNS; строковые значения отбрасываются"""
+    rows = list(csv.reader(stream))
+    if not rows:
+        empty = np.array([], dtype=str)
+        return ReportValues(empty, empty, empty, np.array([], dtype=np.float64), empty)
+    report_ids, player_ids, metrics, values, value_units = (np.array(column, dtype=str) for column in zip(*rows))
+    numeric = value_units != 'string'
+    return ReportValues(report_ids[numeric], player_ids[numeric], metrics[numeric],
+                        units.parse_float(values[numeric], decimal_comma=True), value_units[numeric])
+
+
+def _array(items):
+    return '{' + ','.join(items) + '}'
+
+
+def arrays_csv(data, reports):
+    """CSV для COPY в GpsReportMetricArray: строка на отчет и метрику.
+
+    reports — {gpsReportId: {clubId, teamId, eventType, eventDate}}. Нечисловые значения
+    пропускаются, повтор игрока в метрике отчета — берется первая строка.
+    Возвращает (буфер, число строк).
+    """
+    buffer = io.StringIO()
+    data = data.select(np.isfinite(data.values))
+    data = data.select(np.lexsort((data.player_ids, data.metrics, data.report_ids)))
+    count = 0
+    if len(data):
+        group = np.r_[True, (data.report_ids[1:] != data.report_ids[:-1]) | (data.metrics[1:] != data.metrics[:-1])]
+        repeated = ~group & np.r_[False, data.player_ids[1:] == data.player_ids[:-1]]
+        data = data.select(~repeated)
+        group = group[~repeated]
+        starts = np.flatnonzero(group)
+        ends = np.r_[starts[1:], len(data)]
+        writer = csv.writer(buffer)
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            report = reports[data.report_ids[start]]
+            event_date = report['eventDate']
+            writer.writerow((
+                data.report_ids[start], data.metrics[start], report['clubId'], report['teamId'],
+                report['eventType'], '' if event_date is None else str(event_date), data.units[start],
+                _array(data.player_ids[start:end].tolist()), _array(map(repr, data.values[start:end].tolist())),
+            ))
+        count = len(starts)
+    buffer.seek(0)
+    return buffer, count
+
+
+def stale_reports(club_id=None, report_id=None, full=False):
+    connection = db.get_db_connection()
+    if not connection:
+        sys.exit("Нет подключения к базе данных")
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(STALE_REPORTS_QUERY, {'club_id': club_id, 'report_id': report_id, 'full': full})
+            return [str(row[0]) for row in cursor.fetchall()]
+    finally:
+        db.release_connection(connection)
+
+
+def read_reports(report_ids):
+    """Данные отчетов одним COPY через uteam_bot_reader: (ReportValues, {id: поля отчета})"""
+    connection = db.get_db_connection()
+    if not connection:
+        sys.exit("Нет подключения к базе данных")
+    params = {'report_ids': list(report_ids)}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            cursor.execute(REPORTS_QUERY, params)
+            reports = {str(row[0]): dict(zip(REPORT_FIELDS, row[1:])) for row in cursor.fetchall()}
+            buffer = io.StringIO()
+            query = cursor.mogrify(REPORT_DATA_QUERY, params).decode()
+            cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', buffer)
+    finally:
+        connection.rollback()
+        db.release_connection(connection)
+    buffer.seek(0)
+    data = parse_copy(buffer)
+    # Строки без отчета (удален между запросами) не попадают в массивы
+    return data.select(np.isin(data.report_ids, list(reports))), reports
+
+
+def load_values(club_id=None, team_id=None, report_ids=None, metrics=None, since=None, until=None):
+    """Значения метрик из GpsReportMetricArray одним COPY; ошибки базы пробрасываются"""
+    connection = db.get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+    params = {
+        'club_id': club_id, 'team_id': team_id, 'since': since, 'until': until,
+        'report_ids': list(report_ids) if report_ids is not None else None,
+        'metrics': list(metrics) if metrics is not None else None,
+    }
+    try:
+        with connection.cursor() as cursor:
+            buffer = io.StringIO()
+            query = cursor.mogrify(VALUES_QUERY, params).decode()
+            cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', buffer)
+    finally:
+        connection.rollback()
+        db.release_connection(connection)
+    buffer.seek(0)
+    rows = list(csv.reader(buffer))
+    if not rows:
+        empty = np.array([], dtype=str)
+        return MetricValues(empty, empty, np.array([], dtype=np.int64), empty, empty, np.array([], dtype=np.float64))
+    columns = list(zip(*rows))
+    days = np.array([int(day) if day else -1 for day in columns[2]], dtype=np.int64)
+    return MetricValues(
+        np.array(columns[0], dtype=str),
+        np.array(columns[1], dtype=str),
+        days,
+        np.array(columns[3], dtype=str),
+        np.array(columns[4], dtype=str),
+        np.array(columns[5], dtype=np.float64),
+    )
+
+
+def run(club_id=None, report_id=None, full=False, dry_run=False, stream=sys.stdout):
+    """Строит массивы отчетов без копии или с правками (full — всех отчетов)"""
+    started = time.perf_counter()
+    report_ids = stale_reports(club_id, report_id, full)
+    print(f"[GPS] Отчетов для построения массивов: {len(report_ids)}", file=stream)
+    values = rows = 0
+    for start in range(0, len(report_ids), BATCH_REPORTS):
+        batch = report_ids[start:start + BATCH_REPORTS]
+        data, reports = read_reports(batch)
+        buffer, count = arrays_csv(data, reports)
+        if not dry_run:
+            db.replace_gps_metric_arrays(batch, buffer)
+        values += len(data)
+        rows += count
+        print(f"[GPS] Отчеты {start + 1}-{start + len(batch)}: значений {len(data)}, строк массивов {count}",
+              file=stream)
+    print(f"[GPS] Итого: значений {values}, строк массивов {rows} за {time.perf_counter() - started:.2f} с",
+          file=stream)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Колоночная копия GPS отчетов (GpsReportMetricArray)")
+    parser.add_argument('--club', help='ID клуба (по умолчанию все клубы)')
+    parser.add_argument('--report', help='ID отчета (GpsReport)')
+    parser.add_argument('--full', action='store_true', help='Перестроить все отчеты, а не только новые и с правками')
+    parser.add_argument('--dry-run', action='store_true', help='Построить без записи в базу')
+    args = parser.parse_args(argv)
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if not args.dry_run and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD (или --dry-run)")
+    try:
+        run(args.club, args.report, args.full, args.dry_run)
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""
+Загрузка GPS отчета в GpsReportData: потоковый разбор CSV и XLSX кусками строк,
+проверка и перевод столбцов в канонические единицы NumPy, запись одним COPY.
+
+Файл не загружается в память целиком: CSV читается csv.reader, XLSX — openpyxl
+в режиме read_only, каждые chunk_rows строк превращаются в столбцы. Память ограничена
+куском и результатом (игроки × метрики), поэтому экспорт 10 Гц систем на сотни
+мегабайт загружается так же, как сводная таблица.
+
+Как и в импорте веб-приложения (src/app/api/gps/reports/route.ts), игроку отчета
+соответствует первая строка с его именем, а столбцы берутся из GpsColumnMapping
+профиля отчета. Имена сопоставляются с игроками команды uteam_bot.name_matcher:
+подтвержденные сопоставления GPS системы клуба, «Имя Фамилия» или «Фамилия Имя»
+после транслитерации, иначе единственный лучший кандидат уровня high. --players
+задает сопоставление явно (playerMappings веб-приложения) и после записи отчета
+сохраняет его как подтвержденное.
+
+Запуск:
+    python -m uteam_bot.gps_ingest --report <gpsReportId> --file export.csv
+    python -m uteam_bot.gps_ingest --report <gpsReportId> --file export.xlsx --players players.json --dry-run
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from . import db, gps_columns, name_matcher, units
+from .config import BotConfig
+
+# Строк в одном куске разбора
+CHUNK_ROWS = 20000
+
+# Метрика столбца с именем игрока
+NAME_METRIC = 'athlete_name'
+
+# Сколько несопоставленных имен показывать в отчете
+SHOW_UNMATCHED = 20
+
+
+# --- Потоковый разбор файлов ---
+
+def _csv_chunks(path, chunk_rows):
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as file:
+        sample = file.read(64 * 1024)
+        file.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(file, dialect)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        yield headers
+        rows = []
+        for row in reader:
+            if not any(row):
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+def _xlsx_chunks(path, chunk_rows):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ValueError("Для XLSX нужен пакет openpyxl (pip install openpyxl)")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows_iter = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = None
+        for row in rows_iter:
+            if any(value is not None for value in row):
+                headers = ['' if value is None else str(value).strip() for value in row]
+                break
+        if headers is None:
+            return
+        yield headers
+        rows = []
+        for row in rows_iter:
+            if all(value is None for value in row):
+                continue
+            rows.append(row)
+            if len(rows) >= chunk_rows:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Заголовки и куски файла в виде столбцов: (headers, итератор {заголовок: массив})"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        chunks = _csv_chunks(path, chunk_rows)
+    elif extension == '.xlsx':
+        chunks = _xlsx_chunks(path, chunk_rows)
+    else:
+        raise ValueError(f"Неподдерживаемый формат {extension or 'без расширения'}: поддерживаются .csv и .xlsx")
+    headers = next(chunks, None)
+    if headers is None:
+        raise ValueError("Файл пуст или не содержит данных")
+    headers = [str(header).strip() for header in headers]
+
+    def columns():
+        width = len(headers)
+        for rows in chunks:
+            # Короткие строки дополняются пустыми ячейками, лишние ячейки отбрасываются
+            matrix = np.empty((len(rows), width), dtype=object)
+            for number, row in enumerate(rows):
+                row = tuple(row[:width])
+                matrix[number, :len(row)] = row
+            yield {header: matrix[:, index] for index, header in enumerate(headers)}
+
+    return headers, columns()
+
+
+# --- Проверка и перевод столбцов ---
+
+def _missing(values):
+    return (values == None) | (values == '')  # noqa: E711 — поэлементное сравнение массива
+
+
+def to_canonical(values, source_unit, canonical_unit):
+    """Столбец в канонической единице, как convertUnit при импорте: (значения, маска допустимых).
+
+    Строковые столбцы сохраняются как есть; в отличие от parseFloat веб-импорта
+    запятая в числах считается десятичным разделителем.
+    """
+    if source_unit == 'string':
+        text = units.to_text(values).astype(object)
+        return text, text != ''
+    if source_unit not in units.TIME_FORMATS:
+        values = units.parse_float(values, decimal_comma=True)
+    numbers = units.convert_unit(values, source_unit, canonical_unit)
+    if numbers.dtype.kind != 'f':
+        # Каноническая единица — формат времени: в GpsReportData попадают только числа
+        return np.full(len(numbers), np.nan), np.zeros(len(numbers), dtype=bool)
+    return numbers, np.isfinite(numbers)
+
+
+def format_value(value):
+    """Значение для GpsReportData.value как Number.toString() в JS"""
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 1e21 else repr(value)
+
+
+# --- Сопоставление игроков ---
+
+def read_players_file(players_file):
+    """Явные сопоставления из JSON: [(имя в файле, playerId)]"""
+    with open(players_file, encoding='utf-8') as file:
+        explicit = json.load(file)
+    if isinstance(explicit, dict):
+        explicit = [{'filePlayerName': name, 'playerId': player_id} for name, player_id in explicit.items()]
+    return [(mapping['filePlayerName'], str(mapping['playerId'])) for mapping in explicit
+            if mapping.get('playerId') and mapping.get('filePlayerName')]
+
+
+# --- Загрузка ---
+
+class IngestResult:
+    """Итог разбора: CSV для COPY и статистика по файлу"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.rows = 0
+        self.values = 0
+        self.players = {}
+        self.unmatched = set()
+        self.invalid = {}
+
+
+def ingest_file(report_id, path, mappings, matcher, chunk_rows=CHUNK_ROWS):
+    """Разбирает файл кусками и копит строки GpsReportData первых строк каждого игрока"""
+    headers, chunks = read_chunks(path, chunk_rows)
+    mappings = [mapping for mapping in mappings if mapping['sourceColumn'] in headers]
+    name_mapping = next((m for m in mappings if m['canonicalMetric'] == NAME_METRIC), None)
+    if name_mapping is None:
+        raise ValueError(f"В файле нет столбца, сопоставленного с метрикой {NAME_METRIC} (имя игрока)")
+    # Как в импорте веб-приложения: столбцы без исходной единицы не загружаются
+    # (столбец имени по-прежнему находит строки игроков)
+    mappings = [mapping for mapping in mappings if mapping['sourceUnit']]
+
+    result = IngestResult()
+    for columns in chunks:
+        result.rows += len(columns[name_mapping['sourceColumn']])
+        names = columns[name_mapping['sourceColumn']]
+        names = np.where(_missing(names), '', names).astype(str)
+        # Имен в куске мало даже при 10 Гц: сопоставляем только уникальные
+        unique_names, first_rows = np.unique(names, return_index=True)
+        # В порядке строк файла: разные написания одного игрока — первая строка выигрывает
+        order = np.argsort(first_rows)
+        unique_names, first_rows = unique_names[order], first_rows[order]
+        selected, player_ids = [], []
+        for name, row in zip(unique_names, first_rows):
+            if not name.strip():
+                continue
+            player_id = matcher.resolve(name)
+            if player_id is None:
+                result.unmatched.add(name)
+            elif player_id not in result.players:
+                result.players[player_id] = name
+                selected.append(row)
+                player_ids.append(player_id)
+        if not selected:
+            continue
+        selected = np.array(selected)
+        for mapping in mappings:
+            values, valid = to_canonical(
+                columns[mapping['sourceColumn']][selected], mapping['sourceUnit'], mapping['canonicalUnit']
+            )
+            invalid = int((~valid & ~_missing(columns[mapping['sourceColumn']][selected])).sum())
+            if invalid:
+                result.invalid[mapping['sourceColumn']] = result.invalid.get(mapping['sourceColumn'], 0) + invalid
+            unit = 'string' if mapping['sourceUnit'] == 'string' else mapping['canonicalUnit']
+            for position in np.flatnonzero(valid):
+                result.writer.writerow((
+                    report_id, player_ids[position], mapping['canonicalMetric'], format_value(values[position]), unit,
+                ))
+                result.values += 1
+    result.buffer.seek(0)
+    return result
+
+
+def ingest(report_id, path=None, players_file=None, dry_run=False, chunk_rows=CHUNK_ROWS, stream=sys.stdout):
+    """Загружает файл отчета report_id; возвращает IngestResult"""
+    started = time.perf_counter()
+    report, mappings, players, confirmed = db.fetch_gps_ingest(report_id)
+    if report is None:
+        raise ValueError(f"GPS отчет {report_id} не найден")
+    path = path or report['filePath']
+    if not path:
+        raise ValueError("У отчета нет filePath: укажите --file")
+    if not mappings:
+        raise ValueError("У профиля отчета нет маппинга колонок (GpsColumnMapping)")
+
+    matcher = name_matcher.NameMatcher(players, confirmed)
+    explicit, rejected = {}, []
+    for name, player_id in (read_players_file(players_file) if players_file else []):
+        key = matcher.confirm(name, player_id)
+        if key is None:
+            rejected.append(name)
+        else:
+            # Написания с одним ключом («Ivanov I.» и «IVANOV I»): действует последнее
+            explicit[key] = (key, name, player_id)
+    if rejected:
+        print(f"[GPS] Сопоставления --players с игроками не из команды пропущены: {', '.join(rejected)}", file=stream)
+    result = ingest_file(report_id, path, mappings, matcher, chunk_rows)
+    print(f"[GPS] {os.path.basename(path)}: строк {result.rows}, игроков {len(result.players)}, "
+          f"значений {result.values} за {time.perf_counter() - started:.2f} с", file=stream)
+    if result.unmatched:
+        names = []
+        for name in sorted(result.unmatched)[:SHOW_UNMATCHED]:
+            # Подсказка для --players: лучший кандидат, если он есть
+            found = matcher.candidates(name, top=1)
+            hint = found and found[0].similarity > 0
+            names.append(f"{name} (возможно, {found[0].player_name} {found[0].similarity}%)" if hint else name)
+        print(f"[GPS] Не сопоставлены ({len(result.unmatched)}): {', '.join(names)}", file=stream)
+    for column, count in result.invalid.items():
+        print(f"[GPS] Столбец «{column}»: некорректных значений {count}", file=stream)
+    if not result.players:
+        raise ValueError("Ни одно имя из файла не сопоставлено с игроками команды")
+    if not dry_run:
+        arrays, _ = gps_columns.arrays_csv(gps_columns.parse_copy(result.buffer), {report_id: report})
+        result.buffer.seek(0)
+        written = db.replace_gps_report_data(report_id, result.buffer, len(result.players), arrays)
+        print(f"[GPS] Записано строк GpsReportData: {written}", file=stream)
+        if explicit and report['gpsSystem']:
+            # Явные сопоставления подтверждены: следующие отчеты этой GPS системы клуба их используют.
+            # Отчет уже записан, поэтому ошибка сохранения только логируется
+            try:
+                saved = db.save_gps_name_mappings(str(report['clubId']), report['gpsSystem'], list(explicit.values()))
+                print(f"[GPS] Сохранено подтвержденных сопоставлений имен: {saved}", file=stream)
+            except Exception as e:
+                print(f"[GPS] Ошибка сохранения сопоставлений имен: {e}", file=stream)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Загрузка GPS отчета в GpsReportData")
+    parser.add_argument('--report', required=True, help='ID отчета (GpsReport)')
+    parser.add_argument('--file', help='CSV или XLSX файл (по умолчанию filePath отчета)')
+    parser.add_argument('--players', help='JSON сопоставления имен: [{filePlayerName, playerId}] или {имя: playerId}')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='Строк в куске разбора')
+    parser.add_argument('--dry-run', action='store_true', help='Разобрать без записи в базу')
+    args = parser.parse_args(argv)
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if not args.dry_run and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD (или --dry-run)")
+    try:
+        ingest(args.report, args.file, args.players, args.dry_run, args.chunk_rows)
+    except Exception as e:
+        # Любая ошибка разбора или записи (поврежденный XLSX, csv.Error, ошибки базы)
+        # сохраняется в ingestError, чтобы отчет не оставался в pending
+        if not args.dry_run:
+            db.mark_gps_report_failed(args.report, str(e) or type(e).__name__)
+        sys.exit(f"[GPS] Ошибка загрузки: {e}")
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Хендлеры aiogram: выбор языка, привязка по PIN-коду и главное меню
+"""
+
+import math
+
+from aiogram import Dispatcher, types, F
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+
+from . import data
+from .templates import LANGUAGES, LANGUAGE_BUTTONS
+
+# Состояния пользователя
+user_states = {}
+
+
+async def get_user_language(telegram_id):
+    # Сначала пробуем из user_states
+    lang = user_states.get(telegram_id, {}).get('language')
+    if lang:
+        return lang
+    # Если нет — пробуем из базы
+    lang = await data.get_player_language(telegram_id)
+    if lang in LANGUAGES:
+        return lang
+    return 'ru'  # по умолчанию
+
+
+def language_keyboard():
+    return types.ReplyKeyboardMarkup(
+        keyboard=[[types.KeyboardButton(text=name)] for name in LANGUAGES.values()],
+        resize_keyboard=True
+    )
+
+
+async def start_handler(message: types.Message):
+    await message.answer(
+        "Welcome! Please select your language / Пожалуйста, выберите язык:",
+        reply_markup=language_keyboard()
+    )
+    user_states[message.from_user.id] = {'step': 'choose_language'}
+
+
+async def change_language_handler(message: types.Message):
+    lang = user_states.get(message.from_user.id, {}).get('language', 'en')
+    if lang == 'en':
+        await message.answer("Please select your language:", reply_markup=language_keyboard())
+    else:
+        await message.answer("Пожалуйста, выберите язык:", reply_markup=language_keyboard())
+    user_states[message.from_user.id] = {'step': 'choose_language'}
+
+
+async def language_handler(message: types.Message, state: FSMContext):
+    lang_code = 'en' if message.text == 'English' else 'ru'
+    telegram_id = message.from_user.id
+    user_state = user_states.get(telegram_id, {})
+    is_bound = user_state.get('is_bound') or await data.is_telegram_bound(telegram_id)
+    print(f"[DEBUG] language_handler: telegram_id={telegram_id}, lang_code={lang_code}, user_state={user_state}, is_bound={is_bound}")
+    # Если это смена языка через меню или выбор языка и пользователь уже привязан
+    if user_state.get('step') in ('choose_language', 'change_language') and is_bound:
+        await data.update_player_language(telegram_id, lang_code)
+        await message.answer('Язык успешно изменён.' if lang_code == 'ru' else 'Language changed successfully.', reply_markup=types.ReplyKeyboardRemove())
+        user_states.pop(telegram_id, None)
+        await state.clear()
+        return
+    # Обычная логика для новых пользователей (ещё не привязанных)
+    user_states[telegram_id] = {'step': 'enter_pin', 'language': lang_code}
+    if lang_code == 'en':
+        await message.answer("Please enter your 6-digit pin code:", reply_markup=types.ReplyKeyboardRemove())
+    else:
+        await message.answer("Пожалуйста, введите ваш 6-значный пин-код:", reply_markup=types.ReplyKeyboardRemove())
+
+
+async def pin_handler(message: types.Message, bot_state):
+    pin = message.text.strip()
+    lang = user_states[message.from_user.id].get('language', 'en')
+    if not pin.isdigit() or len(pin) != 6:
+        if lang == 'en':
+            await message.answer("Invalid pin code. Please enter a 6-digit number.")
+        else:
+            await message.answer("Некорректный пин-код. Введите 6-значное число.")
+        return
+    # Перебор PIN-кодов отсекается до обращения к базе
+    allowed, retry_after = bot_state.pin_limiter.allow(message.from_user.id)
+    if not allowed:
+        minutes = max(1, math.ceil(retry_after / 60))
+        if lang == 'en':
+            await message.answer(f"Too many attempts. Please try again in {minutes} min.")
+        else:
+            await message.answer(f"Слишком много попыток. Попробуйте через {minutes} мин.")
+        return
+    success, message_text = await data.bind_telegram_to_player(pin, str(message.from_user.id), lang)
+    if success:
+        bot_state.pin_limiter.reset(message.from_user.id)
+        if lang == 'en':
+            await message.answer("Success! You are now linked and will receive notifications.")
+        else:
+            await message.answer("Успешно! Вы привязаны и будете получать уведомления.")
+    else:
+        if lang == 'en':
+            await message.answer(f"Error: {message_text}")
+        else:
+            await message.answer(f"Ошибка: {message_text}")
+    user_states.pop(message.from_user.id, None)
+
+
+async def menu_handler(message: types.Message, state: FSMContext):
+    lang = await get_user_language(message.from_user.id)
+    if lang == 'en':
+        menu_text = 'Main menu:'
+        menu_kb = types.ReplyKeyboardMarkup(
+            keyboard=[[types.KeyboardButton(text='Change language'), types.KeyboardButton(text='Unlink TelegramID')]],
+            resize_keyboard=True
+        )
+    else:
+        menu_text = 'Главное меню:'
+        menu_kb = types.ReplyKeyboardMarkup(
+            keyboard=[[types.KeyboardButton(text='Сменить язык'), types.KeyboardButton(text='Отвязать TelegramID')]],
+            resize_keyboard=True
+        )
+    await message.answer(menu_text, reply_markup=menu_kb)
+
+
+async def menu_change_language(message: types.Message, state: FSMContext):
+    telegram_id = message.from_user.id
+    # Проверяем, привязан ли TelegramID
+    is_bound = await data.is_telegram_bound(telegram_id)
+    await message.answer('Пожалуйста, выберите язык:', reply_markup=language_keyboard())
+    # Сохраняем в user_states, что это смена языка, а не привязка
+    user_states[telegram_id] = {'step': 'change_language', 'is_bound': is_bound}
+
+
+async def menu_unbind_telegram(message: types.Message, state: FSMContext):
+    lang = await get_user_language(message.from_user.id)
+    success, msg = await data.unbind_telegram_id(message.from_user.id)
+    if success:
+        if lang == 'en':
+            await message.answer('Your TelegramID has been unlinked. Now you can link a new account by entering your pin code.', reply_markup=types.ReplyKeyboardRemove())
+        else:
+            await message.answer('Ваш TelegramID отвязан. Теперь вы можете привязать новый аккаунт, введя пинкод.', reply_markup=types.ReplyKeyboardRemove())
+    else:
+        if lang == 'en':
+            await message.answer(f'Error: {msg}', reply_markup=types.ReplyKeyboardRemove())
+        else:
+            await message.answer(f'Ошибка: {msg}', reply_markup=types.ReplyKeyboardRemove())
+
+
+def register_handlers(dp: Dispatcher):
+    """Регистрирует хендлеры в порядке, в котором их объявлял исходный бот"""
+    dp.message.register(menu_handler, Command('menu'))
+    dp.message.register(menu_change_language, F.text == 'Сменить язык')
+    dp.message.register(menu_unbind_telegram, F.text == 'Отвязать TelegramID')
+    dp.message.register(start_handler, Command("start"))
+    dp.message.register(change_language_handler, F.text.in_([LANGUAGE_BUTTONS['en'], LANGUAGE_BUTTONS['ru']]))
+    dp.message.register(language_handler, F.text.in_(list(LANGUAGES.values())))
+    dp.message.register(pin_handler, lambda m: user_states.get(m.from_user.id, {}).get('step') == 'enter_pin')
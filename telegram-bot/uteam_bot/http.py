@@ -0,0 +1,213 @@
+"""
+HTTP endpoints: ручная отправка опросов из веб-приложения, журнал отправок и health-пробы
+"""
+
+import json
+import time
+from datetime import datetime
+
+from aiohttp import web
+
+from . import db
+from . import data
+from .feedback import morning_answer, session_load
+from .sender import deliver
+from .templates import manual_message, success_message, survey_link
+
+
+def idempotency_key(request, payload, survey_type):
+    """Ключ из заголовка Idempotency-Key или из telegramId+type+date+trainingId"""
+    key = request.headers.get('Idempotency-Key')
+    if key:
+        return f"key:{key}"
+    survey_date = payload.get('surveyDate') or datetime.now().strftime('%Y-%m-%d')
+    return f"{payload.get('telegramId')}:{survey_type}:{survey_date}:{payload.get('trainingId') or ''}"
+
+
+async def _send_manual_survey(request, survey_type):
+    payload = await request.json()
+    telegram_id = payload.get('telegramId')
+    club_id = payload.get('clubId')
+    pin_code = payload.get('pinCode', '------')
+    lang = payload.get('language', 'ru')
+
+    if not telegram_id or not club_id:
+        return web.json_response({'error': 'telegramId и clubId обязательны'}, status=400)
+
+    config = request.app['config']
+    if survey_type == 'rpe':
+        link = survey_link(club_id, 'rpe', payload.get('trainingId'), config.survey_base_url)
+    else:
+        link = survey_link(club_id, base_url=config.survey_base_url)
+    text, button_text = manual_message(survey_type, lang, pin_code)
+
+    async def send():
+        try:
+            await deliver(
+                request.app['bot'], request.app['state'].ledger, telegram_id, text, button_text, link,
+                survey_type=survey_type, local_date=datetime.now().strftime('%Y-%m-%d'), source='manual',
+            )
+            return 200, {'success': True}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    store = request.app['state'].idempotency
+    (status, body), replayed = await store.run(
+        idempotency_key(request, payload, survey_type), send, is_success=lambda result: result[0] == 200
+    )
+    if replayed:
+        print(f"[HTTP] Повторный запрос {survey_type} для {telegram_id}: возвращаем исходный результат")
+    return web.json_response(body, status=status, headers={'Idempotent-Replayed': 'true' if replayed else 'false'})
+
+
+async def handle_send_morning_survey(request):
+    """HTTP endpoint для ручной отправки утреннего опроса"""
+    return await _send_manual_survey(request, 'morning')
+
+
+async def handle_send_rpe_survey(request):
+    """HTTP endpoint для ручной отправки RPE опроса"""
+    return await _send_manual_survey(request, 'rpe')
+
+
+async def send_survey_success_message(bot, telegram_id, lang='ru', survey_date=None, text=None):
+    """Отправляет сообщение об успешном прохождении опроса"""
+    if not survey_date:
+        survey_date = datetime.now().strftime('%d.%m.%Y')
+    try:
+        await bot.send_message(telegram_id, text or success_message(lang, survey_date))
+    except Exception as e:
+        print(f"[SurveySuccess] Ошибка отправки сообщения: {e}")
+
+
+def survey_feedback(cache, telegram_id, payload):
+    """Готовность или тренд нагрузки из кэша FeedbackCache по значениям ответа (без запросов к БД)"""
+    if payload.get('surveyType') == 'rpe':
+        return None, cache.record_load(telegram_id, session_load(payload))
+    answer = morning_answer(payload)
+    return (cache.readiness(telegram_id, answer) if answer else None), None
+
+
+async def handle_send_survey_success(request):
+    """HTTP endpoint для отправки сообщения об успешном прохождении опроса.
+
+    С surveyType и значениями ответа в теле сообщение дополняется личной готовностью
+    или трендом нагрузки из кэша.
+    """
+    payload = await request.json()
+    telegram_id = payload.get('telegramId')
+    lang = payload.get('language', 'ru')
+    survey_date = payload.get('surveyDate') or datetime.now().strftime('%d.%m.%Y')
+    if not telegram_id:
+        return web.json_response({'error': 'telegramId обязателен'}, status=400)
+    readiness, load_trend = survey_feedback(request.app['state'].feedback, telegram_id, payload)
+    text = success_message(lang, survey_date, payload.get('surveyType', 'morning'), readiness, load_trend)
+    await send_survey_success_message(request.app['bot'], telegram_id, lang, survey_date, text)
+    return web.json_response({'success': True, 'readiness': readiness})
+
+
+async def handle_health(request):
+    """Liveness: процесс жив и отвечает на запросы"""
+    state = request.app['state']
+    return web.json_response({'status': 'ok', 'uptime': round(time.time() - state.started_at, 1)})
+
+
+async def handle_ready(request):
+    """Готовность к трафику: прогрев завершен, БД доступна, getMe закэширован, планировщик жив"""
+    checks = request.app['state'].readiness_checks()
+    ready = all(checks.values())
+    return web.json_response({'ready': ready, 'checks': checks}, status=200 if ready else 503)
+
+
+async def handle_status(request):
+    """Сводка для диагностики: очереди, последний тик, загруженные расписания"""
+    state = request.app['state']
+    index = state.schedule_index
+    return web.json_response({
+        'ready': state.ready,
+        'uptime': round(time.time() - state.started_at, 1),
+        'bot': state.bot_info.username if state.bot_info else None,
+        'scheduler': {
+            'lastTickAt': state.last_tick_at,
+            'lastTickDuration': state.last_tick_duration,
+            'ticks': state.ticks,
+            'expiredSchedules': state.expired_schedules,
+        },
+        'schedules': {
+            'mode': index.mode,
+            'loaded': index.count,
+            'loadedAt': index.loaded_at,
+            'timezones': len(index.by_timezone),
+        },
+        'database': {'pool': db.pool_stats(), **db.health},
+        'queues': state.queue_depths(),
+        'pinLimiter': {'rejected': state.pin_limiter.rejected},
+        'reminders': {'sent': state.reminders_sent, 'windowEnd': state.reminder_window_end},
+        'ledger': {
+            'enabled': state.ledger.enabled,
+            'written': state.ledger.written,
+            'failedFlushes': state.ledger.failed_flushes,
+            'dropped': state.ledger.dropped,
+        },
+        'loop': state.loop_monitor.as_dict(),
+        'handlers': state.handler_metrics.as_dict(),
+        'updateProfiles': state.update_profiler.as_dict() if state.update_profiler else None,
+        'feedback': state.feedback.as_dict(),
+        'coalescing': {'inFlight': len(data.flight), 'coalesced': data.flight.coalesced},
+        'startup': state.profile.as_dict() if state.profile else None,
+    })
+
+
+async def handle_metrics(request):
+    """Гистограммы времени хендлеров и задержки event loop в текстовом формате Prometheus"""
+    state = request.app['state']
+    return web.Response(
+        text=state.handler_metrics.prometheus() + state.loop_monitor.prometheus(),
+        content_type='text/plain', charset='utf-8',
+    )
+
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+async def handle_deliveries(request):
+    """Журнал отправок: GET /deliveries?playerId=...&days=30 (или teamId, telegramId)"""
+    query = request.query
+    filters = {
+        'player_id': query.get('playerId'),
+        'team_id': query.get('teamId'),
+        'telegram_id': query.get('telegramId'),
+    }
+    if not any(filters.values()):
+        return web.json_response({'error': 'нужен playerId, teamId или telegramId'}, status=400)
+    try:
+        days = int(query.get('days', request.app['config'].deliveries_default_days))
+        limit = min(int(query.get('limit', 500)), 5000)
+    except ValueError:
+        return web.json_response({'error': 'days и limit должны быть числами'}, status=400)
+    try:
+        rows = await data.fetch_deliveries(days=days, limit=limit, **filters)
+    except Exception as e:
+        return web.json_response({'error': str(e)}, status=500)
+    return web.json_response(
+        {'deliveries': rows, 'count': len(rows)},
+        dumps=lambda obj: json.dumps(obj, default=_json_default, ensure_ascii=False),
+    )
+
+
+def create_app(bot, config, state):
+    """Создает aiohttp-приложение с маршрутами бота"""
+    app = web.Application()
+    app['bot'] = bot
+    app['config'] = config
+    app['state'] = state
+    app.router.add_get('/health', handle_health)
+    app.router.add_get('/ready', handle_ready)
+    app.router.add_get('/status', handle_status)
+    app.router.add_get('/metrics', handle_metrics)
+    app.router.add_get('/deliveries', handle_deliveries)
+    app.router.add_post('/send-morning-survey', handle_send_morning_survey)
+    app.router.add_post('/send-rpe-survey', handle_send_rpe_survey)
+    app.router.add_post('/send-survey-success', handle_send_survey_success)
+    return app
@@ -0,0 +1,116 @@
+"""
+Журнал отправок: каждая попытка отправки копится в памяти и записывается
+в BotDeliveryLog пачками — по размеру буфера или по таймеру, а также
+при остановке процесса.
+"""
+
+import asyncio
+
+from aiogram.exceptions import TelegramForbiddenError
+
+OUTCOME_SENT = 'sent'
+# Бот заблокирован или аккаунт удален — чат недоступен
+OUTCOME_BLOCKED = 'blocked'
+OUTCOME_FAILED = 'failed'
+
+
+def classify_error(error):
+    if isinstance(error, TelegramForbiddenError):
+        return OUTCOME_BLOCKED
+    return OUTCOME_FAILED
+
+
+class DeliveryLedger:
+    """Накопитель записей журнала до следующей записи в БД"""
+
+    def __init__(self, enabled=True, flush_size=500, flush_interval=5.0, max_pending=20000):
+        self.enabled = enabled
+        # Запись в БД запускается при flush_size записях или раз в flush_interval секунд
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        # Выше этого предела отправка ждет записи буфера, а при недоступной БД
+        # самые старые записи отбрасываются
+        self.max_pending = max_pending
+        self._pending = []
+        self._wake = asyncio.Event()
+        self._drained = asyncio.Event()
+        # Одна запись в БД одновременно: фоновая и финальная при остановке
+        self.flush_lock = asyncio.Lock()
+        self.written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, telegram_id, survey_type, local_date, outcome, source='scheduler',
+               schedule_id=None, player_id=None, team_id=None, error=None,
+               latency_ms=None, message_id=None):
+        if not self.enabled:
+            return
+        try:
+            telegram_id = int(telegram_id)
+        except (TypeError, ValueError):
+            return
+        self._pending.append({
+            'scheduleId': schedule_id,
+            'playerId': player_id,
+            'teamId': team_id,
+            'telegramId': telegram_id,
+            'surveyType': survey_type,
+            'source': source,
+            'localDate': local_date,
+            'outcome': outcome,
+            'error': error,
+            'latencyMs': latency_ms,
+            'messageId': message_id,
+        })
+        if len(self._pending) >= self.flush_size:
+            self.wake()
+
+    def wake(self):
+        """Запускает запись буфера, не дожидаясь таймера"""
+        self._wake.set()
+
+    async def throttle(self):
+        """Backpressure: перед отправкой ждет, пока переполненный буфер не будет записан"""
+        if not self.enabled or len(self._pending) < self.max_pending:
+            return
+        self._drained.clear()
+        self.wake()
+        try:
+            await asyncio.wait_for(self._drained.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            overflow = len(self._pending) - self.max_pending + self.flush_size
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+                print(f"[Ledger] Буфер переполнен, отброшено записей: {overflow}")
+
+    def take(self):
+        """Забирает накопленные записи для записи в БД"""
+        rows, self._pending = self._pending, []
+        self._drained.set()
+        return rows
+
+    def requeue(self, rows, error):
+        """Возвращает записи после неудачной записи, чтобы повторить в следующий раз"""
+        self.failed_flushes += 1
+        self._pending = rows + self._pending
+        print(f"[Ledger] Ошибка записи журнала ({len(rows)} записей): {error}")
+
+    async def run(self, flush):
+        """Фоновая запись буфера: flush — корутина, принимающая ledger"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._pending:
+                continue
+            failed_before = self.failed_flushes
+            await asyncio.shield(flush(self))
+            if self.failed_flushes > failed_before:
+                # БД недоступна — следующая попытка не раньше чем через интервал
+                await asyncio.sleep(self.flush_interval)
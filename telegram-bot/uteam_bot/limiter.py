@@ -0,0 +1,60 @@
+"""
+Ограничение частоты попыток ввода PIN-кода
+"""
+
+import time
+from collections import OrderedDict, deque
+
+
+class AttemptLimiter:
+    """Скользящее окно попыток: на один ключ (telegramId) и на весь процесс.
+
+    Отклоненная попытка не доходит до базы и не засчитывается в окно.
+    """
+
+    def __init__(self, per_key=5, key_window=600, global_limit=120, global_window=60):
+        self.per_key = per_key
+        self.key_window = key_window
+        self.global_limit = global_limit
+        self.global_window = global_window
+        # key -> deque моментов попыток; порядок — по последней попытке
+        self._keys = OrderedDict()
+        self._global = deque()
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _purge(self, now):
+        while self._global and self._global[0] <= now - self.global_window:
+            self._global.popleft()
+        while self._keys:
+            key, attempts = next(iter(self._keys.items()))
+            if attempts and attempts[-1] > now - self.key_window:
+                break
+            self._keys.popitem(last=False)
+
+    def allow(self, key):
+        """Возвращает (разрешено ли, через сколько секунд повторить)"""
+        now = time.monotonic()
+        self._purge(now)
+        attempts = self._keys.get(key)
+        if attempts is not None:
+            while attempts and attempts[0] <= now - self.key_window:
+                attempts.popleft()
+            if len(attempts) >= self.per_key:
+                self.rejected += 1
+                return False, attempts[0] + self.key_window - now
+        if len(self._global) >= self.global_limit:
+            self.rejected += 1
+            return False, self._global[0] + self.global_window - now
+        if attempts is None:
+            attempts = self._keys[key] = deque()
+        attempts.append(now)
+        self._keys.move_to_end(key)
+        self._global.append(now)
+        return True, 0
+
+    def reset(self, key):
+        """Сбрасывает окно ключа после успешной привязки"""
+        self._keys.pop(key, None)
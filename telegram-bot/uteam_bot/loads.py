@@ -0,0 +1,612 @@
+"""
+Тренировочная нагрузка по RPE опросам: sRPE, недельная нагрузка, монотонность,
+напряжение и ACWR (скользящий и EWMA) для всех игроков клуба за один проход.
+
+Ответы читаются одним COPY, раскладываются в матрицу «игрок × день» и считаются
+операциями NumPy по всей матрице; результат целиком заменяет строки клуба
+в PlayerLoadDaily. Определения метрик совпадают с RPESurveyAnalysis.tsx.
+
+Инкрементальный режим применяет только ответы, созданные после водяного знака
+клуба, и правки из PlayerLoadChange: у затронутых игроков пересчитываются дни
+начиная с самого раннего затронутого, по 34 сохраненным дням контекста
+и сохраненному состоянию EWMA. Ответ за сегодня пересчитывает одну строку.
+
+Запуск:
+    python -m uteam_bot.loads                    # все клубы
+    python -m uteam_bot.loads --club <clubId>
+    python -m uteam_bot.loads --club <clubId> --dry-run
+    python -m uteam_bot.loads --incremental      # только новые ответы и правки
+"""
+
+import argparse
+import csv
+import io
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+from . import db
+from .config import BotConfig
+
+# Коэффициенты EWMA: 2 / (N + 1) для острого (7 дней) и хронического (28 дней) окна
+ACUTE_LAMBDA = 2 / (7 + 1)
+CHRONIC_LAMBDA = 2 / (28 + 1)
+
+# Сколько дней после последней сессии игрока еще писать строки: дальше окна пусты
+TAIL_DAYS = 27
+
+# Сколько предыдущих дней нужно для окон дня: 7 дней острой и D-34..D-7 хронической нагрузки
+CONTEXT_DAYS = 34
+
+# Перекрытие окна новых ответов после водяного знака
+WATERMARK_OVERLAP = '5 minutes'
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+# День тренировки в таймзоне команды: дата тренировки, иначе дата ответа
+# (то же выражение — в функции player_load_day, drizzle/0043)
+RESPONSE_DAY = """COALESCE(
+        bot_safe_date(tr."date"),
+        (r."createdAt" AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'))::date
+    )"""
+
+RESPONSE_JOINS = """
+LEFT JOIN "Player" p ON p."id" = r."playerId"
+LEFT JOIN "Team" t ON t."id" = p."teamId"
+LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+LEFT JOIN "Training" tr ON tr."id" = r."trainingId"
+"""
+
+# Дни считаются от 1970-01-01, чтобы сразу стать индексами столбцов матрицы
+RESPONSES_QUERY = f"""
+SELECT
+    r."tenantId",
+    r."playerId",
+    p."teamId",
+    {RESPONSE_DAY} - DATE '1970-01-01' as "day",
+    r."rpeScore" * r."durationMinutes" as "load"
+FROM "RPESurveyResponse" r
+{RESPONSE_JOINS}
+WHERE r."durationMinutes" > 0 AND r."rpeScore" > 0
+  AND (%(club_id)s::uuid IS NULL OR r."tenantId" = %(club_id)s::uuid)
+"""
+
+# Затронутые игроки: с какого дня (f."fromDate") пересчитывать их строки
+AFFECTED_PLAYERS = """
+unnest(%(clubs)s::uuid[], %(players)s::uuid[], %(from_dates)s::date[]) f("clubId", "playerId", "fromDate")
+"""
+
+# Первый день новых ответов каждого игрока после водяного знака клуба.
+# Перекрытие окна ловит ответы, чья транзакция зафиксировалась позже соседних:
+# повторная обработка безопасна, строки пересчитываются из исходных ответов.
+NEW_RESPONSES_QUERY = f"""
+SELECT r."tenantId", r."playerId", MIN({RESPONSE_DAY}) - DATE '1970-01-01' as "day"
+FROM "RPESurveyResponse" r
+{RESPONSE_JOINS}
+LEFT JOIN "PlayerLoadWatermark" w ON w."clubId" = r."tenantId"
+WHERE r."durationMinutes" > 0 AND r."rpeScore" > 0
+  AND r."createdAt" > COALESCE(w."createdAt", '-infinity'::timestamptz) - %(overlap)s::interval
+  AND (%(club_id)s::uuid IS NULL OR r."tenantId" = %(club_id)s::uuid)
+GROUP BY r."tenantId", r."playerId"
+"""
+
+# Правки и удаления ответов, перенос тренировок (триггеры drizzle/0043)
+CHANGES_QUERY = """
+SELECT "id", "clubId", "playerId", "date" - DATE '1970-01-01' as "day"
+FROM "PlayerLoadChange"
+WHERE (%(club_id)s::uuid IS NULL OR "clubId" = %(club_id)s::uuid)
+"""
+
+# Последняя сохраненная строка до fromDate (состояние EWMA) и последний день с сессией
+SEED_QUERY = f"""
+SELECT
+    f."clubId",
+    f."playerId",
+    s."date" - DATE '1970-01-01' as "day",
+    s."acuteEwma",
+    s."chronicEwma",
+    s."teamId",
+    (SELECT MAX(d."date") FROM "PlayerLoadDaily" d
+     WHERE d."playerId" = f."playerId" AND d."clubId" = f."clubId"
+       AND d."date" < f."fromDate" AND d."sessions" > 0) - DATE '1970-01-01' as "lastSession"
+FROM {AFFECTED_PLAYERS}
+JOIN LATERAL (
+    SELECT d."date", d."acuteEwma", d."chronicEwma", d."teamId"
+    FROM "PlayerLoadDaily" d
+    WHERE d."playerId" = f."playerId" AND d."clubId" = f."clubId" AND d."date" < f."fromDate"
+    ORDER BY d."date" DESC
+    LIMIT 1
+) s ON true
+"""
+
+# Сохраненная дневная нагрузка за 34 дня до fromDate — окна пересчитываемых дней
+CONTEXT_QUERY = f"""
+SELECT f."clubId", d."playerId", d."date" - DATE '1970-01-01' as "day", d."dailyLoad", d."sessions"
+FROM {AFFECTED_PLAYERS}
+JOIN "PlayerLoadDaily" d ON d."playerId" = f."playerId" AND d."clubId" = f."clubId"
+ AND d."date" >= f."fromDate" - {CONTEXT_DAYS} AND d."date" < f."fromDate"
+"""
+
+# Исходные ответы затронутых игроков начиная с fromDate
+AFFECTED_RESPONSES_QUERY = f"""
+SELECT
+    r."tenantId",
+    r."playerId",
+    p."teamId",
+    {RESPONSE_DAY} - DATE '1970-01-01' as "day",
+    r."rpeScore" * r."durationMinutes" as "load"
+FROM "RPESurveyResponse" r
+JOIN {AFFECTED_PLAYERS} ON f."clubId" = r."tenantId" AND f."playerId" = r."playerId"
+{RESPONSE_JOINS}
+WHERE r."durationMinutes" > 0 AND r."rpeScore" > 0
+  AND {RESPONSE_DAY} >= f."fromDate"
+"""
+
+# Сегодняшний день в таймзоне каждой команды клуба; строка с пустым id — день
+# в Europe/Moscow для игроков без команды (как в RESPONSE_DAY)
+TEAM_TODAY_QUERY = """
+SELECT t."id"::text, (NOW() AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'))::date - DATE '1970-01-01'
+FROM "Team" t
+LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+WHERE %(club_id)s::uuid IS NULL OR t."clubId" = %(club_id)s::uuid
+UNION ALL
+SELECT '', (NOW() AT TIME ZONE 'Europe/Moscow')::date - DATE '1970-01-01'
+"""
+
+
+class Responses:
+    """Ответы RPE в виде столбцов"""
+
+    def __init__(self, club_ids, player_ids, team_ids, days, loads):
+        self.club_ids = club_ids
+        self.player_ids = player_ids
+        self.team_ids = team_ids
+        self.days = days
+        self.loads = loads
+
+    def __len__(self):
+        return len(self.days)
+
+    def select(self, mask):
+        return Responses(self.club_ids[mask], self.player_ids[mask], self.team_ids[mask],
+                         self.days[mask], self.loads[mask])
+
+
+def parse_copy(stream):
+    """Разбирает CSV из COPY в столбцы; пустой teamId остается пустой строкой"""
+    rows = list(csv.reader(stream))
+    if not rows:
+        empty = np.array([], dtype=object)
+        return Responses(empty, empty, empty, np.array([], dtype=np.int64), np.array([], dtype=np.float64))
+    club_ids, player_ids, team_ids, days, loads = zip(*rows)
+    return Responses(
+        np.array(club_ids, dtype=object),
+        np.array(player_ids, dtype=object),
+        np.array(team_ids, dtype=object),
+        np.array(days, dtype=np.int64),
+        np.array(loads, dtype=np.float64),
+    )
+
+
+def _copy_responses(cursor, query, params):
+    buffer = io.StringIO()
+    query = cursor.mogrify(query, params).decode()
+    cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', buffer)
+    buffer.seek(0)
+    return parse_copy(buffer)
+
+
+def _snapshot(cursor):
+    """Начинает чтение в одном снимке; возвращает его момент (новый водяной знак)
+    и есть ли в базе таблицы инкрементального режима"""
+    cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+    cursor.execute("""SELECT NOW(), to_regclass('public."PlayerLoadChange"') IS NOT NULL""")
+    return cursor.fetchone()
+
+
+def _team_today(cursor, club_id):
+    """{teamId: сегодняшний день} на момент снимка"""
+    cursor.execute(TEAM_TODAY_QUERY, {'club_id': club_id})
+    return dict(cursor.fetchall())
+
+
+def _reader():
+    connection = db.get_db_connection()
+    if not connection:
+        sys.exit("Нет подключения к базе данных")
+    return connection
+
+
+def _finish_read(connection):
+    connection.rollback()
+    db.release_connection(connection)
+
+
+def read_responses(club_id=None):
+    """Читает ответы клуба (или всех клубов) одним COPY через uteam_bot_reader.
+
+    Возвращает (ответы, водяной знак, id правок по клубам, {teamId: сегодняшний день});
+    без миграции 0043 водяной знак — None.
+    """
+    connection = _reader()
+    try:
+        with connection.cursor() as cursor:
+            snapshot, incremental = _snapshot(cursor)
+            team_today = _team_today(cursor, club_id)
+            responses = _copy_responses(cursor, RESPONSES_QUERY, {'club_id': club_id})
+            changes = {}
+            if incremental:
+                cursor.execute(CHANGES_QUERY, {'club_id': club_id})
+                for change_id, club, _, _ in cursor.fetchall():
+                    changes.setdefault(club, []).append(change_id)
+    finally:
+        _finish_read(connection)
+    return responses, snapshot if incremental else None, changes, team_today
+
+
+def _window_sum(cumulative, size, lag=0):
+    """Сумма за size дней, заканчивающихся на lag дней раньше каждого дня.
+
+    cumulative — накопленные суммы с нулевым первым столбцом.
+    """
+    days = cumulative.shape[1] - 1
+    end = np.arange(1, days + 1) - lag
+    start = np.clip(end - size, 0, None)
+    end = np.clip(end, 0, None)
+    return cumulative[:, end] - cumulative[:, start]
+
+
+def _ratio(numerator, denominator):
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def compute_metrics(daily, sessions, start=None, acute_seed=None, chronic_seed=None):
+    """Метрики нагрузки по матрице дневной нагрузки players × days.
+
+    start — первый пересчитываемый столбец каждого игрока: EWMA до него держит
+    значение seed (состояние на день start - 1). Окна считаются по всей матрице,
+    поэтому перед start должно быть CONTEXT_DAYS дней контекста.
+    """
+    players, days = daily.shape
+    zero = np.zeros((players, 1))
+    cumulative = np.hstack([zero, np.cumsum(daily, axis=1)])
+    cumulative_sq = np.hstack([zero, np.cumsum(daily * daily, axis=1)])
+
+    # Недельная нагрузка: D-6..D
+    weekly = _window_sum(cumulative, 7)
+    # Монотонность: среднее / стандартное отклонение (по генеральной совокупности) за 7 дней
+    mean = weekly / 7
+    variance = np.clip(_window_sum(cumulative_sq, 7) / 7 - mean * mean, 0, None)
+    sd = np.sqrt(variance)
+    # Погрешность накопленных сумм не должна превращать постоянную нагрузку в огромную монотонность
+    sd[sd <= 1e-6 * np.maximum(mean, 1)] = 0
+    monotony = _ratio(mean, sd)
+    strain = weekly * monotony
+    # Хроническая нагрузка: среднее недельных нагрузок на D-7, D-14, D-21, D-28 = сумма D-34..D-7 / 4
+    chronic = _window_sum(cumulative, 28, lag=7) / 4
+    acwr = _ratio(weekly, chronic)
+
+    # EWMA рекурсивна по дням, но каждый шаг — одна операция над всеми игроками
+    start = np.zeros(players, dtype=np.int64) if start is None else start
+    acute_state = np.zeros(players) if acute_seed is None else np.asarray(acute_seed, dtype=np.float64)
+    chronic_state = np.zeros(players) if chronic_seed is None else np.asarray(chronic_seed, dtype=np.float64)
+    acute_ewma = np.empty((players, days))
+    chronic_ewma = np.empty((players, days))
+    for day in range(days):
+        active = day >= start
+        acute_state = np.where(active, ACUTE_LAMBDA * daily[:, day] + (1 - ACUTE_LAMBDA) * acute_state, acute_state)
+        chronic_state = np.where(
+            active, CHRONIC_LAMBDA * daily[:, day] + (1 - CHRONIC_LAMBDA) * chronic_state, chronic_state
+        )
+        acute_ewma[:, day] = acute_state
+        chronic_ewma[:, day] = chronic_state
+
+    return {
+        'dailyLoad': daily,
+        'sessions': sessions,
+        'weeklyLoad': weekly,
+        'monotony': monotony,
+        'strain': strain,
+        'acwr': acwr,
+        'acuteEwma': acute_ewma,
+        'chronicEwma': chronic_ewma,
+        'acwrEwma': _ratio(acute_ewma, chronic_ewma),
+    }
+
+
+def compute_loads(player_index, day_index, loads, players, days):
+    """Метрики нагрузки для матрицы players × days.
+
+    player_index и day_index — номера строки и столбца каждого ответа,
+    loads — его sRPE. Возвращает словарь матриц той же формы.
+    """
+    daily = np.zeros((players, days))
+    sessions = np.zeros((players, days), dtype=np.int64)
+    np.add.at(daily, (player_index, day_index), loads)
+    np.add.at(sessions, (player_index, day_index), 1)
+    return compute_metrics(daily, sessions)
+
+
+def _today_day(today=None):
+    return int((np.datetime64(today or date.today(), 'D') - EPOCH).astype(np.int64))
+
+
+def _today_days(team_ids, today=None):
+    """Сегодняшний день каждого игрока по таймзоне его команды.
+
+    today — {teamId: день} из TEAM_TODAY_QUERY или одна дата для всех игроков.
+    """
+    if isinstance(today, dict):
+        default = today.get('', _today_day())
+        return np.array([today.get(team_id, default) for team_id in team_ids.tolist()], dtype=np.int64)
+    return np.full(len(team_ids), _today_day(today), dtype=np.int64)
+
+
+def _latest_team(player_index, days, team_ids, players):
+    """Команда игрока — из его последнего ответа"""
+    order = np.argsort(days, kind='stable')
+    latest = np.full(players, '', dtype=object)
+    latest[player_index[order]] = team_ids[order]
+    return latest
+
+
+def _output_rows(metrics, club_id, player_ids, team_ids, base_day, first, end):
+    """Столбцы строк PlayerLoadDaily: у каждого игрока дни first..end (номера столбцов)"""
+    columns = np.arange(metrics['dailyLoad'].shape[1])
+    rows, cols = np.nonzero((columns >= first[:, None]) & (columns <= end[:, None]))
+    out = {
+        'playerId': player_ids[rows],
+        'teamId': team_ids[rows],
+        'clubId': np.full(len(rows), club_id, dtype=object),
+        'date': (EPOCH + base_day + cols).astype(str),
+    }
+    for name, matrix in metrics.items():
+        values = matrix[rows, cols]
+        out[name] = values if name == 'sessions' else np.round(values, 3)
+    return out, len(rows)
+
+
+def club_loads(responses, today=None):
+    """Строки PlayerLoadDaily одного клуба: (столбцы, число строк).
+
+    Для каждого игрока пишутся дни от первой сессии до последней + TAIL_DAYS,
+    но не позже сегодняшнего дня в таймзоне его команды (today — см. _today_days).
+    """
+    player_ids, player_index = np.unique(responses.player_ids, return_inverse=True)
+    team_ids = _latest_team(player_index, responses.days, responses.team_ids, len(player_ids))
+    today_days = _today_days(team_ids, today)
+    first_day = int(responses.days.min())
+    last_day = max(int(responses.days.max()), min(int(responses.days.max()) + TAIL_DAYS, int(today_days.max())))
+    days = last_day - first_day + 1
+    day_index = responses.days - first_day
+    metrics = compute_loads(player_index, day_index, responses.loads, len(player_ids), days)
+
+    first = np.full(len(player_ids), days)
+    last = np.full(len(player_ids), -1)
+    np.minimum.at(first, player_index, day_index)
+    np.maximum.at(last, player_index, day_index)
+    end = np.maximum(np.minimum(last + TAIL_DAYS, today_days - first_day), last)
+    return _output_rows(metrics, responses.club_ids[0], player_ids, team_ids, first_day, first, end)
+
+
+class Increment:
+    """Затронутые игроки одного клуба и все, что нужно для пересчета их дней"""
+
+    def __init__(self, club_id):
+        self.club_id = club_id
+        # playerId -> первый затронутый день
+        self.from_day = {}
+        self.change_ids = []
+        # playerId -> (день, acuteEwma, chronicEwma, teamId, последний день с сессией)
+        self.seeds = {}
+        # (playerId, день, dailyLoad, sessions) за CONTEXT_DAYS до первого пересчитываемого дня
+        self.context = []
+        self.responses = None
+
+    def touch(self, player_id, day):
+        current = self.from_day.get(player_id)
+        self.from_day[player_id] = day if current is None else min(current, day)
+
+    def start_days(self):
+        """Первый пересчитываемый день: затронутый день или день после последней
+        сохраненной строки, если между ними разрыв (строки клуба идут без пропусков)"""
+        start = {}
+        for player_id, day in self.from_day.items():
+            seed = self.seeds.get(player_id)
+            start[player_id] = min(day, seed[0] + 1) if seed else day
+        return start
+
+
+def _affected_params(increments, days_by_player):
+    clubs, players, from_dates = [], [], []
+    for increment in increments.values():
+        for player_id, day in days_by_player(increment).items():
+            clubs.append(increment.club_id)
+            players.append(player_id)
+            from_dates.append(str(EPOCH + day))
+    return {'clubs': clubs, 'players': players, 'from_dates': from_dates}
+
+
+def read_increment(club_id=None):
+    """Собирает затронутых игроков по водяному знаку и PlayerLoadChange и читает
+    их контекст и ответы в одном снимке. Возвращает (клуб -> Increment, водяной знак,
+    {teamId: сегодняшний день})."""
+    connection = _reader()
+    try:
+        with connection.cursor() as cursor:
+            snapshot, incremental = _snapshot(cursor)
+            if not incremental:
+                sys.exit("Инкрементальный режим требует миграции drizzle/0043_add_player_load_incremental.sql")
+            team_today = _team_today(cursor, club_id)
+            increments = {}
+            cursor.execute(NEW_RESPONSES_QUERY, {'club_id': club_id, 'overlap': WATERMARK_OVERLAP})
+            for club, player_id, day in cursor.fetchall():
+                increments.setdefault(club, Increment(club)).touch(player_id, day)
+            cursor.execute(CHANGES_QUERY, {'club_id': club_id})
+            for change_id, club, player_id, day in cursor.fetchall():
+                increment = increments.setdefault(club, Increment(club))
+                increment.touch(player_id, day)
+                increment.change_ids.append(change_id)
+            if not increments:
+                return increments, snapshot, team_today
+
+            cursor.execute(SEED_QUERY, _affected_params(increments, lambda i: i.from_day))
+            for club, player_id, day, acute, chronic, team_id, last_session in cursor.fetchall():
+                increments[club].seeds[player_id] = (day, acute, chronic, team_id or '', last_session)
+
+            params = _affected_params(increments, Increment.start_days)
+            cursor.execute(CONTEXT_QUERY, params)
+            for club, player_id, day, daily_load, sessions in cursor.fetchall():
+                increments[club].context.append((player_id, day, daily_load, sessions))
+            responses = _copy_responses(cursor, AFFECTED_RESPONSES_QUERY, params)
+            if len(responses):
+                clubs, club_index = np.unique(responses.club_ids, return_inverse=True)
+                for number, club in enumerate(clubs):
+                    increments[club].responses = responses.select(club_index == number)
+    finally:
+        _finish_read(connection)
+    return increments, snapshot, team_today
+
+
+def club_increment(increment, today=None):
+    """Пересчитанные строки затронутых игроков клуба:
+    (столбцы, число строк, игроки, первые пересчитываемые даты).
+
+    Матрица охватывает только дни от самого раннего пересчитываемого дня минус
+    CONTEXT_DAYS: контекст берется из сохраненных строк, затронутые дни — из ответов.
+    """
+    start_by_player = increment.start_days()
+    player_ids = np.array(sorted(start_by_player), dtype=object)
+    start = np.array([start_by_player[player_id] for player_id in player_ids], dtype=np.int64)
+    players = len(player_ids)
+
+    # Сохраненная строка seed — всегда день start - 1, ее EWMA продолжается без пересчета
+    seeds = [increment.seeds.get(player_id) for player_id in player_ids]
+    acute_seed = np.array([seed[1] if seed else 0.0 for seed in seeds])
+    chronic_seed = np.array([seed[2] if seed else 0.0 for seed in seeds])
+    seed_team = np.array([seed[3] if seed else '' for seed in seeds], dtype=object)
+    last_session = np.array([seed[4] if seed and seed[4] is not None else -1 for seed in seeds], dtype=np.int64)
+
+    responses = increment.responses
+    team_ids = seed_team
+    if responses is not None:
+        response_index = np.searchsorted(player_ids, responses.player_ids)
+        np.maximum.at(last_session, response_index, responses.days)
+        latest = _latest_team(response_index, responses.days, responses.team_ids, players)
+        team_ids = np.where(latest != '', latest, seed_team)
+    today_days = _today_days(team_ids, today)
+    end = np.where(last_session >= 0, np.minimum(last_session + TAIL_DAYS, today_days), -1)
+    end = np.where(last_session >= 0, np.maximum(end, last_session), -1)
+
+    base_day = int(start.min()) - CONTEXT_DAYS
+    days = int(max(end.max(), start.max())) - base_day + 1
+    daily = np.zeros((players, days))
+    sessions = np.zeros((players, days), dtype=np.int64)
+    if increment.context:
+        context_players, context_days, context_loads, context_sessions = zip(*increment.context)
+        context_index = np.searchsorted(player_ids, np.array(context_players, dtype=object))
+        context_columns = np.array(context_days, dtype=np.int64) - base_day
+        np.add.at(daily, (context_index, context_columns), np.array(context_loads, dtype=np.float64))
+        np.add.at(sessions, (context_index, context_columns), np.array(context_sessions, dtype=np.int64))
+    if responses is not None:
+        np.add.at(daily, (response_index, responses.days - base_day), responses.loads)
+        np.add.at(sessions, (response_index, responses.days - base_day), 1)
+
+    metrics = compute_metrics(daily, sessions, start - base_day, acute_seed, chronic_seed)
+    columns, count = _output_rows(
+        metrics, increment.club_id, player_ids, team_ids, base_day, start - base_day, end - base_day
+    )
+    from_dates = [str(EPOCH + day) for day in start]
+    return columns, count, player_ids.tolist(), from_dates
+
+
+def to_csv(columns, names=db.PLAYER_LOAD_COLUMNS):
+    """CSV для COPY в порядке names; NaN и пустой teamId становятся NULL"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    lists = []
+    for name in names:
+        values = columns[name]
+        if values.dtype.kind == 'f':
+            values = np.where(np.isnan(values), None, values)
+        lists.append(['' if value is None else value for value in values.tolist()])
+    writer.writerows(zip(*lists))
+    buffer.seek(0)
+    return buffer
+
+
+def run(club_id=None, dry_run=False, today=None, stream=sys.stdout):
+    """Полный пересчет: строки каждого клуба заменяются целиком"""
+    started = time.perf_counter()
+    responses, watermark, changes, team_today = read_responses(club_id)
+    read_seconds = time.perf_counter() - started
+    print(f"[Loads] Прочитано ответов: {len(responses)} за {read_seconds:.2f} с", file=stream)
+    if not len(responses):
+        return 0
+    clubs, club_index = np.unique(responses.club_ids, return_inverse=True)
+    total = 0
+    for number, club in enumerate(clubs):
+        club_started = time.perf_counter()
+        columns, count = club_loads(responses.select(club_index == number), today or team_today)
+        if dry_run:
+            deleted = written = 0
+        else:
+            deleted, written = db.replace_player_loads(club, to_csv(columns), watermark, changes.get(club, ()))
+        total += count
+        print(f"[Loads] Клуб {club}: игроков {len(np.unique(columns['playerId']))}, "
+              f"строк {count} (удалено {deleted}, записано {written}) "
+              f"за {time.perf_counter() - club_started:.2f} с", file=stream)
+    print(f"[Loads] Итого строк: {total} за {time.perf_counter() - started:.2f} с", file=stream)
+    return total
+
+
+def run_incremental(club_id=None, dry_run=False, today=None, stream=sys.stdout):
+    """Инкрементальный пересчет: только дни игроков с новыми или измененными ответами"""
+    started = time.perf_counter()
+    increments, watermark, team_today = read_increment(club_id)
+    print(f"[Loads] Клубов с изменениями: {len(increments)} за {time.perf_counter() - started:.2f} с", file=stream)
+    total = 0
+    for club, increment in increments.items():
+        columns, count, player_ids, from_dates = club_increment(increment, today or team_today)
+        if dry_run:
+            deleted = written = 0
+        else:
+            deleted, written = db.apply_player_loads(
+                club, player_ids, from_dates, to_csv(columns), watermark, increment.change_ids
+            )
+        total += count
+        print(f"[Loads] Клуб {club}: игроков {len(increment.from_day)}, правок {len(increment.change_ids)}, "
+              f"строк {count} (удалено {deleted}, записано {written})", file=stream)
+    print(f"[Loads] Итого строк: {total} за {time.perf_counter() - started:.2f} с", file=stream)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пересчет тренировочной нагрузки (PlayerLoadDaily)")
+    parser.add_argument('--club', help='ID клуба (по умолчанию все клубы)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Пересчитать только новые ответы после водяного знака и правки')
+    parser.add_argument('--dry-run', action='store_true', help='Посчитать без записи в базу')
+    args = parser.parse_args(argv)
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if not args.dry_run and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD (или --dry-run)")
+    try:
+        if args.incremental:
+            run_incremental(args.club, args.dry_run)
+        else:
+            run(args.club, args.dry_run)
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()
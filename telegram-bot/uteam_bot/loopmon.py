@@ -0,0 +1,125 @@
+"""
+Задержка event loop: насколько позже запланированного просыпается корутина-замерщик.
+
+Синхронный вызов в потоке loop (подключение к БД, тяжелый расчет) задерживает все
+задачи бота; сторожевой поток в этот момент снимает стек потока loop, так что
+в отчете видно, какой код его заблокировал.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from .timing import Histogram, prometheus_histogram
+
+# Корзины задержки loop, секунды
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Сколько кадров стека хранить в отчете о блокировке
+STACK_DEPTH = 20
+
+
+class LoopMonitor:
+    """Замер задержки loop, сторожевой поток и отчеты о медленных колбэках asyncio"""
+
+    def __init__(self, interval=0.5, threshold=0.1, keep=20):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram(LAG_BUCKETS)
+        self.last_lag = 0.0
+        # Блокировки, пойманные сторожевым потоком, и медленные колбэки из asyncio debug
+        self.stalls = deque(maxlen=keep)
+        self.slow_callbacks = deque(maxlen=keep)
+        self.stall_count = 0
+        self._beat = None
+        self._reported_beat = None
+        self._loop_thread = None
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    async def run(self):
+        """Корутина-замерщик; запускает сторожевой поток на время работы"""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._beat = now
+                self.last_lag = max(0.0, now - expected)
+                self.lag.observe(self.last_lag)
+                if self.last_lag >= self.threshold:
+                    print(f"[LoopLag] Event loop опоздал на {self.last_lag * 1000:.0f} ms")
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """Сторожевой поток: если пульс замерщика устарел, снимает стек потока loop"""
+        limit = self.interval + self.threshold
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+            if blocked < limit or beat == self._reported_beat:
+                continue
+            # Одна блокировка — один отчет
+            self._reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = traceback.format_stack(frame, limit=-STACK_DEPTH) if frame else []
+            self.stall_count += 1
+            self.stalls.append({
+                'at': time.time(),
+                'blockedMs': round((blocked - self.interval) * 1000, 1),
+                'stack': [line.rstrip() for line in stack],
+            })
+            print(f"[LoopLag] Event loop заблокирован дольше {(blocked - self.interval) * 1000:.0f} ms:\n"
+                  + ''.join(stack))
+
+    def stop(self):
+        self._stop.set()
+
+    def enable_asyncio_debug(self, loop):
+        """Режим отладки asyncio: колбэки дольше threshold попадают в slow_callbacks.
+
+        Отладочный режим заметно замедляет loop, поэтому включается только флагом.
+        """
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+        logging.getLogger('asyncio').addHandler(_SlowCallbackHandler(self))
+
+    def as_dict(self):
+        return {
+            'lastLagMs': round(self.last_lag * 1000, 1),
+            'lag': self.lag.as_dict(),
+            'stalls': self.stall_count,
+            'recentStalls': list(self.stalls),
+            'slowCallbacks': list(self.slow_callbacks),
+        }
+
+    def prometheus(self, name='uteam_bot_loop_lag_seconds'):
+        lines = [f'# TYPE {name} histogram', *prometheus_histogram(name, self.lag),
+                 '# TYPE uteam_bot_loop_stalls_total counter',
+                 f'uteam_bot_loop_stalls_total {self.stall_count}']
+        return '\n'.join(lines) + '\n'
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Перехватывает предупреждения asyncio «Executing <Handle ...> took N seconds»"""
+
+    def __init__(self, monitor):
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record):
+        message = record.getMessage()
+        if not message.startswith('Executing '):
+            return
+        self.monitor.slow_callbacks.append({'at': record.created, 'message': message})
+        print(f"[LoopLag] Медленный колбэк: {message}")
@@ -0,0 +1,272 @@
+"""
+Сопоставление имен игроков из GPS файлов с составом клуба по индексу триграмм.
+
+Оценка и уровни те же, что у calculateSimilarity и getMatchLevel из
+src/lib/player-name-matcher.ts: доля совпавших слов (вхождение одного слова
+в другое — 0.8), бонус 0.2 за слово на своем месте; high от 70, medium от 50,
+low от 30. matchPlayers веб-приложения сравнивает каждое имя файла с каждым игроком;
+здесь имена состава транслитерируются как в src/lib/transliterate.ts и раскладываются
+в индекс «триграмма -> игроки», точная оценка считается только для кандидатов
+с общими триграммами, а имя, совпавшее с ключом игрока, находится словарем.
+normalizeName веб-приложения удаляет кириллицу целиком (\\w в JS — только латиница);
+после транслитерации «Иванов И.» и «Ivanov I.» сравниваются по словам.
+
+Подтвержденные сопоставления хранятся в GpsPlayerNameMapping по клубу и GPS системе
+и применяются раньше индекса.
+
+Запуск:
+    python -m uteam_bot.name_matcher --club <clubId> --system <gpsSystem> "Ivanov I." "Петров Петр"
+    python -m uteam_bot.name_matcher --club <clubId> --team <teamId> --top 3 < names.txt
+    python -m uteam_bot.name_matcher --club <clubId> --system <gpsSystem> --confirm "Ivanov I.=<playerId>"
+"""
+
+import argparse
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+from . import db
+from .config import BotConfig
+
+# Сколько кандидатов возвращать на имя
+TOP = 5
+
+# Сколько игроков с наибольшей долей общих триграмм оценивать точно
+CANDIDATES = 16
+
+# Пороги getMatchLevel
+LEVELS = ((70, 'high'), (50, 'medium'), (30, 'low'))
+
+# Таблица transliterate.ts (строчные буквы); ё приравнивается к е, как в остальных
+# сопоставлениях бота, и добавлены украинские буквы
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd',
+    'е': 'e', 'ё': 'e', 'ж': 'zh', 'з': 'z', 'и': 'i',
+    'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n',
+    'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch',
+    'ш': 'sh', 'щ': 'sch', 'ъ': '', 'ы': 'y', 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya',
+    'і': 'i', 'ї': 'yi', 'є': 'ye', 'ґ': 'g',
+}
+_TRANSLIT = str.maketrans(CYRILLIC_TO_LATIN)
+_PUNCTUATION = re.compile(r'[^\w\s]', re.ASCII)
+
+
+def name_key(name):
+    """Имя для сравнения: транслитерация, без диакритики, регистра и знаков препинания"""
+    text = str(name).lower().translate(_TRANSLIT)
+    text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return ' '.join(_PUNCTUATION.sub('', text).split())
+
+
+def similarity(words1, words2):
+    """calculateSimilarity по словам двух ключей: 0–100"""
+    if words1 == words2:
+        return 100 if words1 else 0
+    matched = 0.0
+    used = set()
+    for word1 in words1:
+        for number, word2 in enumerate(words2):
+            if number in used:
+                continue
+            if word1 == word2:
+                matched += 1
+                used.add(number)
+                break
+            if word1 in word2 or word2 in word1:
+                matched += 0.8
+                used.add(number)
+                break
+    if not matched:
+        return 0
+    order_bonus = 0.2 * sum(word1 == word2 for word1, word2 in zip(words1, words2))
+    # Math.round: половина округляется вверх
+    return int(min(matched / max(len(words1), len(words2)) * 100 + order_bonus, 100) + 0.5)
+
+
+def match_level(score):
+    for threshold, level in LEVELS:
+        if score >= threshold:
+            return level
+    return 'none'
+
+
+def _trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class Candidate:
+    """Игрок-кандидат для имени из файла"""
+
+    __slots__ = ('player_id', 'player_name', 'similarity', 'level', 'trigram', 'confirmed')
+
+    def __init__(self, player_id, player_name, similarity, trigram, confirmed=False):
+        self.player_id = player_id
+        self.player_name = player_name
+        self.similarity = similarity
+        self.level = match_level(similarity)
+        self.trigram = trigram  # доля общих триграмм (коэффициент Дайса)
+        self.confirmed = confirmed
+
+    def __repr__(self):
+        return f"Candidate({self.player_name!r}, {self.similarity}, {self.level})"
+
+
+class NameMatcher:
+    """Индекс имен состава: ключи «Имя Фамилия» и «Фамилия Имя», триграммы слов
+    и подтвержденные сопоставления {nameKey: playerId}"""
+
+    def __init__(self, players, confirmed=None):
+        self.ids, self.names, self.variants = [], [], []
+        self.exact = {}
+        postings, gram_counts = {}, []
+        for position, player in enumerate(players):
+            first, last = player.get('firstName') or '', player.get('lastName') or ''
+            self.ids.append(str(player['id']))
+            self.names.append(f'{first} {last}'.strip())
+            keys = {name_key(f'{first} {last}'), name_key(f'{last} {first}')} - {''}
+            self.variants.append([tuple(key.split()) for key in keys])
+            for key in keys:
+                # Однофамильцы с одинаковым именем: ключ неоднозначен
+                self.exact[key] = position if self.exact.get(key, position) == position else -1
+            grams = _trigrams(name_key(f'{first} {last}').split())
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+        self.gram_counts = np.array(gram_counts, dtype=np.float64)
+        self.positions = {player_id: position for position, player_id in enumerate(self.ids)}
+        # Сопоставления игроков, которых уже нет в составе, не применяются
+        self.confirmed = {key: player_id for key, player_id in (confirmed or {}).items()
+                          if player_id in self.positions}
+        self._resolved = {}
+
+    def confirm(self, name, player_id):
+        """Явное сопоставление имени (например, из playerMappings); возвращает ключ имени
+        или None, если игрока нет в составе или имя пустое"""
+        key, player_id = name_key(name), str(player_id)
+        if not key or player_id not in self.positions:
+            return None
+        self.confirmed[key] = player_id
+        self._resolved.clear()
+        return key
+
+    def _confirmed_candidate(self, player_id):
+        position = self.positions.get(player_id)
+        return Candidate(player_id, self.names[position] if position is not None else '', 100, 1.0, confirmed=True)
+
+    def candidates(self, name, top=TOP):
+        """Лучшие top кандидатов по убыванию оценки; подтвержденный игрок — первым с оценкой 100"""
+        key = name_key(name)
+        if not key:
+            return []
+        if key in self.confirmed:
+            return [self._confirmed_candidate(self.confirmed[key])]
+        words = tuple(key.split())
+        grams = _trigrams(words)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.ids))
+        positions = np.flatnonzero(shared)
+        dice = 2 * shared[positions] / (len(grams) + self.gram_counts[positions])
+        if len(positions) > CANDIDATES:
+            best = np.argpartition(-dice, CANDIDATES)[:CANDIDATES]
+            positions, dice = positions[best], dice[best]
+        exact = self.exact.get(key, -1)
+        if exact >= 0 and exact not in positions:
+            positions, dice = np.append(positions, exact), np.append(dice, 1.0)
+        found = []
+        for position, share in zip(positions.tolist(), dice.tolist()):
+            score = max(similarity(words, variant) for variant in self.variants[position])
+            found.append(Candidate(self.ids[position], self.names[position], score, share))
+        found.sort(key=lambda candidate: (-candidate.similarity, -candidate.trigram, candidate.player_name))
+        return found[:top]
+
+    def match_many(self, names, top=TOP):
+        """{имя: кандидаты} для списка имен (как matchPlayers); повторы считаются один раз"""
+        return {name: self.candidates(name, top) for name in dict.fromkeys(names)}
+
+    def resolve(self, name):
+        """playerId для имени или None: подтвержденное сопоставление, точный ключ или
+        единственный лучший кандидат уровня high"""
+        if name in self._resolved:
+            return self._resolved[name]
+        key = name_key(name)
+        player_id = self.confirmed.get(key)
+        if player_id is None and self.exact.get(key, -1) >= 0:
+            player_id = self.ids[self.exact[key]]
+        elif player_id is None and key not in self.exact:
+            found = self.candidates(name, top=2)
+            if found and found[0].level == 'high' and (len(found) == 1 or found[1].similarity < found[0].similarity):
+                player_id = found[0].player_id
+        self._resolved[name] = player_id
+        return player_id
+
+
+def _print_candidates(name, found, stream):
+    if not found:
+        print(f"[Names] {name}: кандидатов нет", file=stream)
+        return
+    listed = ', '.join(
+        f"{candidate.player_name} ({candidate.player_id}) {candidate.similarity}% "
+        f"{'подтверждено' if candidate.confirmed else candidate.level}"
+        for candidate in found
+    )
+    print(f"[Names] {name}: {listed}", file=stream)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сопоставление имен игроков GPS файлов с составом клуба")
+    parser.add_argument('names', nargs='*', help='Имена из файла (по умолчанию строки stdin)')
+    parser.add_argument('--club', required=True, help='ID клуба')
+    parser.add_argument('--team', help='ID команды (по умолчанию весь клуб)')
+    parser.add_argument('--system', help='GPS система (gpsSystem) для подтвержденных сопоставлений')
+    parser.add_argument('--top', type=int, default=TOP, help='Кандидатов на имя')
+    parser.add_argument('--confirm', action='append', default=[], metavar='ИМЯ=PLAYER_ID',
+                        help='Сохранить подтвержденное сопоставление (нужны --system и BOT_WRITER_DB_PASSWORD)')
+    args = parser.parse_args(argv)
+    if args.confirm and not args.system:
+        sys.exit("--confirm требует --system")
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if args.confirm and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD")
+    try:
+        players, confirmed = db.fetch_club_roster(args.club, args.team, args.system)
+        matcher = NameMatcher(players, confirmed)
+        rows = []
+        for item in args.confirm:
+            name, _, player_id = item.rpartition('=')
+            key = matcher.confirm(name, player_id)
+            if key is None:
+                sys.exit(f"Некорректное сопоставление «{item}»: нужен ИМЯ=PLAYER_ID игрока из состава")
+            rows.append((key, name.strip(), player_id))
+        if rows:
+            saved = db.save_gps_name_mappings(args.club, args.system, rows)
+            print(f"[Names] Сохранено сопоставлений: {saved}")
+
+        names = args.names or ([] if args.confirm else [line.strip() for line in sys.stdin if line.strip()])
+        started = time.perf_counter()
+        matches = matcher.match_many(names, args.top)
+        for name, found in matches.items():
+            _print_candidates(name, found, sys.stdout)
+        if matches:
+            print(f"[Names] Имен {len(matches)}, игроков в составе {len(matcher.ids)}: "
+                  f"{(time.perf_counter() - started) * 1000:.1f} мс")
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+"""
+Проверка планов SQL-запросов бота и советник по индексам.
+
+Бенчмарк создает в отдельной локальной базе схему bot_bench с минимальными
+копиями таблиц бота, заполняет ее данными нескольких масштабов и выполняет
+каждый запрос из db.SCHEDULE_QUERIES и db.PLAYER_QUERIES через
+EXPLAIN (ANALYZE, BUFFERS). Если на масштабе от --enforce-from игроков запрос
+читает таблицу из своего списка guarded через Seq Scan, это считается
+регрессией плана и процесс завершается с кодом 1.
+
+Запуск:
+    python -m uteam_bot.planbench --dsn postgresql://localhost/uteam_bench
+    python -m uteam_bot.planbench --dsn ... --scales 1000,10000,100000
+    python -m uteam_bot.planbench --dsn ... --without-indexes   # план без рекомендованных индексов
+    python -m uteam_bot.planbench --advise                      # индексы рабочей БД (DB_CONFIG)
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import psycopg2
+
+from . import db
+
+BENCH_SCHEMA = 'bot_bench'
+
+# Индексы, на которые опираются запросы бота. in_schema — индекс уже создается
+# схемой Drizzle, остальные добавляют drizzle/0037_add_bot_query_indexes.sql
+# и drizzle/0041_add_player_pin_code_unique.sql
+RECOMMENDED_INDEXES = (
+    {'name': 'Player_telegramId_unique', 'table': 'Player', 'columns': ('telegramId',),
+     'unique': True, 'in_schema': True},
+    {'name': 'Player_pinCode_unique', 'table': 'Player', 'columns': ('pinCode',), 'unique': True},
+    {'name': 'idx_player_team_bound', 'table': 'Player', 'columns': ('teamId',),
+     'where': '"telegramId" IS NOT NULL'},
+    {'name': 'idx_rpe_schedule_scheduled', 'table': 'RPESchedule', 'columns': ('scheduledTime',),
+     'where': '"status" = \'scheduled\''},
+    {'name': 'idx_rpe_schedule_match_scheduled', 'table': 'RPEScheduleMatch', 'columns': ('scheduledTime',),
+     'where': '"status" = \'scheduled\''},
+)
+
+# Минимальные копии таблиц: только колонки, которые читают запросы бота
+BENCH_DDL = """
+CREATE TABLE "Team" (
+    "id" uuid PRIMARY KEY,
+    "name" varchar(255) NOT NULL,
+    "clubId" uuid NOT NULL,
+    "timezone" varchar(64) DEFAULT 'Europe/Moscow' NOT NULL
+);
+CREATE TABLE "Player" (
+    "id" uuid PRIMARY KEY,
+    "firstName" varchar(255) NOT NULL,
+    "lastName" varchar(255) NOT NULL,
+    "pinCode" varchar(255) NOT NULL,
+    "telegramId" bigint,
+    "language" varchar(10),
+    "teamId" uuid NOT NULL,
+    "updatedAt" timestamp with time zone DEFAULT now() NOT NULL
+);
+CREATE TABLE "SurveySchedule" (
+    "id" uuid PRIMARY KEY,
+    "teamId" uuid NOT NULL,
+    "surveyType" varchar(32) DEFAULT 'morning' NOT NULL,
+    "enabled" boolean DEFAULT true NOT NULL,
+    "sendTime" varchar(8) DEFAULT '08:00' NOT NULL,
+    "recipientsConfig" text
+);
+CREATE TABLE "Training" (
+    "id" uuid PRIMARY KEY,
+    "date" varchar(10) NOT NULL,
+    "teamId" uuid NOT NULL
+);
+CREATE TABLE "Match" (
+    "id" uuid PRIMARY KEY,
+    "date" varchar(10) NOT NULL,
+    "teamId" uuid NOT NULL
+);
+CREATE TABLE "RPESchedule" (
+    "id" uuid PRIMARY KEY,
+    "trainingId" uuid NOT NULL,
+    "teamId" uuid NOT NULL,
+    "scheduledTime" time NOT NULL,
+    "status" varchar(20) DEFAULT 'scheduled' NOT NULL,
+    "recipientsConfig" text,
+    "sentAt" timestamp with time zone
+);
+CREATE TABLE "RPEScheduleMatch" (
+    "id" uuid PRIMARY KEY,
+    "matchId" uuid NOT NULL,
+    "teamId" uuid NOT NULL,
+    "scheduledTime" time NOT NULL,
+    "status" varchar(20) DEFAULT 'scheduled' NOT NULL,
+    "recipientsConfig" text,
+    "sentAt" timestamp with time zone
+);
+"""
+
+# 25 игроков на команду, 80% привязали Telegram; 40 тренировок и 10 матчей
+# на команду в пределах ±180 дней, 10% расписаний RPE еще не отправлены
+BENCH_DATA = """
+INSERT INTO "Team" ("id", "name", "clubId", "timezone")
+SELECT md5('team' || t)::uuid, 'Team ' || t, md5('club' || (t %% 50))::uuid,
+       (ARRAY['Europe/Moscow', 'Asia/Yekaterinburg', 'Europe/Samara'])[1 + t %% 3]
+FROM generate_series(0, %(teams)s - 1) t;
+
+INSERT INTO "Player" ("id", "firstName", "lastName", "pinCode", "telegramId", "language", "teamId")
+SELECT md5('player' || i)::uuid, 'Имя' || i, 'Фамилия' || i, lpad(i::text, 6, '0'),
+       CASE WHEN i %% 5 <> 0 THEN 100000000 + i END,
+       (ARRAY['ru', 'en'])[1 + i %% 2], md5('team' || (i %% %(teams)s))::uuid
+FROM generate_series(0, %(players)s - 1) i;
+
+INSERT INTO "SurveySchedule" ("id", "teamId", "enabled", "sendTime")
+SELECT md5('schedule' || t)::uuid, md5('team' || t)::uuid, t %% 7 <> 0, '08:00'
+FROM generate_series(0, %(teams)s - 1) t;
+
+INSERT INTO "Training" ("id", "date", "teamId")
+SELECT md5('training' || k)::uuid, to_char(CURRENT_DATE + (k * 9 %% 360 - 180), 'YYYY-MM-DD'),
+       md5('team' || (k %% %(teams)s))::uuid
+FROM generate_series(0, %(teams)s * 40 - 1) k;
+
+INSERT INTO "Match" ("id", "date", "teamId")
+SELECT md5('match' || k)::uuid, to_char(CURRENT_DATE + (k * 37 %% 360 - 180), 'YYYY-MM-DD'),
+       md5('team' || (k %% %(teams)s))::uuid
+FROM generate_series(0, %(teams)s * 10 - 1) k;
+
+INSERT INTO "RPESchedule" ("id", "trainingId", "teamId", "scheduledTime", "status")
+SELECT md5('rpe' || k)::uuid, md5('training' || k)::uuid, md5('team' || (k %% %(teams)s))::uuid,
+       make_time(8 + k %% 12, k %% 4 * 15, 0), CASE WHEN k %% 10 = 0 THEN 'scheduled' ELSE 'sent' END
+FROM generate_series(0, %(teams)s * 40 - 1) k;
+
+INSERT INTO "RPEScheduleMatch" ("id", "matchId", "teamId", "scheduledTime", "status")
+SELECT md5('rpe_match' || k)::uuid, md5('match' || k)::uuid, md5('team' || (k %% %(teams)s))::uuid,
+       make_time(8 + k %% 12, k %% 4 * 15, 0), CASE WHEN k %% 10 = 0 THEN 'scheduled' ELSE 'sent' END
+FROM generate_series(0, %(teams)s * 10 - 1) k;
+"""
+
+SAMPLE_QUERY = """
+SELECT "id", "teamId", "telegramId", "pinCode"
+FROM "Player"
+WHERE "telegramId" IS NOT NULL
+ORDER BY "id"
+LIMIT 1 OFFSET %s
+"""
+
+
+def bench_queries(sample):
+    """(имя, SQL, параметры, таблицы, которые нельзя читать Seq Scan)"""
+    team_players_selected = db.PLAYER_QUERIES['team_players'] + ' AND p."id" = ANY(%s::uuid[])'
+    queries = [
+        (f'schedules.{survey_type}', query, (), guarded)
+        for survey_type, query, guarded in (
+            ('morning', db.SCHEDULE_QUERIES['morning'], ()),
+            ('rpe', db.SCHEDULE_QUERIES['rpe'], ('RPESchedule',)),
+            ('rpe_match', db.SCHEDULE_QUERIES['rpe_match'], ('RPEScheduleMatch',)),
+        )
+    ]
+    queries += [
+        ('player.team_players', db.PLAYER_QUERIES['team_players'], (sample['teamId'],), ('Player',)),
+        ('player.team_players_selected', team_players_selected,
+         (sample['teamId'], [sample['id']]), ('Player',)),
+        ('player.id_by_telegram', db.PLAYER_QUERIES['id_by_telegram'], (str(sample['telegramId']),), ('Player',)),
+        ('player.language_by_telegram', db.PLAYER_QUERIES['language_by_telegram'],
+         (str(sample['telegramId']),), ('Player',)),
+        # UPDATE выполняется внутри транзакции бенчмарка и откатывается
+        ('player.bind_by_pin', db.BIND_TELEGRAM_QUERY,
+         {'pin': sample['pinCode'], 'telegram_id': '1', 'language': 'ru'}, ('Player',)),
+    ]
+    return queries
+
+
+def index_sql(spec):
+    columns = ', '.join(f'"{column}"' for column in spec['columns'])
+    unique = 'UNIQUE ' if spec.get('unique') else ''
+    where = f" WHERE {spec['where']}" if spec.get('where') else ''
+    return f'CREATE {unique}INDEX IF NOT EXISTS "{spec["name"]}" ON "{spec["table"]}" ({columns}){where};'
+
+
+_INDEXDEF = re.compile(r'USING \w+ \((?P<columns>.*?)\)(?: WHERE \((?P<where>.*)\))?$')
+
+
+def _index_supports(indexdef, spec):
+    """Индекс подходит, если начинается с нужных колонок; частичный — если условие по той же колонке"""
+    match = _INDEXDEF.search(indexdef)
+    if not match:
+        return False
+    # pg_indexes берет в кавычки только имена со строчными и заглавными буквами
+    columns = [column.strip().strip('"') for column in match.group('columns').split(',')]
+    required = list(spec['columns'])
+    if columns[:len(required)] != required:
+        return False
+    if match.group('where') is None:
+        return True
+    if not spec.get('where'):
+        # Частичный индекс не покрывает запрос без условия
+        return False
+    predicate_column = spec['where'].split()[0].strip('"')
+    return predicate_column in match.group('where')
+
+
+def missing_indexes(connection, schema='public'):
+    """Рекомендованные индексы, которым нет подходящей замены в схеме"""
+    tables = sorted({spec['table'] for spec in RECOMMENDED_INDEXES})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT tablename, indexdef FROM pg_indexes WHERE schemaname = %s AND tablename = ANY(%s)',
+            (schema, tables)
+        )
+        existing = cursor.fetchall()
+    return [
+        spec for spec in RECOMMENDED_INDEXES
+        if not any(table == spec['table'] and _index_supports(indexdef, spec) for table, indexdef in existing)
+    ]
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _plan_nodes(child)
+
+
+def explain(cursor, query, params):
+    cursor.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + query, params)
+    result = cursor.fetchone()[0][0]
+    plan = result['Plan']
+    scans = [
+        (node['Node Type'], node['Relation Name'], node.get('Index Name'))
+        for node in _plan_nodes(plan) if 'Relation Name' in node
+    ]
+    return {
+        'ms': result['Execution Time'],
+        'sharedHit': plan.get('Shared Hit Blocks', 0),
+        'sharedRead': plan.get('Shared Read Blocks', 0),
+        'rows': plan.get('Actual Rows', 0),
+        'scans': scans,
+    }
+
+
+def build_dataset(connection, players, with_indexes=True):
+    """Пересоздает схему bot_bench и заполняет ее данными на players игроков"""
+    teams = max(1, players // 25)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        cursor.execute(f'CREATE SCHEMA {BENCH_SCHEMA}')
+        cursor.execute(f'SET search_path TO {BENCH_SCHEMA}')
+        cursor.execute(BENCH_DDL)
+        cursor.execute(BENCH_DATA, {'players': players, 'teams': teams})
+        for spec in RECOMMENDED_INDEXES:
+            if with_indexes or spec.get('in_schema'):
+                cursor.execute(index_sql(spec))
+        cursor.execute('ANALYZE')
+        cursor.execute(SAMPLE_QUERY, (players // 2,))
+        row = cursor.fetchone()
+    connection.commit()
+    return dict(zip(('id', 'teamId', 'telegramId', 'pinCode'), row))
+
+
+def run_scale(connection, players, with_indexes=True, enforce=True):
+    """Возвращает строки отчета и список регрессий для одного масштаба"""
+    sample = build_dataset(connection, players, with_indexes)
+    rows, regressions = [], []
+    with connection.cursor() as cursor:
+        for name, query, params, guarded in bench_queries(sample):
+            result = explain(cursor, query, params)
+            seq_scanned = sorted({table for node_type, table, _ in result['scans']
+                                  if node_type == 'Seq Scan' and table in guarded})
+            if enforce and seq_scanned:
+                regressions.append((players, name, seq_scanned))
+            rows.append({'players': players, 'query': name, **result, 'seqScan': seq_scanned})
+    connection.rollback()
+    return rows, regressions
+
+
+def _describe_scans(scans):
+    return ', '.join(
+        f"{node_type} {table}" + (f" ({index})" if index else '')
+        for node_type, table, index in scans
+    )
+
+
+def print_report(rows, stream=sys.stdout):
+    print(f"{'players':>8}  {'query':<30} {'ms':>9} {'hit':>7} {'read':>6} {'rows':>6}  scans", file=stream)
+    for row in rows:
+        marker = ' ❌' if row['seqScan'] else ''
+        print(f"{row['players']:>8}  {row['query']:<30} {row['ms']:>9.3f} {row['sharedHit']:>7} "
+              f"{row['sharedRead']:>6} {row['rows']:>6}  {_describe_scans(row['scans'])}{marker}", file=stream)
+
+
+def print_advice(missing, stream=sys.stdout):
+    if not missing:
+        print("✅ Все рекомендованные индексы на месте", file=stream)
+        return
+    print("❌ Не хватает индексов:", file=stream)
+    for spec in missing:
+        print(f"   {index_sql(spec)}", file=stream)
+
+
+def advise(schema='public'):
+    """Проверяет рекомендованные индексы в рабочей БД; возвращает код выхода"""
+    connection = db.get_db_connection()
+    if not connection:
+        raise RuntimeError("Нет подключения к базе данных")
+    try:
+        missing = missing_indexes(connection, schema)
+    finally:
+        db.release_connection(connection)
+    print_advice(missing)
+    return 1 if missing else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Планы SQL-запросов бота и советник по индексам")
+    parser.add_argument('--dsn', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='Локальная база для бенчмарка (по умолчанию BENCH_DATABASE_URL)')
+    parser.add_argument('--scales', default='1000,10000,100000', help='Число игроков через запятую')
+    parser.add_argument('--enforce-from', type=int, default=10000,
+                        help='С какого числа игроков Seq Scan по guarded-таблице считается регрессией')
+    parser.add_argument('--without-indexes', action='store_true',
+                        help='Не создавать рекомендованные индексы (базовая линия для сравнения)')
+    parser.add_argument('--advise', action='store_true', help='Проверить индексы в рабочей БД и выйти')
+    args = parser.parse_args(argv)
+
+    if args.advise:
+        return advise()
+    if not args.dsn:
+        # Бенчмарк пересоздает схему, поэтому рабочая БД из DB_CONFIG не используется
+        parser.error('нужен --dsn или BENCH_DATABASE_URL с локальной базой')
+
+    connection = psycopg2.connect(args.dsn)
+    rows, regressions = [], []
+    try:
+        for players in (int(scale) for scale in args.scales.split(',')):
+            print(f"[Bench] Масштаб {players} игроков...")
+            scale_rows, scale_regressions = run_scale(
+                connection, players, not args.without_indexes, players >= args.enforce_from
+            )
+            rows += scale_rows
+            regressions += scale_regressions
+        print_report(rows)
+        if args.without_indexes:
+            print()
+            print_advice(missing_indexes(connection, BENCH_SCHEMA))
+    finally:
+        # После ошибки запроса транзакция прервана: без отката DROP скрыл бы исходную ошибку
+        connection.rollback()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        connection.commit()
+        connection.close()
+
+    if regressions:
+        print("\n❌ Регрессии планов (Seq Scan):")
+        for players, name, tables in regressions:
+            print(f"   {players} игроков: {name} — {', '.join(tables)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
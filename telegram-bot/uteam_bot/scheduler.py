@@ -0,0 +1,348 @@
+"""
+Планировщик рассылок: раз в минуту сверяет расписания с локальным временем команды
+"""
+
+import json
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import psycopg2.errors
+import pytz
+
+from . import data, db
+from .sender import deliver
+from .templates import reminder_message, scheduled_message, survey_link
+
+
+def normalize_send_time(send_time, compare_seconds=False):
+    """Приводит время расписания к HH:MM (или HH:MM:SS при compare_seconds)"""
+    send_time = str(send_time or '')
+    parts = send_time.split(':')
+    if compare_seconds:
+        if len(parts) == 2:
+            return f"{send_time}:00"
+        return send_time
+    if len(parts) == 3:
+        return send_time[:5]  # Обрезаем до HH:MM
+    return send_time
+
+
+def team_now(timezone, default_timezone='Europe/Moscow'):
+    """Текущее время в таймзоне команды"""
+    try:
+        return datetime.now(pytz.timezone(timezone or default_timezone))
+    except Exception:
+        return datetime.utcnow() + timedelta(hours=3)  # fallback
+
+
+def parse_recipients(recipients_config):
+    """Возвращает список выбранных игроков или None для режима «вся команда»"""
+    if not recipients_config:
+        return None
+    try:
+        config = json.loads(recipients_config)
+    except Exception as e:
+        print(f"[Scheduler] Ошибка парсинга recipientsConfig: {e}")
+        return None
+    if config.get('isIndividualMode') and config.get('selectedPlayerIds'):
+        return config['selectedPlayerIds']
+    return None
+
+
+# Одноразовые расписания: после рассылки переводятся в статус 'sent'
+ONE_SHOT_TYPES = ('rpe', 'rpe_match')
+
+# Насколько далеко назад тик догоняет пропущенные срабатывания (сбой БД, пауза процесса)
+MAX_CATCH_UP = timedelta(minutes=5)
+
+
+class ScheduleIndex:
+    """Расписания, которые проверяет тик планировщика.
+
+    С таблицей BotScheduleFire загружаются только расписания, чей момент
+    срабатывания (UTC) попал в окно от конца прошлого окна до текущего
+    момента, — число строк за тик пропорционально числу рассылок. Без нее
+    (миграция не применена или нет пользователя-писателя) загружаются все
+    расписания, сгруппированные по таймзоне и времени отправки: время
+    вычисляется один раз на таймзону, а сравниваются только расписания
+    с совпавшим временем.
+    """
+
+    def __init__(self, survey_types, compare_seconds=False, default_timezone='Europe/Moscow',
+                 fire_table=True):
+        self.survey_types = survey_types
+        self.compare_seconds = compare_seconds
+        self.default_timezone = default_timezone
+        self.fire_table = fire_table
+        # Режим последней загрузки: 'fire_table' или 'full'
+        self.mode = None
+        self.by_timezone = {}
+        self.due_rows = []
+        self.window_end = None
+        self.count = 0
+        self.loaded_at = None
+
+    def refresh(self):
+        """Перечитывает расписания из базы; ошибки базы пробрасываются"""
+        return self._load(self._refresh_due)
+
+    def prime(self):
+        """Прогрев без расхода окна: с таблицей BotScheduleFire только читает расписания
+        последних MAX_CATCH_UP, не переносит их и не сдвигает window_end — их разошлет
+        первый тик. Ошибки базы пробрасываются"""
+        return self._load(self._prime_due)
+
+    def _load(self, load_due):
+        if self.fire_table and db.writer_enabled():
+            try:
+                return load_due()
+            except (psycopg2.errors.UndefinedTable, psycopg2.errors.UndefinedFunction) as e:
+                print(f"[Scheduler] BotScheduleFire недоступна, полная загрузка расписаний: {e}")
+                self.fire_table = False
+        return self._refresh_full()
+
+    def _window(self, until):
+        """Начало окна: конец прошлого, а до первого тика — MAX_CATCH_UP назад, чтобы
+        догнать срабатывания, пропущенные за время перезапуска"""
+        if self.window_end is None:
+            return until - MAX_CATCH_UP
+        return max(self.window_end, until - MAX_CATCH_UP)
+
+    def _prime_due(self):
+        until = datetime.now(pytz.utc)
+        rows = db.fetch_due_schedules(self._window(until), until, self.survey_types)
+        self.mode = 'fire_table'
+        self.count = len(rows)
+        self.loaded_at = time.time()
+        return self.count
+
+    def _refresh_due(self):
+        until = datetime.now(pytz.utc)
+        since = self._window(until)
+        # При ошибке окно не сдвигается, и следующий тик заберет эти расписания
+        self.due_rows = []
+        rows = db.fetch_due_schedules(since, until, self.survey_types)
+        db.advance_schedule_fire(until)
+        self.due_rows = rows
+        self.window_end = until
+        self.mode = 'fire_table'
+        self.count = len(rows)
+        self.loaded_at = time.time()
+        return self.count
+
+    def _refresh_full(self):
+        schedules = db.fetch_survey_schedules(self.survey_types)
+        by_timezone = defaultdict(lambda: defaultdict(list))
+        for schedule in schedules:
+            if not schedule.get('enabled'):
+                continue
+            tz = schedule.get('timezone') or self.default_timezone
+            send_time = normalize_send_time(schedule.get('sendTime'), self.compare_seconds)
+            by_timezone[tz][send_time].append(schedule)
+        self.by_timezone = {tz: dict(times) for tz, times in by_timezone.items()}
+        self.mode = 'full'
+        self.count = len(schedules)
+        self.loaded_at = time.time()
+        return self.count
+
+    def due(self):
+        """Пары (расписание, время команды) для расписаний, чье время наступило"""
+        if self.mode == 'fire_table':
+            for schedule in self.due_rows:
+                yield schedule, self._local_fire_time(schedule)
+            return
+        time_format = '%H:%M:%S' if self.compare_seconds else '%H:%M'
+        for tz, by_time in self.by_timezone.items():
+            now = team_now(tz, self.default_timezone)
+            for schedule in by_time.get(now.strftime(time_format), ()):
+                yield schedule, now
+
+    def _local_fire_time(self, schedule):
+        """Момент срабатывания в таймзоне команды: от него считаются дата опроса и localDate"""
+        try:
+            return schedule['fireAt'].astimezone(pytz.timezone(schedule.get('timezone') or self.default_timezone))
+        except Exception:
+            return schedule['fireAt'].astimezone(pytz.utc).replace(tzinfo=None) + timedelta(hours=3)  # fallback
+
+
+async def broadcast_schedule(bot, config, state, schedule, now):
+    """Отправляет опрос всем получателям одного расписания; возвращает число доставленных"""
+    survey_type = schedule.get('surveyType', 'morning')
+    survey_date = now.strftime('%d.%m.%Y')
+
+    selected_player_ids = parse_recipients(schedule.get('recipientsConfig'))
+    if selected_player_ids:
+        print(f"[Scheduler] Индивидуальный режим: выбрано {len(selected_player_ids)} игроков")
+    else:
+        print(f"[Scheduler] Общий режим: все игроки команды")
+
+    players = await data.get_team_players(schedule.get('teamId'), selected_player_ids)
+    print(f"[Scheduler] Получено игроков для рассылки: {len(players)}")
+    sent = 0
+    for player in players:
+        telegram_id = player.get('telegramId')
+        club_id = player.get('clubId')
+        if not telegram_id or not club_id:
+            print(f"[DEBUG] Пропущен игрок без telegramId или clubId: {player}")
+            continue
+        text, button_text = scheduled_message(
+            survey_type, player.get('language', 'ru'), survey_date, player.get('pinCode', '------')
+        )
+        link = survey_link(club_id, survey_type, schedule.get('trainingId'), config.survey_base_url)
+        try:
+            await deliver(
+                bot, state.ledger, telegram_id, text, button_text, link,
+                survey_type=survey_type, local_date=now.strftime('%Y-%m-%d'),
+                schedule_id=schedule.get('id'), player_id=player.get('id'), team_id=schedule.get('teamId'),
+            )
+            sent += 1
+            print(f"[DEBUG] Сообщение отправлено: telegramId={telegram_id}")
+        except Exception as e:
+            print(f"[Scheduler] Ошибка отправки {telegram_id}: {e}")
+    return sent
+
+
+async def send_survey_broadcast(bot, config, state):
+    """Проверяет расписание рассылок и отправляет сообщения игрокам для всех типов опросов"""
+    state.tick_started()
+    try:
+        print("[Scheduler] Проверка расписаний рассылок...")
+        index = state.schedule_index
+        try:
+            await data.refresh_schedule_index(index)
+        except Exception as e:
+            # Работаем по последнему загруженному индексу
+            print(f"[DB] Ошибка получения расписаний: {e}")
+        else:
+            state.ready = True
+        if state.bot_info is None:
+            try:
+                state.bot_info = await bot.me()
+            except Exception as e:
+                print(f"[Scheduler] Ошибка getMe: {e}")
+        if index.mode == 'fire_table':
+            print(f"[Scheduler] Расписаний к отправке: {index.count}")
+        else:
+            print(f"[Scheduler] Найдено {index.count} активных расписаний")
+        for schedule, now in index.due():
+            if config.debug:
+                print(f"[DEBUG] Расписание {schedule.get('id')}: teamId={schedule.get('teamId')}, "
+                      f"sendTime={schedule.get('sendTime')}, currentTime={now.strftime('%H:%M:%S')}, "
+                      f"type={schedule.get('surveyType')}")
+            sent = await broadcast_schedule(bot, config, state, schedule, now)
+            if sent and schedule.get('surveyType') in ONE_SHOT_TYPES and db.writer_enabled():
+                state.sent_schedules[schedule['surveyType']].add(schedule['id'])
+        await mark_schedules_sent(state)
+        # Хвост волны пишется сразу, не дожидаясь таймера журнала
+        state.ledger.wake()
+        print(f"[Scheduler] Проверка рассылок завершена")
+    except Exception as e:
+        print(f"[Scheduler] Ошибка планировщика: {e}")
+    finally:
+        state.tick_finished()
+
+
+async def mark_schedules_sent(state):
+    """Переводит разосланные за тик RPE расписания в 'sent' одним UPDATE на таблицу.
+
+    При ошибке id остаются в state.sent_schedules и записываются следующим тиком.
+    """
+    pending = {survey_type: ids for survey_type, ids in state.sent_schedules.items() if ids}
+    if not pending or not db.writer_enabled():
+        return
+    try:
+        marked = await data.mark_schedules_sent({t: list(ids) for t, ids in pending.items()})
+    except Exception as e:
+        print(f"[Scheduler] Ошибка записи статуса sent: {e}")
+        return
+    for survey_type, ids in pending.items():
+        state.sent_schedules[survey_type].difference_update(ids)
+    print(f"[Scheduler] Отмечены отправленными: {marked}")
+
+
+async def expire_stale_schedules(state):
+    """Закрывает RPE расписания прошедших тренировок и матчей одним UPDATE на таблицу"""
+    try:
+        expired = await data.expire_stale_schedules()
+    except Exception as e:
+        print(f"[Scheduler] Ошибка закрытия просроченных RPE расписаний: {e}")
+        return
+    state.expired_schedules += sum(expired.values())
+    if any(expired.values()):
+        print(f"[Scheduler] Просрочены RPE расписания: {expired}")
+
+
+async def refresh_feedback(state):
+    """Перечитывает кэш ответа после опроса; при ошибке остается прежний"""
+    try:
+        count = await data.refresh_feedback(state.feedback)
+    except Exception as e:
+        print(f"[Scheduler] Ошибка обновления кэша готовности: {e}")
+        return
+    print(f"[Scheduler] Кэш готовности обновлен: {count} записей")
+
+
+async def send_reminders(bot, config, state):
+    """Напоминания не ответившим: волны со смещением reminder_offsets_minutes от рассылки.
+
+    Получатели считаются в БД одним запросом (анти-join ответов для каждой волны),
+    так что отправок столько, сколько игроков еще не ответили.
+    """
+    until = datetime.now(pytz.utc)
+    since = max(state.reminder_window_end or until - timedelta(minutes=1), until - MAX_CATCH_UP)
+    try:
+        recipients = await data.fetch_reminder_recipients(since, until, config.reminder_offsets_minutes)
+    except Exception as e:
+        # Окно не сдвигается: следующий вызов заберет эти напоминания
+        print(f"[Reminders] Ошибка получения не ответивших: {e}")
+        return
+    state.reminder_window_end = until
+    sent = 0
+    for player in recipients:
+        local_date = player['localDate']
+        survey_date = datetime.strptime(local_date, '%Y-%m-%d').strftime('%d.%m.%Y')
+        text, button_text = reminder_message(
+            player['surveyType'], player.get('language', 'ru'), survey_date, player.get('pinCode', '------')
+        )
+        link = survey_link(player['clubId'], player['surveyType'], player.get('trainingId'), config.survey_base_url)
+        try:
+            await deliver(
+                bot, state.ledger, player['telegramId'], text, button_text, link,
+                survey_type=player['surveyType'], local_date=local_date, source='reminder',
+                schedule_id=player['scheduleId'], player_id=player['id'], team_id=player['teamId'],
+            )
+            sent += 1
+        except Exception as e:
+            print(f"[Reminders] Ошибка отправки {player['telegramId']}: {e}")
+    if recipients:
+        state.reminders_sent += sent
+        state.ledger.wake()
+        print(f"[Reminders] Напоминаний отправлено: {sent} из {len(recipients)}")
+
+
+def setup_scheduler(bot, config, state):
+    """Настройка планировщика задач"""
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        send_survey_broadcast, 'interval',
+        minutes=config.scheduler_interval_minutes, args=(bot, config, state)
+    )
+    if db.writer_enabled():
+        scheduler.add_job(
+            expire_stale_schedules, 'interval', minutes=config.expire_interval_minutes,
+            next_run_time=datetime.now(), args=(state,)
+        )
+    if config.reminder_offsets_minutes and state.ledger.enabled:
+        # Волны находятся по журналу отправок, поэтому без пользователя-писателя напоминаний нет
+        scheduler.add_job(
+            send_reminders, 'interval', minutes=config.scheduler_interval_minutes, args=(bot, config, state)
+        )
+    scheduler.add_job(
+        refresh_feedback, 'interval', minutes=config.feedback_refresh_minutes, args=(state,)
+    )
+    scheduler.start()
+    print("[Scheduler] Планировщик запущен")
+    return scheduler
@@ -0,0 +1,47 @@
+"""
+Отправка сообщений в Telegram
+"""
+
+import time
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from .ledger import OUTCOME_SENT, classify_error
+
+
+def survey_keyboard(button_text, link):
+    """Inline-кнопка со ссылкой на опрос"""
+    if not link:
+        return None
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text=button_text, url=link)]
+    ])
+
+
+async def send_survey_message(bot, telegram_id, text, button_text=None, link=None):
+    """Отправляет сообщение с кнопкой опроса; ошибки Telegram пробрасываются вызывающему"""
+    return await bot.send_message(
+        telegram_id,
+        text,
+        reply_markup=survey_keyboard(button_text, link),
+        parse_mode="HTML"
+    )
+
+
+async def deliver(bot, ledger, telegram_id, text, button_text=None, link=None, **record):
+    """Отправляет опрос и записывает попытку в журнал (record — поля DeliveryLedger.record)"""
+    await ledger.throttle()
+    started = time.perf_counter()
+    try:
+        message = await send_survey_message(bot, telegram_id, text, button_text, link)
+    except Exception as e:
+        ledger.record(
+            telegram_id, outcome=classify_error(e), error=str(e),
+            latency_ms=int((time.perf_counter() - started) * 1000), **record
+        )
+        raise
+    ledger.record(
+        telegram_id, outcome=OUTCOME_SENT, message_id=message.message_id,
+        latency_ms=int((time.perf_counter() - started) * 1000), **record
+    )
+    return message
@@ -0,0 +1,28 @@
+"""
+Single-flight: одновременные одинаковые запросы разделяют один вызов
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """Пока вызов по ключу выполняется, остальные вызовы с тем же ключом ждут его результат"""
+
+    def __init__(self):
+        self._calls = {}
+        # Сколько вызовов было обслужено чужим результатом
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key, fn, *args):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield: отмена одного ожидающего не отменяет общий вызов для остальных
+        return await asyncio.shield(task)
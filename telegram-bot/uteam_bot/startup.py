@@ -0,0 +1,83 @@
+"""
+Профиль запуска и прогрев: импорты, пул БД, индекс расписаний и кэши
+открываются до того, как бот начнет принимать трафик.
+"""
+
+import asyncio
+import importlib
+import time
+from contextlib import contextmanager
+
+# Тяжелые зависимости в порядке их загрузки
+HEAVY_MODULES = (
+    'psycopg2',
+    'psycopg2.extras',
+    'psycopg2.pool',
+    'pytz',
+    'aiohttp.web',
+    'aiogram',
+    'apscheduler.schedulers.asyncio',
+)
+
+
+class StartupProfile:
+    """Длительность фаз запуска процесса"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def import_modules(self, modules=HEAVY_MODULES):
+        """Импортирует модули по одному, замеряя время каждого"""
+        for module in modules:
+            with self.phase(f'import {module}'):
+                importlib.import_module(module)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'phases': [{'name': name, 'ms': round(seconds * 1000, 1)} for name, seconds in self.phases],
+            'totalMs': round(self.total() * 1000, 1),
+        }
+
+    def report(self):
+        print("[Startup] Профиль запуска:")
+        for name, seconds in self.phases:
+            print(f"[Startup]   {name:<40} {seconds * 1000:8.1f} ms")
+        print(f"[Startup]   {'итого':<40} {self.total() * 1000:8.1f} ms")
+
+
+async def warm_up(bot, config, state, profile):
+    """Открывает пул, загружает индекс расписаний и кэширует getMe; возвращает True при успехе"""
+    from . import data, db
+
+    steps = (
+        ('db pool', lambda: asyncio.to_thread(db.open_pool, config.db, config.db_pool_min, config.db_pool_max)),
+        ('schedule index', lambda: data.prime_schedule_index(state.schedule_index)),
+        ('feedback cache', lambda: data.refresh_feedback(state.feedback)),
+        ('telegram getMe', lambda: cache_bot_info(bot, state)),
+    )
+    warm = True
+    for name, step in steps:
+        with profile.phase(name):
+            try:
+                await step()
+            except Exception as e:
+                print(f"[Startup] Ошибка прогрева ({name}): {e}")
+                warm = False
+    return warm
+
+
+async def cache_bot_info(bot, state):
+    """Кэширует getMe, чтобы health-пробы не обращались к Telegram"""
+    state.bot_info = await bot.me()
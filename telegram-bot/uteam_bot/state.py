@@ -0,0 +1,105 @@
+"""
+Состояние процесса бота, общее для планировщика и HTTP endpoints.
+
+Health-пробы читают только эти поля и никогда не ходят в БД или Telegram.
+"""
+
+import asyncio
+import time
+
+from . import db
+from .dedupe import IdempotencyStore
+from .feedback import FeedbackCache
+from .ledger import DeliveryLedger
+from .limiter import AttemptLimiter
+from .loopmon import LoopMonitor
+from .scheduler import ScheduleIndex
+from .timing import HandlerMetrics, UpdateProfiler
+
+
+class BotState:
+    """Готовность процесса, прогретые структуры данных и пульс планировщика"""
+
+    def __init__(self, config):
+        self.config = config
+        self.started_at = time.time()
+        # Становится True после прогрева или первой успешной загрузки расписаний
+        self.ready = False
+        self.profile = None
+        self.schedule_index = ScheduleIndex(
+            config.survey_types, config.compare_seconds, config.default_timezone,
+            fire_table=config.schedule_fire_table,
+        )
+        # Кэш getMe, заполняется при прогреве
+        self.bot_info = None
+        # Пульс планировщика
+        self.last_tick_at = None
+        self.last_tick_duration = None
+        self.ticks = 0
+        # RPE расписания, разосланные, но еще не отмеченные в БД как 'sent'
+        self.sent_schedules = {'rpe': set(), 'rpe_match': set()}
+        # Сколько RPE расписаний закрыто как просроченные с момента запуска
+        self.expired_schedules = 0
+        # Результаты ручных отправок для дедупликации повторов
+        self.idempotency = IdempotencyStore(config.idempotency_ttl_seconds)
+        # Напоминания не ответившим: конец уже обработанного окна и число отправленных
+        self.reminder_window_end = None
+        self.reminders_sent = 0
+        # Попытки ввода PIN-кода: на пользователя и на весь процесс
+        self.pin_limiter = AttemptLimiter(
+            per_key=config.pin_attempts_per_user, key_window=config.pin_attempts_window,
+            global_limit=config.pin_attempts_global, global_window=60,
+        )
+        # Попытки отправки, ожидающие записи в BotDeliveryLog
+        self.ledger = DeliveryLedger(
+            enabled=config.ledger_enabled,
+            flush_size=config.ledger_flush_size,
+            flush_interval=config.ledger_flush_interval,
+            max_pending=config.ledger_max_pending,
+        )
+        # Личные базы опросов и нагрузки для ответа после опроса
+        self.feedback = FeedbackCache(config.default_timezone)
+        # Время обработки апдейтов по хендлерам и выборочные профили медленных апдейтов
+        self.handler_metrics = HandlerMetrics()
+        self.update_profiler = None
+        if config.update_profile_rate > 0:
+            self.update_profiler = UpdateProfiler(
+                config.update_profile_dir, config.update_profile_keep, config.update_profile_rate
+            )
+        # Задержка event loop и пойманные блокировки
+        self.loop_monitor = LoopMonitor(config.loop_lag_interval, config.loop_lag_threshold)
+        # Имя очереди -> функция, возвращающая ее глубину
+        self.queues = {
+            'idempotencyKeys': lambda: len(self.idempotency),
+            'ledgerPending': lambda: len(self.ledger),
+            'pinLimiterKeys': lambda: len(self.pin_limiter),
+            'sentSchedulesPending': lambda: sum(len(ids) for ids in self.sent_schedules.values()),
+        }
+
+    def tick_started(self):
+        self.last_tick_at = time.time()
+
+    def tick_finished(self):
+        self.last_tick_duration = time.time() - self.last_tick_at
+        self.ticks += 1
+
+    def _max_tick_age(self):
+        # Допускаем пропуск двух тиков, прежде чем считать планировщик зависшим
+        return self.config.scheduler_interval_minutes * 60 * 2.5
+
+    def heartbeat_fresh(self):
+        reference = self.last_tick_at or self.started_at
+        return time.time() - reference <= self._max_tick_age()
+
+    def readiness_checks(self):
+        return {
+            'warm': self.ready,
+            'database': db.is_reachable(max_age=self._max_tick_age()),
+            'telegram': self.bot_info is not None,
+            'scheduler': self.heartbeat_fresh(),
+        }
+
+    def queue_depths(self):
+        depths = {name: depth() for name, depth in self.queues.items()}
+        depths['asyncioTasks'] = len(asyncio.all_tasks())
+        return depths
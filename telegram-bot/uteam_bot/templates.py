@@ -0,0 +1,140 @@
+"""
+Тексты сообщений и ссылки на опросы
+"""
+
+from .config import SURVEY_BASE_URL
+
+LANGUAGES = {'en': 'English', 'ru': 'Русский'}
+LANGUAGE_BUTTONS = {
+    'en': 'Change language',
+    'ru': 'Сменить язык'
+}
+
+# Тексты рассылки по расписанию: (текст, кнопка) с датой опроса
+SCHEDULED_TEXTS = {
+    'morning': {
+        'en': ("Good morning! Please complete the morning survey for {date}.", "📝 Take the survey for {date}"),
+        'ru': ("Доброе утро! Пожалуйста, пройди утренний опросник за {date}.", "📝 Пройти опрос за {date}"),
+    },
+    'rpe': {
+        'en': ("Please rate how hard your training was (RPE) for {date}.", "📝 Rate RPE for {date}"),
+        'ru': ("Пожалуйста, оцени, насколько тяжёлой была твоя тренировка (RPE) за {date}.", "📝 Оценить RPE за {date}"),
+    },
+    'default': {
+        'en': ("Please complete the survey for {date}.", "📝 Take the survey for {date}"),
+        'ru': ("Пожалуйста, пройди опрос за {date}.", "📝 Пройти опрос за {date}"),
+    },
+}
+SCHEDULED_TEXTS['rpe_match'] = SCHEDULED_TEXTS['rpe']
+
+# Напоминания тем, кто еще не ответил на опрос по расписанию
+REMINDER_TEXTS = {
+    'morning': {
+        'en': ("Reminder: you haven't completed the morning survey for {date} yet.", "📝 Take the survey for {date}"),
+        'ru': ("Напоминание: ты еще не прошел утренний опросник за {date}.", "📝 Пройти опрос за {date}"),
+    },
+    'rpe': {
+        'en': ("Reminder: please rate your training (RPE) for {date}.", "📝 Rate RPE for {date}"),
+        'ru': ("Напоминание: оцени, пожалуйста, тренировку (RPE) за {date}.", "📝 Оценить RPE за {date}"),
+    },
+}
+REMINDER_TEXTS['rpe_match'] = REMINDER_TEXTS['rpe']
+
+# Тексты ручной отправки (без даты)
+MANUAL_TEXTS = {
+    'morning': {
+        'en': ("Good morning! Please complete the morning survey.", "📝 Take the survey"),
+        'ru': ("Доброе утро! Пожалуйста, пройди утренний опросник.", "📝 Пройти опрос"),
+    },
+    'rpe': {
+        'en': ("Please rate how hard your training was (RPE).", "📝 Rate RPE"),
+        'ru': ("Пожалуйста, оцени, насколько тяжёлой была твоя тренировка (RPE).", "📝 Оценить RPE"),
+    },
+}
+
+PIN_FOOTER = {
+    'en': "Your pin code for login:\n<code>{pin}</code>",
+    'ru': "Твой пинкод для входа:\n<code>{pin}</code>",
+}
+
+SUCCESS_TEXTS = {
+    'en': "✅ Thank you! Your morning survey for {date} has been successfully submitted.",
+    'ru': "✅ Спасибо! Ваш утренний опросник за {date} успешно заполнен.",
+}
+
+RPE_SUCCESS_TEXTS = {
+    'en': "✅ Thank you! Your RPE for {date} has been saved.",
+    'ru': "✅ Спасибо! Оценка RPE за {date} сохранена.",
+}
+
+# Готовность относительно личной нормы (50) и тренд нагрузки (острая / хроническая EWMA)
+READINESS_TEXTS = {
+    'en': "Readiness today: {score}/100 — {label}.",
+    'ru': "Готовность сегодня: {score}/100 — {label}.",
+}
+READINESS_LABELS = {
+    'en': ('below your usual level', 'within your usual range', 'above your usual level'),
+    'ru': ('ниже твоей нормы', 'в пределах твоей нормы', 'выше твоей нормы'),
+}
+LOAD_TEXTS = {
+    'en': "Load trend (acute/chronic): {acwr} {arrow}",
+    'ru': "Тренд нагрузки (острая/хроническая): {acwr} {arrow}",
+}
+
+
+def _lang(lang):
+    return 'en' if lang == 'en' else 'ru'
+
+
+def survey_link(club_id, survey_type=None, training_id=None, base_url=SURVEY_BASE_URL):
+    """Формирует ссылку на опрос с нужным type"""
+    link = f"{base_url}?tenantId={club_id}"
+    if survey_type == 'rpe_match':
+        # Для матчей отправляем тот же RPE по ссылке type=rpe (без trainingId)
+        survey_type = 'rpe'
+        training_id = None
+    if survey_type:
+        link += f"&type={survey_type}"
+    if survey_type == 'rpe' and training_id:
+        link += f"&trainingId={training_id}"
+    return link
+
+
+def scheduled_message(survey_type, lang, survey_date, pin_code):
+    """Текст и подпись кнопки для рассылки по расписанию"""
+    texts = SCHEDULED_TEXTS.get(survey_type, SCHEDULED_TEXTS['default'])[_lang(lang)]
+    text, button_text = (part.format(date=survey_date) for part in texts)
+    return f"{text}\n\n{PIN_FOOTER[_lang(lang)].format(pin=pin_code)}", button_text
+
+
+def reminder_message(survey_type, lang, survey_date, pin_code):
+    """Текст и подпись кнопки напоминания тем, кто не ответил"""
+    texts = REMINDER_TEXTS.get(survey_type, REMINDER_TEXTS['morning'])[_lang(lang)]
+    text, button_text = (part.format(date=survey_date) for part in texts)
+    return f"{text}\n\n{PIN_FOOTER[_lang(lang)].format(pin=pin_code)}", button_text
+
+
+def manual_message(survey_type, lang, pin_code):
+    """Текст и подпись кнопки для ручной отправки через HTTP"""
+    text, button_text = MANUAL_TEXTS[survey_type][_lang(lang)]
+    return f"{text}\n\n{PIN_FOOTER[_lang(lang)].format(pin=pin_code)}", button_text
+
+
+def success_message(lang, survey_date, survey_type='morning', readiness=None, load_trend=None):
+    """Текст подтверждения после прохождения опроса.
+
+    readiness — readinessScore 0..100, load_trend — ACWR без сегодняшней сессии и с ней;
+    без них остается только подтверждение.
+    """
+    lang = _lang(lang)
+    texts = RPE_SUCCESS_TEXTS if survey_type == 'rpe' else SUCCESS_TEXTS
+    lines = [texts[lang].format(date=survey_date)]
+    if readiness is not None:
+        low, normal, high = READINESS_LABELS[lang]
+        label = low if readiness <= 40 else high if readiness >= 60 else normal
+        lines.append(READINESS_TEXTS[lang].format(score=readiness, label=label))
+    if load_trend is not None and load_trend[1] is not None:
+        before, after = load_trend
+        arrow = '→' if before is None or abs(after - before) < 0.05 else '↑' if after > before else '↓'
+        lines.append(LOAD_TEXTS[lang].format(acwr=f'{after:.2f}', arrow=arrow))
+    return '\n'.join(lines)
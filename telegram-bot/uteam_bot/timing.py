@@ -0,0 +1,229 @@
+"""
+Тайминги обработки апдейтов aiogram: общее время, время в БД и в Telegram API
+по каждому хендлеру, плюс выборочные cProfile-профили самых медленных апдейтов.
+"""
+
+import bisect
+import contextvars
+import cProfile
+import heapq
+import os
+import random
+import time
+from collections import defaultdict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+
+# Границы корзин гистограмм, секунды
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Тайминг апдейта, который сейчас обрабатывается в этой задаче
+_current = contextvars.ContextVar('update_timing', default=None)
+
+
+class Histogram:
+    """Счетчики по фиксированным корзинам, как histogram в Prometheus"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает квантиль q"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def cumulative(self):
+        """Пары (le, накопленное число) для экспорта"""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'avg': round(self.sum / self.count, 4) if self.count else None,
+            'p95': self.quantile(0.95),
+            'max': round(self.max, 4),
+        }
+
+
+def prometheus_histogram(name, histogram, labels=''):
+    """Строки bucket/sum/count одной гистограммы"""
+    prefix = f'{labels},' if labels else ''
+    for bound, count in histogram.cumulative():
+        le = '+Inf' if bound == float('inf') else repr(bound)
+        yield f'{name}_bucket{{{prefix}le="{le}"}} {count}'
+    suffix = f'{{{labels}}}' if labels else ''
+    yield f'{name}_sum{suffix} {histogram.sum}'
+    yield f'{name}_count{suffix} {histogram.count}'
+
+
+class UpdateTiming:
+    """Накопитель времени одного апдейта"""
+
+    __slots__ = ('handler', 'db', 'telegram')
+
+    def __init__(self):
+        self.handler = 'unhandled'
+        self.db = 0.0
+        self.telegram = 0.0
+
+
+def add_db_time(seconds):
+    timing = _current.get()
+    if timing is not None:
+        timing.db += seconds
+
+
+def add_telegram_time(seconds):
+    timing = _current.get()
+    if timing is not None:
+        timing.telegram += seconds
+
+
+class HandlerMetrics:
+    """Гистограммы общего времени, времени БД и Telegram API по хендлерам"""
+
+    KINDS = ('total', 'db', 'telegram')
+
+    def __init__(self):
+        self.by_handler = defaultdict(lambda: {kind: Histogram() for kind in self.KINDS})
+
+    def observe(self, timing, elapsed):
+        histograms = self.by_handler[timing.handler]
+        histograms['total'].observe(elapsed)
+        histograms['db'].observe(timing.db)
+        histograms['telegram'].observe(timing.telegram)
+
+    def as_dict(self):
+        return {
+            handler: {kind: histogram.as_dict() for kind, histogram in histograms.items()}
+            for handler, histograms in self.by_handler.items()
+        }
+
+    def prometheus(self, prefix='uteam_bot_handler'):
+        """Текстовый формат экспозиции Prometheus"""
+        lines = []
+        for kind in self.KINDS:
+            name = f'{prefix}_{kind}_seconds'
+            lines.append(f'# TYPE {name} histogram')
+            for handler, histograms in self.by_handler.items():
+                lines.extend(prometheus_histogram(name, histograms[kind], f'handler="{handler}"'))
+        return '\n'.join(lines) + '\n'
+
+
+class UpdateProfiler:
+    """Профилирует долю rate апдейтов и хранит на диске keep самых медленных профилей.
+
+    cProfile видит весь поток, поэтому в профиль попадают и задачи, которые
+    event loop выполнял, пока апдейт ждал БД или Telegram. Одновременно
+    профилируется не больше одного апдейта.
+    """
+
+    def __init__(self, directory='profiles', keep=10, rate=0.05):
+        self.directory = directory
+        self.keep = keep
+        self.rate = rate
+        self._active = False
+        # Минимальная куча (время, путь) сохраненных профилей
+        self._saved = []
+
+    def start(self):
+        if self._active or random.random() >= self.rate:
+            return None
+        self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile, elapsed, handler, update_id):
+        profile.disable()
+        self._active = False
+        if len(self._saved) >= self.keep and elapsed <= self._saved[0][0]:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f'{elapsed * 1000:09.1f}ms_{handler}_{update_id}.prof')
+        profile.dump_stats(path)
+        heapq.heappush(self._saved, (elapsed, path))
+        if len(self._saved) > self.keep:
+            _, dropped = heapq.heappop(self._saved)
+            try:
+                os.remove(dropped)
+            except OSError:
+                pass
+
+    def as_dict(self):
+        return {
+            'rate': self.rate,
+            'saved': [path for _, path in sorted(self._saved, reverse=True)],
+        }
+
+
+class TimingMiddleware(BaseMiddleware):
+    """Внешний middleware на dp.update: замеряет апдейт целиком"""
+
+    def __init__(self, metrics, profiler=None):
+        self.metrics = metrics
+        self.profiler = profiler
+
+    async def __call__(self, handler, event, data):
+        timing = UpdateTiming()
+        token = _current.set(timing)
+        data['update_timing'] = timing
+        profile = self.profiler.start() if self.profiler else None
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            self.metrics.observe(timing, elapsed)
+            if profile is not None:
+                self.profiler.finish(profile, elapsed, timing.handler, event.update_id)
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Внутренний middleware: сообщает таймингу, какой хендлер сработал"""
+
+    async def __call__(self, handler, event, data):
+        timing = data.get('update_timing')
+        handler_object = data.get('handler')
+        if timing is not None and handler_object is not None:
+            timing.handler = getattr(handler_object.callback, '__name__', 'handler')
+        return await handler(event, data)
+
+
+class TelegramTimingMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: время запросов к Telegram API внутри апдейта"""
+
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            add_telegram_time(time.perf_counter() - started)
+
+
+def setup_timing(dp, bot, metrics, profiler=None):
+    dp.update.outer_middleware(TimingMiddleware(metrics, profiler))
+    dp.message.middleware(HandlerNameMiddleware())
+    bot.session.middleware(TelegramTimingMiddleware())
@@ -0,0 +1,393 @@
+"""
+Перевод единиц измерения GPS метрик столбцами NumPy.
+
+Повторяет src/lib/unit-converter.ts (convertUnit, parseTimeToSeconds,
+formatTimeFromSeconds — ими пользуется импорт отчетов веб-приложения) и convertValue
+из src/lib/canonical-metrics.ts, но переводит весь столбец одной операцией:
+множители собраны в матрицы «единица × единица», строки времени вида hh:mm:ss и mm:ss
+разбираются по кодам символов без цикла по ячейкам. Ячейки необычного вида
+(лишние символы, пробелы внутри) разбираются поштучно так же, как в TypeScript.
+"""
+
+import datetime
+import re
+
+import numpy as np
+
+# Форматы времени: значение — строка, переводится через секунды
+TIME_FORMATS = (
+    'hh:mm:ss', 'hh:mm', 'mm:ss', 'ss', 'hh.mm.ss', 'hh,mm,ss', 'hh mm ss',
+    'hh.mm', 'mm.ss', 'hh:mm:ss.fff', 'hh:mm:ss,fff',
+)
+
+# Множители CONVERSION_TABLE из unit-converter.ts: значение в from × множитель = значение в to.
+# Строки и столбцы форматов времени опущены: convertUnit переводит их через секунды
+CONVERSION_TABLE = {
+    'm': {'km': 0.001, 'miles': 0.000621371, 'yards': 1.09361, 'feet': 3.28084, 'yd': 1.09361},
+    'km': {'m': 1000, 'miles': 0.621371, 'yards': 1093.61, 'feet': 3280.84, 'yd': 1093.61},
+    'miles': {'m': 1609.34, 'km': 1.60934, 'yards': 1760, 'feet': 5280, 'yd': 1760},
+    'yards': {'m': 0.9144, 'km': 0.0009144, 'miles': 0.000568182, 'feet': 3, 'yd': 1},
+    'feet': {'m': 0.3048, 'km': 0.0003048, 'miles': 0.000189394, 'yards': 0.333333, 'yd': 0.333333},
+    'yd': {'m': 0.9144, 'km': 0.0009144, 'miles': 0.000568182, 'yards': 1, 'feet': 3},
+    'm/s': {'km/h': 3.6, 'mph': 2.23694, 'knots': 1.94384, 'm/min': 60},
+    'km/h': {'m/s': 0.277778, 'mph': 0.621371, 'knots': 0.539957, 'm/min': 16.6667},
+    'mph': {'m/s': 0.44704, 'km/h': 1.60934, 'knots': 0.868976, 'm/min': 26.8224},
+    'knots': {'m/s': 0.514444, 'km/h': 1.852, 'mph': 1.15078, 'm/min': 30.8667},
+    'm/min': {'m/s': 0.0166667, 'km/h': 0.06, 'mph': 0.0372823, 'knots': 0.0323974},
+    's': {'min': 0.0166667, 'h': 0.000277778, 'ms': 1000},
+    'min': {'s': 60, 'h': 0.0166667, 'ms': 60000},
+    'h': {'s': 3600, 'min': 60, 'ms': 3600000},
+    'ms': {'s': 0.001, 'min': 0.0000166667, 'h': 0.000000277778},
+    'bpm': {'bpm': 1, '%HRmax': 1},
+    '%HRmax': {'bpm': 1, '%HRmax': 1},
+    'count': {'count': 1, 'times': 1, 'sprints': 1},
+    'times': {'count': 1, 'times': 1, 'sprints': 1},
+    'sprints': {'count': 1, 'times': 1, 'sprints': 1},
+    '%': {'%': 1, 'ratio': 0.01},
+    'ratio': {'%': 100, 'ratio': 1},
+    'm/s^2': {'m/s^2': 1, 'g': 0.101972},
+    'g': {'m/s^2': 9.80665, 'g': 1},
+    'AU': {'AU': 1},
+    'W/kg': {'W/kg': 1},
+    'string': {'string': 1},
+}
+
+# Множители к базовой единице измерения, как UNIT_FACTORS в canonical-metrics.ts
+UNIT_FACTORS = {
+    'distance': {'m': 1, 'km': 1000, 'yd': 0.9144},
+    'time': {'s': 1, 'min': 60, 'h': 3600, 'hh:mm': 3600, 'hh:mm:ss': 1},
+    'speed': {'m/s': 1, 'km/h': 0.2777777778, 'm/min': 0.0166666667, 'mph': 0.44704},
+    'acceleration': {'m/s^2': 1, 'g': 9.80665},
+    'heart_rate': {'bpm': 1, '%HRmax': 1},
+    'power_mass_norm': {'W/kg': 1},
+    'load': {'AU': 1},
+    'count': {'count': 1},
+    'ratio': {'ratio': 1, '%': 0.01},
+    'identity': {'string': 1},
+}
+
+
+def _factor_matrix(units, pairs):
+    index = {unit: position for position, unit in enumerate(units)}
+    matrix = np.full((len(units), len(units)), np.nan)
+    np.fill_diagonal(matrix, 1.0)
+    for from_unit, to_unit, factor in pairs:
+        matrix[index[from_unit], index[to_unit]] = factor
+    return index, matrix
+
+
+# Матрица convertUnit для числовых единиц; строки времени переводятся через convert_unit
+UNITS = tuple(sorted(set(CONVERSION_TABLE) | {unit for table in CONVERSION_TABLE.values() for unit in table}))
+UNIT_INDEX, FACTORS = _factor_matrix(UNITS, (
+    (from_unit, to_unit, factor)
+    for from_unit, table in CONVERSION_TABLE.items() for to_unit, factor in table.items()
+))
+
+# Матрица convertValue: перевод только внутри одной размерности UNIT_FACTORS
+CANONICAL_UNITS = tuple(unit for factors in UNIT_FACTORS.values() for unit in factors)
+CANONICAL_INDEX, CANONICAL_FACTORS = _factor_matrix(CANONICAL_UNITS, (
+    (from_unit, to_unit, factors[from_unit] / factors[to_unit])
+    for factors in UNIT_FACTORS.values() for from_unit in factors for to_unit in factors
+))
+
+
+# --- Разбор чисел ---
+
+_JS_FLOAT = re.compile(r'[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)')
+_JS_INT = re.compile(r'[+-]?\d+')
+_NUMBER_CODES = np.array([0] + [ord(char) for char in '0123456789+-.eE'], dtype=np.int32)
+
+
+def _js_parse_float(text):
+    """parseFloat из JavaScript: число в начале строки, иначе NaN"""
+    match = _JS_FLOAT.match(text.lstrip())
+    return float(match.group().replace('Infinity', 'inf')) if match else np.nan
+
+
+def _js_parse_int(text):
+    match = _JS_INT.match(text.lstrip())
+    return int(match.group()) if match else None
+
+
+def _codes(text):
+    """Матрица кодов символов строк N × ширина (нули — после конца строки)"""
+    width = max(1, text.dtype.itemsize // 4)
+    text = np.ascontiguousarray(text, dtype=f'U{width}')
+    return text.view(np.int32).reshape(len(text), width)
+
+
+def to_text(values):
+    """Столбец в строки без крайних пробелов; None — пустая строка"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'O':
+        values = np.where((values == None), '', values)  # noqa: E711 — поэлементное сравнение массива
+    return np.char.strip(values.astype(str))
+
+
+def parse_float(values, decimal_comma=False):
+    """Столбец в float64 как parseFloat: пустые и нечисловые — NaN.
+
+    decimal_comma — запятая считается десятичным разделителем («1,5» — 1.5, а не 1).
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iufb' or not len(values):
+        # Пустой столбец тоже: np.char.replace в NumPy 2 не принимает пустой массив
+        return values.astype(np.float64)
+    if values.dtype.kind == 'O':
+        missing = (values == None) | (values == '')  # noqa: E711
+        try:
+            # Ячейки XLSX уже числа: весь столбец переводится без разбора строк
+            return np.where(missing, np.nan, values).astype(np.float64)
+        except (TypeError, ValueError):
+            pass
+    text = to_text(values)
+    if decimal_comma:
+        text = np.char.replace(text, ',', '.')
+    result = np.full(len(text), np.nan)
+    present = text != ''
+    plain = present & np.isin(_codes(text), _NUMBER_CODES).all(axis=1)
+    try:
+        result[plain] = text[plain].astype(np.float64)
+    except ValueError:
+        plain[:] = False
+    rest = present & ~plain
+    result[rest] = [_js_parse_float(item) for item in text[rest].tolist()]
+    return result
+
+
+# --- Время ---
+
+_SEPARATORS = (':', '.', ',', ' ')
+
+
+def _parse_time_text(text, expected_format=None):
+    """Поштучный parseTimeToSeconds из unit-converter.ts"""
+    text = text.strip()
+    if not text:
+        return np.nan
+    if not re.search(r'[:.,\s]', text):
+        return _js_parse_float(text)
+    separator = next((sep for sep in _SEPARATORS if sep in text), None)
+    if separator is None:
+        return _js_parse_float(text) or np.nan
+    parts = text.split(separator)
+    milliseconds = 0.0
+    last = parts[-1]
+    if '.' in last or ',' in last:
+        decimal = re.split(r'[.,]', last)
+        if len(decimal) == 2:
+            parts[-1] = decimal[0]
+            milliseconds = _js_parse_float('0.' + decimal[1]) * 1000
+    numbers = [_js_parse_int(part) for part in parts]
+    if any(number is None for number in numbers) or np.isnan(milliseconds):
+        return np.nan
+    fraction = milliseconds / 1000
+    if len(numbers) == 3:
+        return numbers[0] * 3600 + numbers[1] * 60 + numbers[2] + fraction
+    if len(numbers) == 2:
+        first, second = numbers
+        if expected_format == 'mm:ss':
+            return first * 60 + second + fraction
+        if expected_format == 'hh:mm':
+            return first * 3600 + second * 60 + fraction
+        if first > 23 or second > 59:
+            return first * 60 + second + fraction
+        return first * 3600 + second * 60 + fraction
+    if len(numbers) == 1:
+        return numbers[0] + fraction
+    return np.nan
+
+
+_parse_time_array = np.frompyfunc(_parse_time_text, 2, 1)
+
+
+def _time_object(value):
+    """Ячейки XLSX: число — секунды, time и timedelta — длительность"""
+    if isinstance(value, datetime.time):
+        return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return np.nan
+
+
+_is_text = np.frompyfunc(lambda value: value is None or isinstance(value, str), 1, 1)
+_time_object_array = np.frompyfunc(_time_object, 1, 1)
+
+
+def _parse_time_strict(text, expected_format):
+    """Векторный разбор строк «цифры, разделитель, необязательная дробная часть в конце».
+
+    Возвращает (секунды, маска разобранных); остальные строки разбираются поштучно.
+    """
+    count = len(text)
+    codes = _codes(text)
+    present = [(codes == ord(sep)).any(axis=1) for sep in _SEPARATORS]
+    separator = np.select(present, [ord(sep) for sep in _SEPARATORS], 0)
+    is_separator = (codes == separator[:, None]) & (separator[:, None] != 0)
+    is_digit = (codes >= 48) & (codes <= 57)
+    is_fraction = ((codes == 46) | (codes == 44)) & ~is_separator
+    field = np.cumsum(is_separator, axis=1)
+    parts = field[:, -1] + 1
+    after_fraction = (np.cumsum(is_fraction, axis=1) - is_fraction) > 0
+    whole = is_digit & ~after_fraction
+
+    strict = (separator != 0) & (parts <= 3) & (is_fraction.sum(axis=1) <= 1)
+    strict &= (is_digit | is_separator | is_fraction | (codes == 0)).all(axis=1)
+    strict &= ~(is_fraction & (field != (parts - 1)[:, None])).any(axis=1)
+    for number in range(3):
+        strict &= (number >= parts) | (whole & (field == number)).any(axis=1)
+
+    rows = np.flatnonzero(strict)
+    codes, field, whole = codes[rows], np.minimum(field[rows], 2), whole[rows]
+    fraction_digit = (is_digit & after_fraction)[rows]
+    fields = np.zeros((len(rows), 3))
+    fraction = np.zeros(len(rows))
+    scale = np.ones(len(rows))
+    positions = np.arange(len(rows))
+    # Схема Горнера по столбцам символов: цикл по ширине строки, а не по ячейкам
+    for column in range(codes.shape[1]):
+        digit = codes[:, column] - 48
+        mask = whole[:, column]
+        target = (positions[mask], field[mask, column])
+        fields[target] = fields[target] * 10 + digit[mask]
+        mask = fraction_digit[:, column]
+        fraction[mask] = fraction[mask] * 10 + digit[mask]
+        scale[mask] *= 10
+
+    first, second, third = fields.T
+    if expected_format == 'mm:ss':
+        minutes_seconds = np.ones(len(rows), dtype=bool)
+    elif expected_format == 'hh:mm':
+        minutes_seconds = np.zeros(len(rows), dtype=bool)
+    else:
+        minutes_seconds = (first > 23) | (second > 59)
+    seconds = np.where(
+        parts[rows] == 3,
+        first * 3600 + second * 60 + third,
+        np.where(minutes_seconds, first * 60 + second, first * 3600 + second * 60),
+    ) + fraction / scale
+    result = np.full(count, np.nan)
+    result[rows] = seconds
+    return result, strict
+
+
+def parse_time(values, expected_format=None):
+    """Столбец времени в секунды как parseTimeToSeconds; числа считаются секундами"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64)
+    result = np.full(len(values), np.nan)
+    text_rows = np.ones(len(values), dtype=bool)
+    if values.dtype.kind == 'O' and len(values):
+        text_rows = _is_text(values).astype(bool)
+        if not text_rows.all():
+            result[~text_rows] = _time_object_array(values[~text_rows]).astype(np.float64)
+    text = to_text(values[text_rows])
+    if not len(text):
+        return result
+    seconds, strict = _parse_time_strict(text, expected_format)
+    # Без разделителей — число секунд (parseFloat)
+    plain = ~strict & ~np.isin(_codes(text), [ord(char) for char in ':., \t']).any(axis=1)
+    seconds[plain] = parse_float(text[plain])
+    rest = ~strict & ~plain
+    if rest.any():
+        seconds[rest] = _parse_time_array(text[rest], expected_format).astype(np.float64)
+    result[text_rows] = seconds
+    return result
+
+
+def format_time(seconds, time_format):
+    """Секунды в строки формата времени, как formatTimeFromSeconds; NaN — пустая строка"""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    if not len(seconds):
+        return np.array([], dtype=str)
+    finite = np.isfinite(seconds)
+    values = np.where(finite, seconds, 0.0)
+    total = np.floor(values).astype(np.int64)
+    milliseconds = np.floor((values - total) * 1000 + 0.5).astype(np.int64)
+    hours, minutes, secs = total // 3600, (total % 3600) // 60, total % 60
+
+    def pad(numbers, width=2):
+        return np.char.zfill(numbers.astype(str), width)
+
+    if time_format in ('hh:mm:ss', 'hh.mm.ss', 'hh,mm,ss', 'hh mm ss'):
+        sep = time_format[2]
+        text = np.char.add(np.char.add(np.char.add(np.char.add(pad(hours), sep), pad(minutes)), sep), pad(secs))
+    elif time_format in ('hh:mm', 'hh.mm'):
+        text = np.char.add(np.char.add(pad(hours), time_format[2]), pad(minutes))
+    elif time_format in ('mm:ss', 'mm.ss'):
+        text = np.char.add(np.char.add(pad(minutes), time_format[2]), pad(secs))
+    elif time_format == 'ss':
+        text = total.astype(str)
+    elif time_format in ('hh:mm:ss.fff', 'hh:mm:ss,fff'):
+        text = format_time(seconds, 'hh:mm:ss')
+        text = np.char.add(np.char.add(text, time_format[8]), pad(milliseconds, 3))
+    else:
+        text = np.array([repr(value) for value in seconds.tolist()], dtype=str)
+    return np.where(finite, text, '')
+
+
+# --- Перевод единиц ---
+
+def conversion_factor(from_unit, to_unit):
+    """Множитель convertUnit для числовых единиц; NaN — перевод не поддерживается"""
+    if from_unit == to_unit:
+        return 1.0
+    if from_unit not in UNIT_INDEX or to_unit not in UNIT_INDEX:
+        return np.nan
+    return FACTORS[UNIT_INDEX[from_unit], UNIT_INDEX[to_unit]]
+
+
+def convert_unit(values, from_unit, to_unit):
+    """convertUnit для столбца: float64 (NaN — не переведено) или строки для формата времени"""
+    if from_unit == to_unit:
+        return to_text(values) if to_unit in TIME_FORMATS else parse_float(values)
+    if from_unit in TIME_FORMATS:
+        seconds = parse_time(values, from_unit)
+        if to_unit in TIME_FORMATS:
+            return format_time(seconds, to_unit)
+        return seconds * conversion_factor('s', to_unit)
+    if to_unit in TIME_FORMATS:
+        return format_time(parse_float(values), to_unit)
+    return parse_float(values) * conversion_factor(from_unit, to_unit)
+
+
+def _unit_positions(units, count):
+    """Позиции единиц в FACTORS для count строк; единица строкой — на все строки, -1 — неизвестна"""
+    if isinstance(units, str):
+        return np.full(count, UNIT_INDEX.get(units, -1), dtype=np.int64)
+    unique, inverse = np.unique(np.asarray(units, dtype=str), return_inverse=True)
+    positions = np.array([UNIT_INDEX.get(unit, -1) for unit in unique.tolist()], dtype=np.int64)
+    return positions[inverse]
+
+
+def convert_units(numbers, from_units, to_units):
+    """Числа с единицей в каждой строке (например, строки GpsReportData) в единицы to_units.
+
+    from_units и to_units — столбцы или одна единица на все строки; неизвестные пары — NaN.
+    """
+    numbers = np.asarray(numbers, dtype=np.float64)
+    from_positions = _unit_positions(from_units, len(numbers))
+    to_positions = _unit_positions(to_units, len(numbers))
+    known = (from_positions >= 0) & (to_positions >= 0)
+    factors = np.full(len(numbers), np.nan)
+    factors[known] = FACTORS[from_positions[known], to_positions[known]]
+    return numbers * factors
+
+
+def convert_value(values, from_unit, to_unit):
+    """convertValue из canonical-metrics.ts: перевод внутри размерности UNIT_FACTORS.
+
+    Неподдерживаемая пара — ValueError, как исключение в TypeScript.
+    """
+    values = parse_float(values)
+    if from_unit == to_unit:
+        return values
+    factor = np.nan
+    if from_unit in CANONICAL_INDEX and to_unit in CANONICAL_INDEX:
+        factor = CANONICAL_FACTORS[CANONICAL_INDEX[from_unit], CANONICAL_INDEX[to_unit]]
+    if np.isnan(factor):
+        raise ValueError(f"Перевод {from_unit} -> {to_unit} не поддерживается")
+    return values * factor
@@ -0,0 +1,339 @@
+"""
+Готовность игроков по утренним опросам: z-оценки сна, восстановления, настроения
+и мышечного состояния относительно личной базы игрока и сводный индекс готовности.
+
+База — среднее и стандартное отклонение ответов игрока за 28 предыдущих дней
+(не меньше 7 ответов). Индекс готовности — среднее пяти z-оценок, readinessScore —
+он же в шкале 0..100 (50 — личная норма, 10 баллов — одно отклонение).
+Строки игроков пишутся в PlayerWellnessDaily, распределение по команде за день —
+в TeamWellnessDaily.
+
+Пакетный режим пересчитывает клуб целиком; потоковый (--follow) раз в --interval
+секунд берет ответы после водяного знака клуба и пересчитывает только дни
+затронутых игроков начиная с дня нового ответа.
+
+Запуск:
+    python -m uteam_bot.wellness                       # все клубы
+    python -m uteam_bot.wellness --club <clubId> --dry-run
+    python -m uteam_bot.wellness --follow --interval 60
+"""
+
+import argparse
+import csv
+import io
+import sys
+import time
+
+import numpy as np
+import psycopg2
+
+from . import db
+from .config import BotConfig
+from .loads import EPOCH, to_csv
+
+METRICS = ('sleepDuration', 'sleepQuality', 'recovery', 'mood', 'muscleCondition')
+Z_COLUMNS = ('zSleepDuration', 'zSleepQuality', 'zRecovery', 'zMood', 'zMuscleCondition')
+
+# Личная база: дни до текущего и минимальное число ответов в ней
+BASELINE_DAYS = 28
+MIN_BASELINE = 7
+
+# Перекрытие окна новых ответов после водяного знака
+WATERMARK_OVERLAP = '5 minutes'
+
+# День ответа в таймзоне команды
+RESPONSE_DAY = """(r."createdAt" AT TIME ZONE COALESCE(z."name", 'Europe/Moscow'))::date"""
+
+RESPONSE_JOINS = """
+LEFT JOIN "Player" p ON p."id" = r."playerId"
+LEFT JOIN "Team" t ON t."id" = p."teamId"
+LEFT JOIN pg_timezone_names z ON z."name" = t."timezone"
+"""
+
+# Последний ответ игрока за день; дни — от 1970-01-01
+RESPONSE_COLUMNS = f"""
+SELECT DISTINCT ON (r."playerId", {RESPONSE_DAY})
+    r."tenantId",
+    r."playerId",
+    p."teamId",
+    {RESPONSE_DAY} - DATE '1970-01-01' as "day",
+    r."sleepDuration",
+    r."sleepQuality",
+    r."recovery",
+    r."mood",
+    r."muscleCondition"
+FROM "MorningSurveyResponse" r
+"""
+
+RESPONSES_QUERY = f"""
+{RESPONSE_COLUMNS}
+{RESPONSE_JOINS}
+WHERE (%(club_id)s::uuid IS NULL OR r."tenantId" = %(club_id)s::uuid)
+ORDER BY r."playerId", {RESPONSE_DAY}, r."createdAt" DESC
+"""
+
+# Первый день новых ответов каждого игрока после водяного знака клуба
+NEW_RESPONSES_QUERY = f"""
+SELECT r."tenantId", r."playerId", MIN({RESPONSE_DAY}) - DATE '1970-01-01' as "day"
+FROM "MorningSurveyResponse" r
+{RESPONSE_JOINS}
+LEFT JOIN "WellnessWatermark" w ON w."clubId" = r."tenantId"
+WHERE r."createdAt" > COALESCE(w."createdAt", '-infinity'::timestamptz) - %(overlap)s::interval
+  AND (%(club_id)s::uuid IS NULL OR r."tenantId" = %(club_id)s::uuid)
+GROUP BY r."tenantId", r."playerId"
+"""
+
+# Ответы затронутых игроков начиная с fromDate минус окно базы
+AFFECTED_RESPONSES_QUERY = f"""
+{RESPONSE_COLUMNS}
+JOIN unnest(%(clubs)s::uuid[], %(players)s::uuid[], %(from_dates)s::date[]) f("clubId", "playerId", "fromDate")
+  ON f."clubId" = r."tenantId" AND f."playerId" = r."playerId"
+{RESPONSE_JOINS}
+WHERE {RESPONSE_DAY} >= f."fromDate" - {BASELINE_DAYS}
+ORDER BY r."playerId", {RESPONSE_DAY}, r."createdAt" DESC
+"""
+
+
+class Answers:
+    """Ответы утреннего опроса в виде столбцов; values — матрица N × METRICS"""
+
+    def __init__(self, club_ids, player_ids, team_ids, days, values):
+        self.club_ids = club_ids
+        self.player_ids = player_ids
+        self.team_ids = team_ids
+        self.days = days
+        self.values = values
+
+    def __len__(self):
+        return len(self.days)
+
+    def select(self, mask):
+        return Answers(self.club_ids[mask], self.player_ids[mask], self.team_ids[mask],
+                       self.days[mask], self.values[mask])
+
+
+def parse_copy(stream):
+    rows = list(csv.reader(stream))
+    if not rows:
+        empty = np.array([], dtype=object)
+        return Answers(empty, empty, empty, np.array([], dtype=np.int64), np.empty((0, len(METRICS))))
+    columns = list(zip(*rows))
+    return Answers(
+        np.array(columns[0], dtype=object),
+        np.array(columns[1], dtype=object),
+        np.array(columns[2], dtype=object),
+        np.array(columns[3], dtype=np.int64),
+        np.array(columns[4:], dtype=np.float64).T,
+    )
+
+
+def _read(query, params, before=None):
+    """Ответы одним COPY через uteam_bot_reader и момент снимка (новый водяной знак).
+
+    before(cursor) выполняется в той же транзакции до COPY и может вернуть None,
+    если читать нечего. Ошибки базы пробрасываются.
+    """
+    connection = db.get_db_connection()
+    if not connection:
+        raise psycopg2.OperationalError("нет подключения к базе данных")
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+            cursor.execute('SELECT NOW()')
+            snapshot = cursor.fetchone()[0]
+            if before is not None:
+                params = before(cursor)
+                if params is None:
+                    return None, snapshot
+            buffer = io.StringIO()
+            query = cursor.mogrify(query, params).decode()
+            cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', buffer)
+    finally:
+        connection.rollback()
+        db.release_connection(connection)
+    buffer.seek(0)
+    return parse_copy(buffer), snapshot
+
+
+def _trailing_sum(cumulative, size):
+    """Сумма за size дней перед каждым днем (без него); cumulative — с нулевым первым столбцом"""
+    end = np.arange(cumulative.shape[1] - 1)
+    start = np.clip(end - size, 0, None)
+    return cumulative[:, end] - cumulative[:, start]
+
+
+def compute_wellness(player_index, day_index, values, players, days):
+    """z-оценки и индекс готовности для матрицы players × days × METRICS.
+
+    Возвращает (z, readiness, baseline_days); дни без ответа — NaN.
+    """
+    matrix = np.full((players, days, len(METRICS)), np.nan)
+    matrix[player_index, day_index] = values
+    answered = ~np.isnan(matrix[:, :, :1])
+    filled = np.nan_to_num(matrix)
+
+    zero = np.zeros((players, 1, len(METRICS)))
+    cumulative = np.concatenate([zero, np.cumsum(filled, axis=1)], axis=1)
+    cumulative_sq = np.concatenate([zero, np.cumsum(filled * filled, axis=1)], axis=1)
+    cumulative_n = np.concatenate([zero[:, :, :1], np.cumsum(answered, axis=1)], axis=1)
+
+    count = _trailing_sum(cumulative_n, BASELINE_DAYS)
+    total = _trailing_sum(cumulative, BASELINE_DAYS)
+    total_sq = _trailing_sum(cumulative_sq, BASELINE_DAYS)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        # Выборочное стандартное отклонение базы
+        variance = np.clip((total_sq - count * mean * mean) / (count - 1), 0, None)
+        sd = np.sqrt(variance)
+        enough = (count >= MIN_BASELINE) & (sd > 1e-6)
+        z = np.where(enough, (matrix - mean) / sd, np.nan)
+    scored = ~np.isnan(z)
+    z_count = scored.sum(axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        readiness = np.where(z_count > 0, np.nan_to_num(z).sum(axis=2) / z_count, np.nan)
+    return z, readiness, count[:, :, 0].astype(np.int64)
+
+
+def readiness_score(readiness):
+    """Индекс готовности в шкале 0..100; NaN остается NaN"""
+    return np.clip(np.round(50 + 10 * readiness), 0, 100)
+
+
+def club_wellness(answers, from_days=None):
+    """Строки PlayerWellnessDaily клуба: (столбцы, число строк).
+
+    from_days (playerId -> день) ограничивает строки днями начиная с этого дня;
+    без него пишутся все дни с ответом.
+    """
+    player_ids, player_index = np.unique(answers.player_ids, return_inverse=True)
+    first_day = int(answers.days.min())
+    days = int(answers.days.max()) - first_day + 1
+    day_index = answers.days - first_day
+    z, readiness, baseline = compute_wellness(player_index, day_index, answers.values, len(player_ids), days)
+
+    keep = np.ones(len(answers), dtype=bool)
+    if from_days is not None:
+        starts = np.array([from_days[player_id] for player_id in player_ids], dtype=np.int64)
+        keep = answers.days >= starts[player_index]
+    rows, cols = player_index[keep], day_index[keep]
+
+    out = {
+        'playerId': answers.player_ids[keep],
+        'teamId': answers.team_ids[keep],
+        'clubId': answers.club_ids[keep],
+        'date': (EPOCH + answers.days[keep]).astype(str),
+        'baselineDays': baseline[rows, cols],
+        'readiness': np.round(readiness[rows, cols], 3),
+        'readinessScore': readiness_score(readiness[rows, cols]),
+    }
+    for number, (name, z_name) in enumerate(zip(METRICS, Z_COLUMNS)):
+        column = answers.values[keep, number]
+        out[name] = column if name == 'sleepDuration' else column.astype(np.int64)
+        out[z_name] = np.round(z[rows, cols, number], 3)
+    return out, int(keep.sum())
+
+
+def _to_csv(columns):
+    # readinessScore — smallint: целые без дробной части, NaN — NULL
+    score = columns['readinessScore']
+    score = np.array([None if np.isnan(value) else int(value) for value in score], dtype=object)
+    return to_csv(dict(columns, readinessScore=score), db.PLAYER_WELLNESS_COLUMNS)
+
+
+def run(club_id=None, dry_run=False, stream=sys.stdout):
+    """Пакетный пересчет: строки каждого клуба заменяются целиком"""
+    started = time.perf_counter()
+    answers, watermark = _read(RESPONSES_QUERY, {'club_id': club_id})
+    print(f"[Wellness] Прочитано ответов: {len(answers)} за {time.perf_counter() - started:.2f} с", file=stream)
+    total = 0
+    if not len(answers):
+        return total
+    clubs, club_index = np.unique(answers.club_ids, return_inverse=True)
+    for number, club in enumerate(clubs):
+        columns, count = club_wellness(answers.select(club_index == number))
+        written = team_rows = 0
+        if not dry_run:
+            written, team_rows = db.replace_wellness(club, _to_csv(columns), watermark=watermark)
+        total += count
+        print(f"[Wellness] Клуб {club}: строк {count} (записано {written}, командных {team_rows})", file=stream)
+    print(f"[Wellness] Итого строк: {total} за {time.perf_counter() - started:.2f} с", file=stream)
+    return total
+
+
+def run_incremental(club_id=None, dry_run=False, stream=sys.stdout):
+    """Потоковый шаг: только игроки с ответами после водяного знака, дни начиная с нового ответа"""
+    affected = {}
+
+    def collect(cursor):
+        cursor.execute(NEW_RESPONSES_QUERY, {'club_id': club_id, 'overlap': WATERMARK_OVERLAP})
+        for club, player_id, day in cursor.fetchall():
+            affected.setdefault(club, {})[player_id] = day
+        if not affected:
+            return None
+        pairs = [(club, player_id, str(EPOCH + day))
+                 for club, players in affected.items() for player_id, day in players.items()]
+        clubs, players, from_dates = zip(*pairs)
+        return {'clubs': list(clubs), 'players': list(players), 'from_dates': list(from_dates)}
+
+    answers, watermark = _read(AFFECTED_RESPONSES_QUERY, None, before=collect)
+    total = 0
+    if answers is None or not len(answers):
+        return total
+    for club, from_days in affected.items():
+        club_answers = answers.select(answers.club_ids == club)
+        if not len(club_answers):
+            continue
+        columns, count = club_wellness(club_answers, from_days)
+        written = team_rows = 0
+        if not dry_run:
+            player_ids = sorted(from_days)
+            from_dates = [str(EPOCH + from_days[player_id]) for player_id in player_ids]
+            written, team_rows = db.replace_wellness(
+                club, _to_csv(columns), player_ids, from_dates, watermark=watermark
+            )
+        total += count
+        print(f"[Wellness] Клуб {club}: игроков {len(from_days)}, строк {count} "
+              f"(записано {written}, командных {team_rows})", file=stream)
+    return total
+
+
+def follow(club_id=None, interval=60, dry_run=False):
+    """Потоковый режим: шаг раз в interval секунд до Ctrl+C"""
+    print(f"[Wellness] Потоковый режим, интервал {interval} с")
+    while True:
+        try:
+            run_incremental(club_id, dry_run)
+        except Exception as e:
+            # База недоступна — водяной знак не сдвинут, следующий шаг заберет эти ответы
+            print(f"[Wellness] Ошибка шага: {e}")
+        time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Готовность игроков по утренним опросам (PlayerWellnessDaily)")
+    parser.add_argument('--club', help='ID клуба (по умолчанию все клубы)')
+    parser.add_argument('--follow', action='store_true', help='Потоковый режим: обрабатывать новые ответы')
+    parser.add_argument('--interval', type=int, default=60, help='Интервал потокового режима, секунд')
+    parser.add_argument('--dry-run', action='store_true', help='Посчитать без записи в базу')
+    args = parser.parse_args(argv)
+
+    config = BotConfig.from_env()
+    db.configure(config.db)
+    db.configure_writer(config.writer_db)
+    if not args.dry_run and not db.writer_enabled():
+        sys.exit("Для записи нужен BOT_WRITER_DB_PASSWORD (или --dry-run)")
+    try:
+        if args.follow:
+            follow(args.club, args.interval, args.dry_run)
+        else:
+            run(args.club, args.dry_run)
+    except KeyboardInterrupt:
+        pass
+    except psycopg2.OperationalError as e:
+        sys.exit(f"Ошибка базы данных: {e}")
+    finally:
+        db.close_writer()
+
+
+if __name__ == '__main__':
+    main()